@@ -0,0 +1,74 @@
+"""Retained memory per finding: the old ad-hoc dict versus the slotted Finding.
+
+    PYTHONPATH=src python -m benchmarks.finding_memory --findings 1000000
+
+Both shapes model the unused Elastic IP check over many accounts: the dict
+carries the raw ``describe_addresses`` entry as its details, as the scanner
+used to, while Finding keeps the few identifying fields it records now.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import sys
+import tracemalloc
+
+from auditor.findings import Finding
+
+ACCOUNTS = 500
+REGIONS = ("us-east-1", "us-west-2", "eu-west-1", "ap-southeast-2")
+
+
+def _parsed(text: str) -> str:
+    # Values parsed from a response are separate objects, not shared literals.
+    return text.encode().decode()
+
+
+def _address(i: int) -> dict:
+    """One ``describe_addresses`` entry, as the EIP check used to keep it."""
+    return {"PublicIp": f"203.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            "AllocationId": f"eipalloc-{i:017x}", "Domain": _parsed("vpc"),
+            "PublicIpv4Pool": _parsed("amazon"), "NetworkBorderGroup": REGIONS[i % 4],
+            "Tags": []}
+
+
+def _old(i: int) -> dict:
+    eip = _address(i)
+    return {"account_id": f"{i % ACCOUNTS:012d}", "region": REGIONS[i % 4], "service": "EC2",
+            "resource_id": eip.get("PublicIp"), "severity": "LOW",
+            "title": "Unused Elastic IP", "details": eip}
+
+
+def _new(i: int) -> Finding:
+    eip = _address(i)
+    return Finding(f"{i % ACCOUNTS:012d}", REGIONS[i % 4], "EC2", eip.get("PublicIp"), "LOW",
+                   "Unused Elastic IP",
+                   {"allocation_id": eip.get("AllocationId"), "domain": eip.get("Domain")})
+
+
+def bytes_per_finding(make, n: int) -> float:
+    """Memory still allocated after building ``n`` findings with ``make``, per finding."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [make(i) for i in range(n)]
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del kept
+    return retained / n
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Measure retained memory per finding")
+    p.add_argument("--findings", type=int, default=1_000_000)
+    args = p.parse_args(argv)
+    old = bytes_per_finding(_old, args.findings)
+    new = bytes_per_finding(_new, args.findings)
+    print(f"{'dict + raw payload':<20} {old:7.0f} bytes/finding")
+    print(f"{'Finding':<20} {new:7.0f} bytes/finding  ({new / old:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
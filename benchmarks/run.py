@@ -0,0 +1,194 @@
+"""Offline benchmarks against a synthetic organization.
+
+    PYTHONPATH=src python -m benchmarks.run --accounts 20 --regions 4 --resources 200 \
+        --latency-ms 5 --throttle-rate 0.02 --json out/bench.json
+
+Each scanner is run over every (account, region) unit through the real
+scheduler, client factory and rate limiter, then ``main.run()`` is timed end
+to end, followed by CLI startup (see ``benchmarks.startup``). Per benchmark:
+wall time, API calls (and throttled calls), peak traced memory and
+findings/sec. ``--compare baseline.json`` exits non-zero when API calls grow
+or wall time regresses beyond ``--tolerance``.
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+from auditor import main
+from auditor.aws_clients import ClientFactory
+from auditor.config import load_config
+from auditor.inventory import use_inventory
+from auditor.registry import SCANNERS
+from auditor.scheduler import ScanScheduler, ScanUnit, execute_unit
+from auditor.tags import TagIndex, use_tag_index
+
+from .startup import measure_startup
+from .synthetic_org import DEFAULT_REGIONS, SyntheticOrg
+
+
+def _write_config(org: SyntheticOrg, workdir: str, args) -> str:
+    raw = {
+        "output_dir": os.path.join(workdir, "out"),
+        "cache": {"enabled": args.cache},
+        "concurrency": {"max_workers": args.workers, "per_account": args.per_account},
+        "rate_limits": {"default": args.rate},
+        "inventory": {"backend": args.inventory, "aggregator_name": "bench"},
+    }
+    path = os.path.join(workdir, "config.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(raw, f)
+    return path
+
+
+@contextlib.contextmanager
+def _measure(org: SyntheticOrg, result: dict, trace: bool):
+    org.reset()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace else 0
+        if trace:
+            tracemalloc.stop()
+        findings = result.get("findings", 0)
+        result.update(
+            wall_seconds=round(wall, 4),
+            api_calls=org.total_calls,
+            throttled=sum(org.throttled.values()),
+            peak_mb=round(peak / 2**20, 2),
+            findings_per_sec=round(findings / wall, 1) if wall else 0.0,
+        )
+
+
+def bench_scanner(org: SyntheticOrg, conf, name: str, trace: bool = True) -> dict:
+    spec = SCANNERS[name]
+    fn = spec.load()
+    factory = ClientFactory.from_config(conf)
+    sessions = {a: factory.session(a) for a in org.account_ids}
+    units = []
+    for account_id, sess in sessions.items():
+        regions = ["global"] if spec.is_global else org.regions
+        units.extend(ScanUnit(account_id, r, name, fn, sess) for r in regions)
+    result = {"name": name, "units": len(units)}
+    with _measure(org, result, trace), contextlib.redirect_stdout(io.StringIO()):
+        use_inventory(main._open_inventory(conf, factory))
+        use_tag_index(TagIndex(conf.tags.required))
+        try:
+            counts = ScanScheduler(conf.concurrency).run(
+                units, lambda i, u: execute_unit(u, conf, lambda f: None))
+        finally:
+            use_inventory(None)
+            use_tag_index(None)
+        result["findings"] = sum(c or 0 for c in counts)
+    return result
+
+
+def bench_run(org: SyntheticOrg, config_path: str, trace: bool = True) -> dict:
+    result = {"name": "run()"}
+    conf = load_config(config_path)
+    with _measure(org, result, trace), contextlib.redirect_stdout(io.StringIO()), \
+            contextlib.redirect_stderr(io.StringIO()):
+        main.run(config_path, None, None)
+        with open(os.path.join(conf.output_dir, "findings.jsonl"), encoding="utf-8") as f:
+            result["findings"] = sum(1 for _ in f)
+    return result
+
+
+def run_benchmarks(args) -> list[dict]:
+    org = SyntheticOrg(accounts=args.accounts, regions=DEFAULT_REGIONS[:args.regions] or None,
+                       resources=args.resources, latency_ms=args.latency_ms,
+                       throttle_rate=args.throttle_rate, seed=args.seed)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir, org.install():
+        config_path = _write_config(org, workdir, args)
+        conf = load_config(config_path)
+        for name in args.only or SCANNERS:
+            results.append(bench_scanner(org, conf, name, trace=not args.no_trace))
+        if not args.skip_run:
+            results.append(bench_run(org, config_path, trace=not args.no_trace))
+    if not args.skip_startup:
+        results.extend(measure_startup())
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Regressions against a baseline: more API calls, or wall time beyond tolerance."""
+    base = {r["name"]: r for r in baseline}
+    problems = []
+    for r in results:
+        b = base.get(r["name"])
+        if b is None:
+            continue
+        if r["api_calls"] > b["api_calls"]:
+            problems.append(f"{r['name']}: api_calls {b['api_calls']} -> {r['api_calls']}")
+        if r["wall_seconds"] > b["wall_seconds"] * (1 + tolerance):
+            problems.append(f"{r['name']}: wall {b['wall_seconds']}s -> {r['wall_seconds']}s")
+    return problems
+
+
+def format_table(results: list[dict]) -> str:
+    cols = ("name", "units", "wall_seconds", "api_calls", "throttled", "peak_mb",
+            "findings", "findings_per_sec")
+    rows = [cols] + [tuple(str(r.get(c, "")) for c in cols) for r in results]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(cols))]
+    return "\n".join("  ".join(v.ljust(w) for v, w in zip(row, widths)) for row in rows)
+
+
+def parse_args(argv):
+    p = argparse.ArgumentParser(description="Offline auditor benchmarks")
+    p.add_argument("--accounts", type=int, default=5)
+    p.add_argument("--regions", type=int, default=2, help=f"1-{len(DEFAULT_REGIONS)}")
+    p.add_argument("--resources", type=int, default=50, help="Resources per type per unit")
+    p.add_argument("--latency-ms", type=float, default=0.0, help="Injected latency per call")
+    p.add_argument("--throttle-rate", type=float, default=0.0,
+                   help="Fraction of calls answered with a Throttling error")
+    p.add_argument("--rate", type=float, default=1000.0, help="rate_limits.default")
+    p.add_argument("--workers", type=int, default=16)
+    p.add_argument("--per-account", type=int, default=4)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--cache", action="store_true", help="Enable the fingerprint cache")
+    p.add_argument("--inventory", choices=("live", "config"), default="live",
+                   help="Inventory backend (config: synthetic Config aggregator)")
+    p.add_argument("--only", type=lambda s: s.split(","), help="Scanners to benchmark")
+    p.add_argument("--skip-run", action="store_true", help="Skip the end-to-end run()")
+    p.add_argument("--skip-startup", action="store_true", help="Skip CLI startup timing")
+    p.add_argument("--no-trace", action="store_true",
+                   help="Disable tracemalloc (faster, no peak memory)")
+    p.add_argument("--json", help="Write results to this file")
+    p.add_argument("--compare", help="Baseline JSON to compare against")
+    p.add_argument("--tolerance", type=float, default=0.25,
+                   help="Allowed relative wall-time regression for --compare")
+    return p.parse_args(argv)
+
+
+def cli(argv=None) -> int:
+    args = parse_args(argv)
+    results = run_benchmarks(args)
+    print(format_table(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+        print(f"Wrote: {args.json}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            problems = compare(results, json.load(f)["results"], args.tolerance)
+        for line in problems:
+            print(f"[REGRESSION] {line}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli())
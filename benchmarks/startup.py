@@ -0,0 +1,80 @@
+"""CLI startup time: median wall time of fresh interpreters.
+
+    PYTHONPATH=src python -m benchmarks.startup --repeat 7
+"""
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HEAVY_MODULES = ("boto3", "botocore", "jinja2", "auditor.aws_clients", "auditor.scanners.s3")
+
+DEMO_CONFIG = """
+accounts:
+  - id: "111111111111"
+output_dir: {out}
+cache:
+  enabled: false
+"""
+
+
+def _time(argv: list[str], env: dict, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(argv, env=env, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples), 4)
+
+
+def loaded_modules(statement: str, env: dict | None = None) -> list[str]:
+    """Which of HEAVY_MODULES a fresh interpreter has imported after ``statement``."""
+    probe = (f"import sys\n{statement}\n"
+             f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", probe], env=env or _env(), check=True,
+                         capture_output=True, text=True).stdout.strip()
+    return [m for m in out.split(",") if m]
+
+
+def _env() -> dict:
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    return dict(os.environ, PYTHONPATH=os.pathsep.join(
+        p for p in (src, os.environ.get("PYTHONPATH")) if p))
+
+
+def measure_startup(repeat: int = 5) -> list[dict]:
+    env = _env()
+    py = sys.executable
+    with tempfile.TemporaryDirectory() as tmp:
+        cfg = os.path.join(tmp, "config.yaml")
+        with open(cfg, "w", encoding="utf-8") as f:
+            f.write(DEMO_CONFIG.format(out=os.path.join(tmp, "out")))
+        cases = {
+            "startup:python": [py, "-c", "pass"],
+            "startup:--help": [py, "-m", "auditor", "--help"],
+            "startup:--demo --only s3": [py, "-m", "auditor", "--config", cfg, "--demo",
+                                         "--only", "s3"],
+        }
+        results = [{"name": name, "wall_seconds": _time(argv, env, repeat), "api_calls": 0}
+                   for name, argv in cases.items()]
+    results[1]["loaded"] = loaded_modules("import auditor.main", env)
+    return results
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Measure auditor CLI startup time")
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args(argv)
+    for r in measure_startup(args.repeat):
+        extra = f"  heavy modules: {', '.join(r['loaded']) or 'none'}" if "loaded" in r else ""
+        print(f"{r['name']:<28} {r['wall_seconds']:.3f}s{extra}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,51 @@
 from __future__ import annotations
-from .aws_clients import list_accounts, assume_into_account
+import hashlib
+import os
+from typing import TYPE_CHECKING
+
 from .config import Config, Account
 
-def get_target_accounts(conf: Config) -> list[Account]:
+if TYPE_CHECKING:
+    from .aws_clients import ClientFactory
+
+# aws_clients (and with it boto3) is imported only when AWS is actually called.
+
+def get_target_accounts(conf: Config, suffix: str = "") -> list[Account]:
+    """Configured accounts, or the active ones discovered through Organizations.
+
+    ``suffix`` names a shard's own copy of the org tree cache.
+    """
+    excluded = set(conf.exclude_accounts)
     if conf.accounts:
-        return [a for a in conf.accounts if a.id not in set(conf.exclude_accounts)]
-    # Discover via Organizations
+        return [a for a in conf.accounts if a.id not in excluded]
+    # Discover via Organizations, from a cached snapshot of the org tree
+    from .merge import shard_path
+    from .orgtree import load_org_tree
+    org = conf.organization
+    path = org.cache_path or os.path.join(conf.output_dir, "org-cache.json")
+    tree = load_org_tree(shard_path(path, suffix), org.cache_ttl_hours)
     discovered = []
-    for a in list_accounts():
-        if a["Id"] in set(conf.exclude_accounts): 
+    for a in tree.select(org.include_ous, org.exclude_ous):
+        if a["id"] in excluded:
             continue
-        discovered.append(Account(id=a["Id"], name=a.get("Name")))
+        if a["status"] != "ACTIVE":
+            print(f"[SKIP] {a['id']}: account is {a['status']}")
+            continue
+        discovered.append(Account(id=a["id"], name=a.get("name")))
     return discovered
 
-def session_for(account_id: str, conf: Config):
-    return assume_into_account(account_id, conf.assume_role_name, conf.external_id)
+def shard_accounts(accounts: list[Account], index: int, count: int) -> list[Account]:
+    """Accounts belonging to shard ``index`` (1-based) of ``count``.
+
+    Assignment hashes the account ID, so it does not depend on the order
+    Organizations returns accounts in, and adding an account moves no others.
+    """
+    def shard_of(account_id: str) -> int:
+        return int(hashlib.sha256(account_id.encode()).hexdigest(), 16) % count + 1
+    return [a for a in accounts if shard_of(a.id) == index]
+
+def session_for(account_id: str, conf: Config, factory: ClientFactory | None = None):
+    if factory is None:
+        from .aws_clients import ClientFactory
+        factory = ClientFactory.from_config(conf)
+    return factory.session(account_id)
@@ -1,6 +1,13 @@
 from __future__ import annotations
+import threading
 import boto3
-from typing import List
+import botocore.loaders
+import botocore.session
+from botocore.config import Config as BotoConfig
+from botocore.credentials import RefreshableCredentials
+
+from .metrics import ApiMetrics
+from .ratelimit import RateLimiter
 
 def org_client():
     return boto3.client("organizations")
@@ -8,29 +15,117 @@ def org_client():
 def sts_client():
     return boto3.client("sts")
 
-def list_accounts() -> List[dict]:
-    client = org_client()
-    accounts = []
-    token = None
-    while True:
-        kwargs = {"NextToken": token} if token else {}
-        resp = client.list_accounts(**kwargs)
-        accounts.extend(resp.get("Accounts", []))
-        token = resp.get("NextToken")
-        if not token:
-            break
-    return accounts
-
-def assume_into_account(account_id: str, role_name: str, external_id: str | None = None):
+def config_client(region_name: str):
+    return boto3.client("config", region_name=region_name)
+
+def assume_into_account(account_id: str, role_name: str, external_id: str | None = None,
+                        sts=None, loader=None):
+    """Return a Session whose assumed-role credentials refresh themselves.
+
+    botocore re-runs AssumeRole shortly before the credentials expire, so
+    clients built from this session stay valid for long runs.
+    """
     arn = f"arn:aws:iam::{account_id}:role/{role_name}"
-    sts = sts_client()
+    sts = sts or sts_client()
     params = {"RoleArn": arn, "RoleSessionName": "auditor-session"}
     if external_id:
         params["ExternalId"] = external_id
-    creds = sts.assume_role(**params)["Credentials"]
-    session = boto3.Session(
-        aws_access_key_id=creds["AccessKeyId"],
-        aws_secret_access_key=creds["SecretAccessKey"],
-        aws_session_token=creds["SessionToken"],
+
+    def refresh():
+        creds = sts.assume_role(**params)["Credentials"]
+        return {
+            "access_key": creds["AccessKeyId"],
+            "secret_key": creds["SecretAccessKey"],
+            "token": creds["SessionToken"],
+            "expiry_time": creds["Expiration"].isoformat(),
+        }
+
+    credentials = RefreshableCredentials.create_from_metadata(
+        metadata=refresh(), refresh_using=refresh, method="sts-assume-role",
     )
-    return session
+    core = botocore.session.get_session()
+    core._credentials = credentials
+    if loader is not None:
+        # Share parsed service models instead of reloading them per account.
+        core.register_component("data_loader", loader)
+    return boto3.Session(botocore_session=core)
+
+
+class AccountSession:
+    """Session-like view of one account; ``client()`` draws from the shared factory."""
+
+    def __init__(self, factory: ClientFactory, account_id: str):
+        self._factory = factory
+        self.account_id = account_id
+
+    def client(self, service_name: str, region_name: str | None = None):
+        return self._factory.client(self.account_id, service_name, region_name)
+
+
+class ClientFactory:
+    """Caches assumed-role sessions per account and clients per (account, region, service).
+
+    boto3 clients are thread-safe but creating them is not, and each one
+    carries its own connection pool, so they are built once under a
+    per-account lock and shared by every scanner.
+    """
+
+    def __init__(self, role_name: str, external_id: str | None = None,
+                 max_pool_connections: int = 10, limiter: RateLimiter | None = None,
+                 metrics: ApiMetrics | None = None):
+        self.role_name = role_name
+        self.external_id = external_id
+        self.limiter = limiter
+        self.metrics = metrics
+        retries = {"mode": "standard"}
+        if limiter is not None:
+            retries["max_attempts"] = limiter.limits.max_attempts
+        self.boto_config = BotoConfig(max_pool_connections=max_pool_connections, retries=retries)
+        self._sts = None
+        self._sessions: dict[str, boto3.Session] = {}
+        self._clients: dict[tuple, object] = {}
+        self._loader = botocore.loaders.create_loader()
+        self._lock = threading.Lock()
+        self._account_locks: dict[str, threading.Lock] = {}
+
+    @classmethod
+    def from_config(cls, conf) -> ClientFactory:
+        return cls(conf.assume_role_name, conf.external_id,
+                   conf.concurrency.max_pool_connections, RateLimiter(conf.rate_limits),
+                   ApiMetrics())
+
+    def _boto_session(self, account_id: str) -> boto3.Session:
+        sess = self._sessions.get(account_id)
+        if sess is not None:
+            return sess
+        with self._lock:
+            if self._sts is None:
+                self._sts = sts_client()
+        # AssumeRole runs outside the lock so accounts can be prepared in parallel.
+        sess = assume_into_account(account_id, self.role_name, self.external_id,
+                                   sts=self._sts, loader=self._loader)
+        with self._lock:
+            return self._sessions.setdefault(account_id, sess)
+
+    def session(self, account_id: str) -> AccountSession:
+        # Assume eagerly so access problems surface while preparing the account.
+        self._boto_session(account_id)
+        return AccountSession(self, account_id)
+
+    def client(self, account_id: str, service_name: str, region_name: str | None = None):
+        key = (account_id, region_name or "global", service_name)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                account_lock = self._account_locks.setdefault(account_id, threading.Lock())
+            with account_lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._boto_session(account_id).client(
+                        service_name, region_name=region_name, config=self.boto_config)
+                    if self.limiter is not None:
+                        self.limiter.attach(client, account_id, region_name)
+                    if self.metrics is not None:
+                        self.metrics.attach(client, account_id, region_name)
+                    self._clients[key] = client
+        return client
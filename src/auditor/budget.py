@@ -0,0 +1,54 @@
+"""Time budgets: ``--time-budget`` parsing and the record of units left unscanned."""
+from __future__ import annotations
+import json
+import os
+import re
+
+from .scheduler import ScanUnit
+
+_DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*$")
+_UNIT_SECONDS = {"": 1, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: str) -> float:
+    """``"90"`` / ``"90s"`` -> 90.0, ``"45m"`` -> 2700.0, ``"1.5h"`` -> 5400.0."""
+    m = _DURATION_RE.match(value)
+    if not m:
+        raise ValueError(f"Invalid duration {value!r}: expected e.g. 900, 45m or 2h")
+    return float(m.group(1)) * _UNIT_SECONDS[m.group(2)]
+
+
+def skipped_name(suffix: str = "") -> str:
+    return f"skipped-units{suffix}.json"
+
+
+def skipped_record(unit: ScanUnit) -> dict:
+    return {"account_id": unit.account_id, "region": unit.region, "check": unit.service}
+
+
+def write_skipped(outdir: str, skipped: list[dict], budget: float | None,
+                  suffix: str = "") -> str | None:
+    """List the units a time budget left unscanned, in scheduling order.
+
+    With nothing skipped, a list left by an earlier run is removed instead.
+    """
+    path = os.path.join(outdir, skipped_name(suffix))
+    if not skipped:
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"time_budget_seconds": budget, "units": skipped}, f, indent=1)
+    return path
+
+
+def merge_skipped(paths: list[str]) -> list[dict]:
+    """Skipped units from several ``skipped-units*.json`` files (missing ones skipped)."""
+    units = []
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                units.extend(json.load(f)["units"])
+        except FileNotFoundError:
+            continue
+    return units
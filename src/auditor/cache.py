@@ -0,0 +1,163 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator
+
+from .findings import Finding
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    account_id TEXT, check_name TEXT, resource_id TEXT,
+    fingerprint TEXT, findings TEXT, checked_at REAL,
+    PRIMARY KEY (account_id, check_name, resource_id)
+);
+CREATE TABLE IF NOT EXISTS findings (
+    key TEXT PRIMARY KEY, account_id TEXT, region TEXT, service TEXT,
+    data TEXT, run_id INTEGER, status TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (run_id INTEGER PRIMARY KEY, started_at REAL);
+"""
+
+
+def fingerprint(*parts) -> str:
+    """Stable hash of JSON-serialisable resource attributes."""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def finding_key(f: Finding) -> str:
+    return "|".join((f.account_id, f.region, f.service, f.resource_id, f.title))
+
+
+class NullCache:
+    """Used when caching is disabled: every lookup misses and nothing is stored."""
+
+    def lookup(self, account_id, check_name, resource_id, fp):
+        return None
+
+    def store(self, account_id, check_name, resource_id, fp, findings):
+        pass
+
+
+class AuditCache(NullCache):
+    """Local SQLite store of per-resource fingerprints and the previous run's findings.
+
+    Scanners call ``lookup()`` with a cheap fingerprint before their expensive
+    follow-up probes; on a hit they re-emit the cached findings instead.
+    Entries older than ``max_age_days`` miss, so unchanged resources are still
+    re-probed periodically. ``label()`` marks each finding of this run as new
+    or persisting and ``resolved()`` yields last run's findings that are gone.
+    """
+
+    def __init__(self, path: str, max_age_days: float = 7, use_fingerprints: bool = True):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.use_fingerprints = use_fingerprints
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.run_id = None
+
+    # -- fingerprints -----------------------------------------------------
+
+    def lookup(self, account_id, check_name, resource_id, fp) -> list[Finding] | None:
+        if not self.use_fingerprints:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fingerprint, findings, checked_at FROM fingerprints "
+                "WHERE account_id=? AND check_name=? AND resource_id=?",
+                (account_id, check_name, resource_id)).fetchone()
+        if row is None or row[0] != fp or time.time() - row[2] > self.max_age:
+            return None
+        return [Finding.from_dict(d) for d in json.loads(row[1])]
+
+    def store(self, account_id, check_name, resource_id, fp, findings: Iterable[Finding]):
+        data = json.dumps([f.to_dict() for f in findings], default=str)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?)",
+                (account_id, check_name, resource_id, fp, data, time.time()))
+
+    # -- finding status ---------------------------------------------------
+
+    def begin_run(self, run_id: int | None = None) -> int:
+        """Start a new run, or continue ``run_id`` when resuming an interrupted one."""
+        with self._lock:
+            if run_id is None:
+                cur = self._db.execute("INSERT INTO runs (started_at) VALUES (?)", (time.time(),))
+                self._db.commit()
+                run_id = cur.lastrowid
+            self.run_id = run_id
+        return self.run_id
+
+    def label(self, f: Finding) -> Finding:
+        key = finding_key(f)
+        with self._lock:
+            seen = self._db.execute(
+                "SELECT run_id, status FROM findings WHERE key=?", (key,)).fetchone()
+            if seen is None:
+                f.status = "new"
+            elif seen[0] == self.run_id:
+                f.status = seen[1]  # same key emitted twice in this run
+            else:
+                f.status = "persisting"
+            self._db.execute(
+                "INSERT OR REPLACE INTO findings VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, f.account_id, f.region, f.service,
+                 json.dumps(f.to_dict(), default=str), self.run_id, f.status))
+        return f
+
+    def resolved(self, in_scope) -> Iterator[Finding]:
+        """Yield findings from earlier runs not seen in this one, then forget them.
+
+        ``in_scope(account_id, region, service)`` limits this to what was
+        actually scanned, so a partial run does not resolve everything else.
+        """
+        self.commit()
+        reader = sqlite3.connect(self.path)
+        rows = reader.execute(
+            "SELECT key, account_id, region, service, data FROM findings WHERE run_id < ?",
+            (self.run_id,))
+        gone = []
+        for key, account_id, region, service, data in rows:
+            if not in_scope(account_id, region, service):
+                continue
+            gone.append((key,))
+            f = Finding.from_dict(json.loads(data))
+            f.status = "resolved"
+            yield f
+        reader.close()
+        with self._lock:
+            self._db.executemany("DELETE FROM findings WHERE key=?", gone)
+            self._db.commit()
+
+    def commit(self):
+        with self._lock:
+            self._db.commit()
+
+    # FindingsPipeline processor interface
+    process = label
+    flush = commit
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+
+_active: NullCache = NullCache()
+
+
+def use_cache(cache: NullCache | None):
+    global _active
+    _active = cache if cache is not None else NullCache()
+
+
+def get_cache() -> NullCache:
+    return _active
@@ -0,0 +1,220 @@
+from __future__ import annotations
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+from .findings import Finding
+from .scheduler import ScanUnit
+
+CHECKPOINT_FILE = "checkpoint.jsonl"
+
+
+def checkpoint_name(suffix: str = "") -> str:
+    return CHECKPOINT_FILE.replace(".jsonl", f"{suffix}.jsonl")
+
+
+def unit_key(unit: ScanUnit) -> str:
+    return f"{unit.account_id}|{unit.region}|{unit.service}"
+
+
+class Checkpoint:
+    """Append-only record of completed units in ``<output_dir>/checkpoint.jsonl``
+    (``checkpoint.shard-i-of-N.jsonl`` with a shard ``suffix``).
+
+    Each line is one of:
+      {"meta": {...}}                              written when a run starts, and
+                                                   with "finished_at" once it completes
+      {"account": id, "regions": [...]}            regions resolved for an account
+      {"unit": key, "findings": [...]}             a unit that finished successfully,
+                                                   with "suppressed" counts per waiver
+
+    With ``resume=True`` the existing file is indexed (byte offset per unit,
+    so findings are only read back when replayed) and appended to; otherwise
+    it is started afresh. A torn last line from a crash is ignored. Whether
+    the file may be resumed at all is up to ``resume_conflict()``.
+
+    A running unit's findings go to its ``spool()``, a temporary file next to
+    the checkpoint, and are copied into the unit's record when it commits;
+    no unit's findings are held in memory.
+    """
+
+    def __init__(self, output_dir: str, resume: bool = False, meta: dict | None = None,
+                 suffix: str = ""):
+        os.makedirs(output_dir, exist_ok=True)
+        self.path = os.path.join(output_dir, checkpoint_name(suffix))
+        self.meta: dict = {}
+        self._done: dict[str, int] = {}
+        self._suppressed: dict[str, dict[str, int]] = {}
+        self._regions: dict[str, list[str]] = {}
+        self._lock = threading.Lock()
+        if resume and os.path.exists(self.path):
+            self._load()
+            self._f = open(self.path, "ab")
+        else:
+            self.meta = dict(meta or {}, started_at=datetime.now(timezone.utc).isoformat())
+            self._f = open(self.path, "wb")
+            self._append({"meta": self.meta})
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    break  # torn write at the end of an interrupted run
+                if "unit" in rec:
+                    self._done[rec["unit"]] = offset
+                    if rec.get("suppressed"):
+                        self._suppressed[rec["unit"]] = rec["suppressed"]
+                elif "account" in rec:
+                    self._regions[rec["account"]] = rec["regions"]
+                elif "meta" in rec:
+                    self.meta = rec["meta"]
+                offset += len(line)
+            valid_end = offset
+        # Drop any torn tail so appended records start on a clean line.
+        with open(self.path, "r+b") as f:
+            f.truncate(valid_end)
+
+    def _append(self, rec: dict):
+        with self._lock:
+            self._f.write(json.dumps(rec, default=str).encode("utf-8") + b"\n")
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def update_meta(self, **kwargs):
+        self.meta.update(kwargs)
+        self._append({"meta": self.meta})
+
+    def finish(self):
+        """Mark the run complete; its checkpoint can no longer be resumed."""
+        self.update_meta(finished_at=datetime.now(timezone.utc).isoformat())
+
+    def resume_conflict(self, meta: dict) -> str | None:
+        """Why a run described by ``meta`` cannot resume this checkpoint, if it cannot."""
+        if "finished_at" in self.meta:
+            return f"the run it records finished at {self.meta['finished_at']}"
+        for key, value in meta.items():
+            if self.meta.get(key) != value:
+                return f"it was written for {key} {self.meta.get(key)}, not {value}"
+        return None
+
+    def regions(self, account_id: str) -> list[str] | None:
+        return self._regions.get(account_id)
+
+    def record_regions(self, account_id: str, regions: list[str]):
+        self._regions[account_id] = list(regions)
+        self._append({"account": account_id, "regions": list(regions)})
+
+    def is_done(self, unit: ScanUnit) -> bool:
+        return unit_key(unit) in self._done
+
+    @property
+    def completed(self) -> int:
+        return len(self._done)
+
+    def _append_unit(self, key: str, rows: Iterable[bytes], suppressed: dict | None = None):
+        """Write a unit record from serialised findings without collecting them."""
+        head = {"unit": key, **({"suppressed": suppressed} if suppressed else {})}
+        with self._lock:
+            self._f.seek(0, os.SEEK_END)
+            offset = self._f.tell()
+            self._f.write(json.dumps(head).encode("utf-8")[:-1] + b', "findings": [')
+            for i, row in enumerate(rows):
+                self._f.write(b", " + row if i else row)
+            self._f.write(b"]}\n")
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._done[key] = offset
+            if suppressed:
+                self._suppressed[key] = dict(suppressed)
+
+    def record(self, unit: ScanUnit, findings: Iterable[Finding],
+               suppressed: dict | None = None):
+        self._append_unit(unit_key(unit), (_row(f) for f in findings), suppressed)
+
+    def suppressed(self, unit: ScanUnit) -> dict[str, int]:
+        """Findings a completed unit had suppressed, per waiver id."""
+        return self._suppressed.get(unit_key(unit), {})
+
+    def spool(self, unit: ScanUnit) -> UnitSpool:
+        """Where ``unit`` writes its findings; a completed unit's spool replays its record."""
+        return UnitSpool(self, unit)
+
+    def replay(self, unit: ScanUnit) -> Iterator[Finding]:
+        with open(self.path, "rb") as f:
+            f.seek(self._done[unit_key(unit)])
+            rec = json.loads(f.readline())
+        for d in rec["findings"]:
+            yield Finding.from_dict(d)
+
+    def close(self):
+        with self._lock:
+            self._f.close()
+
+
+def _row(f: Finding) -> bytes:
+    return json.dumps(f.to_dict(), default=str).encode("utf-8")
+
+
+class UnitSpool:
+    """One unit's findings on disk, in order, readable while the unit still runs.
+
+    ``commit()`` moves them into the checkpoint, after which iterating reads
+    the unit's record instead. A spool that is never committed (the scanner
+    failed) stays readable until ``close()``.
+    """
+
+    def __init__(self, checkpoint: Checkpoint, unit: ScanUnit):
+        self.checkpoint = checkpoint
+        self.unit = unit
+        self.path = None
+        self._f = None
+        self._lock = threading.Lock()
+
+    @property
+    def committed(self) -> bool:
+        return self.checkpoint.is_done(self.unit)
+
+    def add(self, finding: Finding):
+        with self._lock:
+            if self._f is None:
+                fd, self.path = tempfile.mkstemp(
+                    prefix=".spool-", suffix=".jsonl",
+                    dir=os.path.dirname(self.checkpoint.path) or ".")
+                self._f = os.fdopen(fd, "wb")
+            self._f.write(_row(finding) + b"\n")
+
+    def _rows(self) -> Iterator[bytes]:
+        with self._lock:
+            if self._f is None:
+                return
+            self._f.flush()
+            # Opened under the lock: a concurrent commit may remove the file,
+            # but an open handle still reads it.
+            f = open(self.path, "rb")
+        with f:
+            for line in f:
+                yield line.rstrip(b"\n")
+
+    def __iter__(self) -> Iterator[Finding]:
+        if self.committed:
+            yield from self.checkpoint.replay(self.unit)
+            return
+        for row in self._rows():
+            yield Finding.from_dict(json.loads(row))
+
+    def commit(self, suppressed: dict | None = None):
+        self.checkpoint._append_unit(unit_key(self.unit), self._rows(), suppressed)
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+                os.remove(self.path)
+                self._f = None
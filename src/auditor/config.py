@@ -1,7 +1,9 @@
 from __future__ import annotations
+import os
 import yaml
 from dataclasses import dataclass, field
-from typing import List
+from datetime import date
+from typing import Dict, List
 
 
 @dataclass
@@ -18,6 +20,72 @@ class StaleDays:
     iam_key_unused_days: int = 60
     iam_key_max_age_days: int = 90
 
+@dataclass
+class Concurrency:
+    max_workers: int = 16
+    per_account: int = 4
+    max_pool_connections: int = 10
+    per_service: Dict[str, int] = field(default_factory=dict)
+
+@dataclass
+class RateLimits:
+    default: float = 10.0  # requests/second per (account, region, operation)
+    burst: float | None = None
+    max_attempts: int = 8
+    overrides: Dict[str, float] = field(default_factory=dict)  # "iam" or "ec2:DescribeSecurityGroups"
+
+@dataclass
+class CacheSettings:
+    enabled: bool = True
+    path: str | None = None  # default: <output_dir>/auditor-cache.sqlite
+    max_age_days: float = 7
+
+@dataclass
+class HistorySettings:
+    enabled: bool = True
+    path: str | None = None  # default: <output_dir>/history
+
+@dataclass
+class TagSettings:
+    required: List[str] = field(default_factory=list)  # empty: any tag at all
+    check_missing: bool = True
+
+@dataclass
+class OrganizationSettings:
+    cache_ttl_hours: float = 24
+    cache_path: str | None = None  # default: <output_dir>/org-cache.json
+    include_ous: List[str] = field(default_factory=list)  # OU IDs or paths ("Prod/Web")
+    exclude_ous: List[str] = field(default_factory=list)
+
+# Finding fields a waiver can match on; each is an exact value or a glob.
+WAIVER_FIELDS = ("account_id", "region", "service", "resource_id", "title")
+
+@dataclass
+class Waiver:
+    id: str
+    reason: str = ""
+    account_id: str | None = None
+    region: str | None = None
+    service: str | None = None
+    resource_id: str | None = None
+    title: str | None = None
+    expires: date | None = None  # ignored from this day on
+
+@dataclass
+class RegionSettings:
+    cache_ttl_hours: float = 24
+    activity_probe: bool = False
+    probes: List[str] = field(default_factory=lambda: ["tagging", "lambda", "ec2", "eip", "rds"])
+
+@dataclass
+class InventorySettings:
+    backend: str = "live"  # "config": read resources from an AWS Config aggregator
+    aggregator_name: str | None = None
+    aggregator_region: str = "us-east-1"
+    resource_types: List[str] = field(default_factory=lambda: [
+        "AWS::EC2::SecurityGroup", "AWS::EC2::EIP", "AWS::RDS::DBInstance",
+        "AWS::S3::Bucket", "AWS::Lambda::Function"])
+
 @dataclass
 class Config:
     assume_role_name: str = "OrganizationAccountAccessRole"
@@ -27,12 +95,54 @@ class Config:
     accounts: List[Account] = field(default_factory=list)
     output_dir: str = "./out"
     stale_days: StaleDays = field(default_factory=StaleDays)
+    concurrency: Concurrency = field(default_factory=Concurrency)
+    rate_limits: RateLimits = field(default_factory=RateLimits)
+    cache: CacheSettings = field(default_factory=CacheSettings)
+    region_discovery: RegionSettings = field(default_factory=RegionSettings)
+    inventory: InventorySettings = field(default_factory=InventorySettings)
+    history: HistorySettings = field(default_factory=HistorySettings)
+    organization: OrganizationSettings = field(default_factory=OrganizationSettings)
+    tags: TagSettings = field(default_factory=TagSettings)
+    waivers: List[Waiver] = field(default_factory=list)
+
+def load_waivers(path: str) -> List[Waiver]:
+    """Read accepted-risk waivers from a YAML file (a list, or a ``waivers:`` key)."""
+    with open(path, "r", encoding="utf-8") as f:
+        raw = yaml.safe_load(f) or []
+    if isinstance(raw, dict):
+        raw = raw.get("waivers") or []
+    waivers = []
+    for n, w in enumerate(raw, 1):
+        unknown = set(w) - set(WAIVER_FIELDS) - {"id", "reason", "expires"}
+        if unknown:
+            raise ValueError(f"{path}: waiver {n}: unknown keys {sorted(unknown)}")
+        if not any(w.get(k) not in (None, "") for k in WAIVER_FIELDS):
+            raise ValueError(f"{path}: waiver {n} matches every finding; "
+                             f"set at least one of {', '.join(WAIVER_FIELDS)}")
+        match = {k: str(w[k]) for k in WAIVER_FIELDS if w.get(k) not in (None, "")}
+        if isinstance(w.get("account_id"), int) and len(match["account_id"]) != 12:
+            # YAML reads an unquoted 0-prefixed ID as an octal number
+            raise ValueError(f"{path}: waiver {n}: quote account_id {w['account_id']}")
+        expires = w.get("expires")
+        if isinstance(expires, str):
+            expires = date.fromisoformat(expires)
+        waivers.append(Waiver(id=str(w.get("id") or f"waiver-{n}"),
+                              reason=str(w.get("reason") or ""), expires=expires, **match))
+    return waivers
 
 def load_config(path: str) -> Config:
     with open(path, "r", encoding="utf-8") as f:
         raw = yaml.safe_load(f) or {}
     accounts = [Account(**a) for a in raw.get("accounts", [])]
     sd = raw.get("stale_days", {}) or {}
+    cc = raw.get("concurrency", {}) or {}
+    rl = raw.get("rate_limits", {}) or {}
+    ch = raw.get("cache", {}) or {}
+    rd = raw.get("region_discovery", {}) or {}
+    inv = raw.get("inventory", {}) or {}
+    hs = raw.get("history", {}) or {}
+    og = raw.get("organization", {}) or {}
+    tg = raw.get("tags", {}) or {}
     conf = Config(
         assume_role_name=raw.get("assume_role_name", "OrganizationAccountAccessRole"),
         external_id=raw.get("external_id"),
@@ -45,6 +155,52 @@ def load_config(path: str) -> Config:
             ec2_stopped_older_than=sd.get("ec2_stopped_older_than", 7),
             iam_key_unused_days=sd.get("iam_key_unused_days", 60),
             iam_key_max_age_days=sd.get("iam_key_max_age_days", 90),
-        )
+        ),
+        concurrency=Concurrency(
+            max_workers=max(1, int(cc.get("max_workers", 16))),
+            per_account=max(1, int(cc.get("per_account", 4))),
+            max_pool_connections=max(1, int(cc.get("max_pool_connections", 10))),
+            per_service={k: max(1, int(v)) for k, v in (cc.get("per_service") or {}).items()},
+        ),
+        rate_limits=RateLimits(
+            default=float(rl.get("default", 10.0)),
+            burst=rl.get("burst"),
+            max_attempts=max(1, int(rl.get("max_attempts", 8))),
+            overrides={k: float(v) for k, v in (rl.get("overrides") or {}).items()},
+        ),
+        cache=CacheSettings(
+            enabled=bool(ch.get("enabled", True)),
+            path=ch.get("path"),
+            max_age_days=float(ch.get("max_age_days", 7)),
+        ),
+        region_discovery=RegionSettings(
+            cache_ttl_hours=float(rd.get("cache_ttl_hours", 24)),
+            activity_probe=bool(rd.get("activity_probe", False)),
+            probes=rd.get("probes") or RegionSettings().probes,
+        ),
+        inventory=InventorySettings(
+            backend=inv.get("backend", "live"),
+            aggregator_name=inv.get("aggregator_name"),
+            aggregator_region=inv.get("aggregator_region", "us-east-1"),
+            resource_types=inv.get("resource_types") or InventorySettings().resource_types,
+        ),
+        history=HistorySettings(
+            enabled=bool(hs.get("enabled", True)),
+            path=hs.get("path"),
+        ),
+        organization=OrganizationSettings(
+            cache_ttl_hours=float(og.get("cache_ttl_hours", 24)),
+            cache_path=og.get("cache_path"),
+            include_ous=og.get("include_ous") or [],
+            exclude_ous=og.get("exclude_ous") or [],
+        ),
+        tags=TagSettings(
+            required=[str(k) for k in tg.get("required") or []],
+            check_missing=bool(tg.get("check_missing", True)),
+        ),
     )
+    if raw.get("waivers_file"):
+        # relative to the config file, so a checked-in config finds its waivers
+        waivers_path = os.path.join(os.path.dirname(os.path.abspath(path)), raw["waivers_file"])
+        conf.waivers = load_waivers(waivers_path)
     return conf
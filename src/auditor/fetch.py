@@ -0,0 +1,22 @@
+from __future__ import annotations
+from typing import Iterator
+
+
+def fetch(client, operation: str, result_key: str, filters: dict[str, list[str]] | None = None,
+          page_size: int | None = None, **params) -> Iterator[dict]:
+    """Lazily yield the items under ``result_key`` of every page of ``operation``.
+
+    ``filters`` (``{"ip-permission.cidr": ["0.0.0.0/0"]}``) is sent as the
+    EC2/RDS-style ``Filters`` parameter so the server only returns matching
+    resources. Pages are requested as the caller consumes items, so memory
+    stays bounded by one page. Operations without a paginator are called once.
+    """
+    if filters:
+        params["Filters"] = [{"Name": k, "Values": list(v)} for k, v in filters.items()]
+    if not client.can_paginate(operation):
+        yield from getattr(client, operation)(**params).get(result_key, [])
+        return
+    if page_size:
+        params["PaginationConfig"] = {"PageSize": page_size}
+    for page in client.get_paginator(operation).paginate(**params):
+        yield from page.get(result_key, [])
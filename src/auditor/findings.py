@@ -0,0 +1,78 @@
+from __future__ import annotations
+import sys
+
+FIELDS = ("account_id", "region", "service", "resource_id", "severity", "title",
+          "details", "remediation", "tags", "status")
+
+# Set by the incremental cache: seen for the first time, seen last run too,
+# or reported last run but gone now.
+STATUSES = ("new", "persisting", "resolved")
+
+# Details are a short human-readable summary, never a raw API payload.
+MAX_DETAILS_LEN = 512
+
+
+def format_details(details) -> str:
+    """Flatten scanner details into a bounded string.
+
+    Lists become ``a; b`` and dicts ``key=value, ...`` (non-scalar values are
+    dropped), so a finding never carries a nested API response.
+    """
+    if details is None:
+        return ""
+    if isinstance(details, dict):
+        text = ", ".join(f"{k}={v}" for k, v in details.items()
+                         if isinstance(v, (str, int, float, bool)))
+    elif isinstance(details, (list, tuple, set)):
+        text = "; ".join(str(d) for d in details)
+    else:
+        text = str(details)
+    if len(text) > MAX_DETAILS_LEN:
+        text = text[:MAX_DETAILS_LEN - 1] + "…"
+    return text
+
+
+def _intern(value) -> str:
+    return sys.intern(str(value)) if value is not None else ""
+
+
+class Finding:
+    """One audit finding.
+
+    Slotted to avoid a per-instance dict; the low-cardinality fields
+    (account, region, service, severity, title, remediation) are interned so
+    millions of findings share a handful of string objects.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, account_id: str, region: str, service: str, resource_id: str,
+                 severity: str, title: str, details=None, remediation: str = "",
+                 tags: dict | None = None, status: str = ""):
+        self.account_id = _intern(account_id)
+        self.region = _intern(region)
+        self.service = _intern(service)
+        self.resource_id = str(resource_id) if resource_id is not None else ""
+        self.severity = _intern(severity)
+        self.title = _intern(title)
+        self.details = format_details(details)
+        self.remediation = _intern(remediation)
+        self.tags = tags or None
+        self.status = _intern(status)
+
+    def to_dict(self) -> dict:
+        d = {k: getattr(self, k) for k in FIELDS}
+        d["tags"] = self.tags or {}
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> Finding:
+        return cls(**{k: d.get(k) for k in FIELDS if k in d})
+
+    def __eq__(self, other):
+        return isinstance(other, Finding) and all(
+            getattr(self, k) == getattr(other, k) for k in FIELDS)
+
+    def __repr__(self):
+        return (f"Finding({self.account_id} {self.region} {self.service} "
+                f"{self.resource_id!r} {self.severity} {self.title!r})")
@@ -0,0 +1,77 @@
+"""Findings history: every run appended to a Parquet dataset.
+
+Layout (hive partitioning, one or more files per partition and run)::
+
+    <history>/run_date=2026-10-18/account_id=111111111111/service=EC2/<uuid>.parquet
+
+Queries push the date, account and service predicates down as partition
+filters and read only the columns they need. Resolved findings are not
+stored: they describe what a run no longer found, so counting them would
+overstate every total. pandas and pyarrow are
+imported on use, so runs that do not touch history do not load them.
+"""
+from __future__ import annotations
+import itertools
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from .findings import FIELDS, Finding
+
+PARTITIONS = ("run_date", "account_id", "service")
+COLUMNS = ("run_id", "region", "resource_id", "severity", "title", "details",
+           "remediation", "tags", "status")
+BATCH_ROWS = 50_000
+
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    # Explicit string types: inferred partitions would turn account IDs into
+    # integers and drop their leading zeros.
+    return ds.partitioning(pa.schema([(p, pa.string()) for p in PARTITIONS]), flavor="hive")
+
+
+def append_run(findings: Iterable[Finding], root: str, run_id: str) -> int:
+    """Append one run's open findings under ``root``; ``run_id`` is its ISO timestamp."""
+    import pandas as pd
+    run_date = run_id[:10]
+    total = 0
+    it = (f for f in findings if f.status != "resolved")
+    while batch := list(itertools.islice(it, BATCH_ROWS)):
+        rows = []
+        for f in batch:
+            row = {k: getattr(f, k) for k in FIELDS}
+            row["tags"] = json.dumps(f.tags or {}, sort_keys=True)
+            rows.append(row)
+        df = pd.DataFrame(rows, columns=list(FIELDS))
+        df.insert(0, "run_id", run_id)
+        df.insert(0, "run_date", run_date)
+        df.to_parquet(root, engine="pyarrow", partition_cols=list(PARTITIONS), index=False)
+        total += len(batch)
+    return total
+
+
+def query(root: str, days: int | None = 30, severity: str | None = None,
+          account_id: str | None = None, service: str | None = None,
+          by: tuple[str, ...] = ("run_date", "account_id"), now: datetime | None = None):
+    """Count findings grouped by ``by`` over the last ``days`` days of runs."""
+    import pandas as pd
+    filters = []
+    if days is not None:
+        since = (now or datetime.now(timezone.utc)) - timedelta(days=days)
+        filters.append(("run_date", ">=", since.date().isoformat()))
+    for column, value in (("account_id", account_id), ("service", service),
+                          ("severity", severity)):
+        if value:
+            filters.append((column, "==", value))
+    unknown = set(by) - set(PARTITIONS) - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+    columns = sorted(set(by))
+    df = pd.read_parquet(root, engine="pyarrow", columns=columns, filters=filters or None,
+                         partitioning=_partitioning())
+    if df.empty:
+        return pd.DataFrame(columns=[*by, "findings"])
+    return (df.groupby(list(by), observed=True).size().reset_index(name="findings")
+            .sort_values(list(by)).reset_index(drop=True))
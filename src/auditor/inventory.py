@@ -0,0 +1,170 @@
+from __future__ import annotations
+import json
+import threading
+
+from .fetch import fetch
+
+SELECT = ("SELECT accountId, awsRegion, resourceId, resourceName, configuration, "
+          "supplementaryConfiguration, tags, configurationItemCaptureTime "
+          "WHERE resourceType = '{}'")
+# Resource types the aggregator holds per account and region. A recorder may
+# exclude some types in a region it otherwise covers, so coverage is per type;
+# where a type has no records the live scanners are used instead.
+COVERAGE = ("SELECT accountId, awsRegion, resourceType, COUNT(*) "
+            "GROUP BY accountId, awsRegion, resourceType")
+
+# select_aggregate_resource_config returns at most 100 results per page.
+PAGE_SIZE = 100
+
+
+def _tags(item) -> dict:
+    tags = item.get("tags") or []
+    if isinstance(tags, dict):
+        return tags
+    return {t.get("key"): t.get("value") for t in tags}
+
+
+# Config records are camelCase; each converter returns the shape of the
+# corresponding describe_* item so the checks evaluate both backends alike.
+def _security_group(item):
+    c = item.get("configuration") or {}
+    perms = []
+    for p in c.get("ipPermissions") or []:
+        ranges = [{"CidrIp": r.get("cidrIp")} for r in p.get("ipv4Ranges") or []]
+        if not ranges:
+            ranges = [{"CidrIp": cidr} for cidr in p.get("ipRanges") or []]
+        perms.append({"IpProtocol": p.get("ipProtocol"), "FromPort": p.get("fromPort"),
+                      "ToPort": p.get("toPort"), "IpRanges": ranges})
+    return {"GroupId": c.get("groupId") or item.get("resourceId"), "IpPermissions": perms,
+            "Tags": _tags(item)}
+
+
+def _address(item):
+    c = item.get("configuration") or {}
+    addr = {"PublicIp": c.get("publicIp"), "AllocationId": c.get("allocationId"),
+            "Domain": c.get("domain"), "Tags": _tags(item)}
+    for src, dst in (("instanceId", "InstanceId"), ("networkInterfaceId", "NetworkInterfaceId")):
+        if c.get(src):
+            addr[dst] = c[src]
+    return addr
+
+
+def _db_instance(item):
+    c = item.get("configuration") or {}
+    return {"DBInstanceIdentifier": c.get("dBInstanceIdentifier") or item.get("resourceName"),
+            "Engine": c.get("engine"), "PubliclyAccessible": bool(c.get("publiclyAccessible")),
+            "Tags": _tags(item)}
+
+
+def _function(item):
+    c = item.get("configuration") or {}
+    return {"FunctionName": c.get("functionName") or item.get("resourceName"),
+            "FunctionArn": c.get("functionArn"), "LastModified": c.get("lastModified"),
+            "Tags": _tags(item)}
+
+
+def _bucket(item):
+    c = item.get("configuration") or {}
+    supplementary = {}
+    for key, value in (item.get("supplementaryConfiguration") or {}).items():
+        # Some supplementary values (AccessControlList) arrive JSON-encoded.
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        supplementary[key] = value
+    return {"Name": c.get("name") or item.get("resourceName"),
+            "CreationDate": c.get("creationDate"), "Region": item.get("awsRegion"),
+            "Supplementary": supplementary, "Tags": _tags(item),
+            # Config records a new item whenever the policy, ACL or tags change.
+            "CaptureTime": item.get("configurationItemCaptureTime")}
+
+
+CONVERTERS = {
+    "AWS::EC2::SecurityGroup": _security_group,
+    "AWS::EC2::EIP": _address,
+    "AWS::RDS::DBInstance": _db_instance,
+    "AWS::S3::Bucket": _bucket,
+    "AWS::Lambda::Function": _function,
+}
+
+
+class NullInventory:
+    """Live backend: nothing is pre-fetched, so every scanner calls the service APIs."""
+
+    def records(self, resource_type: str, account_id: str, region: str | None = None):
+        return None
+
+
+class ConfigInventory(NullInventory):
+    """Organization-wide resources from an AWS Config aggregator.
+
+    Each resource type is fetched with one paginated advanced query the
+    first time a scanner asks for it. ``records()`` returns None (so the
+    scanner falls back to its live API calls) for types not configured and
+    wherever the aggregator holds no records of the type; otherwise a list
+    of describe-shaped items. ``region=None`` means every region of the
+    account, for account-scoped services such as S3. That is only served
+    from Config when every region with Config data for the account also
+    holds records of the type, since a bucket in an excluded region would
+    otherwise go missing.
+    """
+
+    def __init__(self, client, aggregator_name: str, resource_types: list[str]):
+        self.client = client
+        self.aggregator_name = aggregator_name
+        self.resource_types = [t for t in resource_types if t in CONVERTERS]
+        self._covered: set[tuple[str, str, str]] | None = None
+        self._records: dict[str, dict[tuple[str, str], list[dict]]] = {}
+        self._lock = threading.Lock()
+
+    def _select(self, expression: str):
+        for row in fetch(self.client, "select_aggregate_resource_config", "Results",
+                         page_size=PAGE_SIZE, Expression=expression,
+                         ConfigurationAggregatorName=self.aggregator_name):
+            yield json.loads(row)
+
+    def _load(self, resource_type: str) -> dict[tuple[str, str], list[dict]]:
+        with self._lock:
+            if self._covered is None:
+                self._covered = {(r["accountId"], r["awsRegion"], r["resourceType"])
+                                 for r in self._select(COVERAGE)}
+            loaded = self._records.get(resource_type)
+            if loaded is None:
+                convert = CONVERTERS[resource_type]
+                loaded = {}
+                for item in self._select(SELECT.format(resource_type)):
+                    key = (item["accountId"], item["awsRegion"])
+                    loaded.setdefault(key, []).append(convert(item))
+                self._records[resource_type] = loaded
+                total = sum(len(v) for v in loaded.values())
+                print(f"[INFO] Config aggregator: {total} {resource_type} records")
+            return loaded
+
+    def records(self, resource_type: str, account_id: str, region: str | None = None):
+        if resource_type not in self.resource_types:
+            return None
+        loaded = self._load(resource_type)
+        if region is None:
+            regions = {r for acct, r, _ in self._covered if acct == account_id}
+            if not regions or any((account_id, r, resource_type) not in self._covered
+                                  for r in regions):
+                return None
+            return [r for (acct, _), items in sorted(loaded.items()) if acct == account_id
+                    for r in items]
+        if (account_id, region, resource_type) not in self._covered:
+            return None
+        return loaded.get((account_id, region), [])
+
+
+_active: NullInventory = NullInventory()
+
+
+def use_inventory(inventory: NullInventory | None):
+    global _active
+    _active = inventory if inventory is not None else NullInventory()
+
+
+def get_inventory() -> NullInventory:
+    return _active
@@ -1,108 +1,445 @@
 from __future__ import annotations
 import argparse
-import sys
 import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import TYPE_CHECKING
 
+from .budget import parse_duration, skipped_name, skipped_record, write_skipped
 from .config import load_config
-from .assume import get_target_accounts, session_for
-from .reporters.csv_reporter import write_csv
+from .assume import get_target_accounts, session_for, shard_accounts
+from .cache import AuditCache, use_cache
+from .inventory import ConfigInventory, use_inventory
+from .merge import merge_partials, parse_shard, partial_name, shard_path, shard_suffix
+from .checkpoint import Checkpoint
+from .history import append_run, query
+from .regions import RegionCache, region_is_active
+from .pipeline import FindingsPipeline
+from .registry import SCANNERS, ScannerSpec, select
+from .scheduler import ScanScheduler, ScanUnit, execute_unit
+from .tags import TagIndex, use_tag_index
+from .waivers import open_waivers
+from .reporters.csv_reporter import CsvWriter
 from .reporters.html_reporter import write_html
-from .scanners import ec2 as ec2_scan
-from .scanners import s3 as s3_scan
-from .scanners import lambda_svc as lambda_scan
-from .scanners import rds as rds_scan
-from .scanners import iam as iam_scan
-from auditor.scanners.ec2 import scan_ec2_unused_eips
-from auditor.scanners.rds import scan_rds_public_snapshots
-from auditor.scanners.s3 import scan_s3_buckets
-
-SERVICES = {
-    "ec2": ec2_scan.scan_ec2,
-    "s3": s3_scan.scan_s3,
-    "lambda": lambda_scan.scan_lambda,
-    "rds": rds_scan.scan_rds,
-    "iam": iam_scan.scan_iam,
-}
-
-def discover_regions(session):
-    ec2 = session.client("ec2", region_name="us-east-1")
-    resp = ec2.describe_regions(AllRegions=False)
-    return sorted([r["RegionName"] for r in resp.get("Regions", [])])
-
-def run(config_path: str, only: list[str] | None, outdir: str | None, demo: bool = False):
+from .reporters.jsonl_reporter import JsonlWriter, iter_jsonl
+
+if TYPE_CHECKING:
+    from .aws_clients import ClientFactory
+
+# boto3, jinja2 and the scanner modules are imported on first use, so
+# `--help`, `--demo` and narrow `--only` runs do not pay for them.
+
+def _active_regions(sess, acct, regions, conf) -> list[str]:
+    probes = conf.region_discovery.probes
+    active = [r for r in regions if region_is_active(sess, r, probes)]
+    for r in regions:
+        if r not in active:
+            print(f"[SKIP] {acct.id} {r}: no resources found by activity probe")
+    return active
+
+def _prepare_account(acct, conf, factory: ClientFactory, demo: bool,
+                     checkpoint: Checkpoint, checks: list[ScannerSpec],
+                     region_cache: RegionCache):
+    """Assume into the account and resolve its regions; returns None on failure."""
+    if demo:
+        print(f"[INFO] Demo mode: skipping AWS calls for {acct.id}")
+        return None, ["us-east-1"]  # fallback region
+    regions = checkpoint.regions(acct.id)
+    if regions is not None and all(
+            checkpoint.is_done(u) for u in build_units(acct, None, regions, checks)):
+        return None, regions  # fully checkpointed: replay without assuming the role
+    try:
+        sess = session_for(acct.id, conf, factory)
+        if regions is None:
+            regions = conf.regions or region_cache.regions_for(sess, acct.id)
+            if conf.region_discovery.activity_probe:
+                regions = _active_regions(sess, acct, regions, conf)
+            checkpoint.record_regions(acct.id, regions)
+        return sess, regions
+    except Exception as e:
+        print(f"[WARN] {acct.id}: {e}", file=sys.stderr)
+        return None
+
+def build_units(acct, sess, regions, checks: list[ScannerSpec]) -> list[ScanUnit]:
+    units = []
+    # Account-scoped checks (IAM, S3) run once, before the per-region ones.
+    for spec in checks:
+        if spec.is_global:
+            units.append(ScanUnit(acct.id, "global", spec.name, spec.load(), sess))
+    for region in regions:
+        for spec in checks:
+            if not spec.is_global:
+                units.append(ScanUnit(acct.id, region, spec.name, spec.load(), sess))
+    return units
+
+def _open_cache(conf, full_rescan: bool, suffix: str = "") -> AuditCache | None:
+    if not conf.cache.enabled:
+        return None
+    path = conf.cache.path or os.path.join(conf.output_dir, "auditor-cache.sqlite")
+    return AuditCache(shard_path(path, suffix), conf.cache.max_age_days,
+                      use_fingerprints=not full_rescan)
+
+def _open_inventory(conf, factory) -> ConfigInventory | None:
+    inv = conf.inventory
+    if factory is None or inv.backend != "config":
+        return None
+    if not inv.aggregator_name:
+        raise ValueError("inventory.backend 'config' requires inventory.aggregator_name")
+    from .aws_clients import config_client
+    client = config_client(inv.aggregator_region)
+    factory.metrics.attach(client, "aggregator", inv.aggregator_region)
+    return ConfigInventory(client, inv.aggregator_name, inv.resource_types)
+
+def _history_path(conf) -> str:
+    return conf.history.path or os.path.join(conf.output_dir, "history")
+
+def _append_history(jsonl_path: str, root: str, generated_at: str) -> str | None:
+    """Append a finished run to the Parquet history; a failure never fails the run."""
+    try:
+        n = append_run(iter_jsonl(jsonl_path), root, generated_at)
+    except Exception as e:
+        print(f"[WARN] history: {e}", file=sys.stderr)
+        return None
+    print(f"[INFO] history: appended {n} findings for {generated_at[:10]}")
+    return root
+
+def run(config_path: str, only: list[str] | None, outdir: str | None, demo: bool = False,
+        full_rescan: bool = False, resume: bool = False, shard: tuple[int, int] | None = None,
+        time_budget: float | None = None):
+    # The budget covers the whole run, account discovery and role assumption included.
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
     conf = load_config(config_path)
     if outdir:
         conf.output_dir = outdir
 
-    accounts = get_target_accounts(conf)
+    checks = select(only)
+    # Shards may share an output directory, so each keeps its own state files.
+    suffix = shard_suffix(*shard) if shard else ""
+    accounts = get_target_accounts(conf, suffix)
+    if shard:
+        total = len(accounts)
+        accounts = shard_accounts(accounts, *shard)
+        print(f"[INFO] Shard {shard[0]}/{shard[1]}: {len(accounts)} of {total} accounts")
     print(f"Discovered/target accounts: {[a.id for a in accounts]}")
 
-    all_findings = []
+    # Only the interrupted run of the same checks and regions may be resumed.
+    run_meta = {"checks": [c.name for c in checks], "regions": list(conf.regions or [])}
+    checkpoint = Checkpoint(conf.output_dir, resume=resume, meta=run_meta, suffix=suffix)
+    if resume:
+        conflict = checkpoint.resume_conflict(run_meta)
+        if conflict:
+            checkpoint.close()
+            sys.exit(f"auditor: cannot resume from {checkpoint.path}: {conflict}. "
+                     "Re-run without --resume.")
+        print(f"[INFO] Resuming: {checkpoint.completed} units already completed")
+
+    factory = None
+    if not demo:
+        from .aws_clients import ClientFactory
+        factory = ClientFactory.from_config(conf)
+    # Scanners read from the aggregator when configured, else call the APIs live.
+    use_inventory(_open_inventory(conf, factory))
+    # One tagging walk per (account, region), shared by every scanner.
+    use_tag_index(TagIndex(conf.tags.required, conf.tags.check_missing))
+    region_cache = RegionCache(os.path.join(conf.output_dir, f"regions-cache{suffix}.json"),
+                               conf.region_discovery.cache_ttl_hours)
+    with ThreadPoolExecutor(max_workers=conf.concurrency.max_workers) as pool:
+        prepared = list(pool.map(
+            lambda a: _prepare_account(a, conf, factory, demo, checkpoint, checks, region_cache),
+            accounts))
 
-    for acct in accounts:
-        sess = None
-        regions = ["us-east-1"]  # fallback region
+    units = []
+    for acct, prep in zip(accounts, prepared):
+        if prep is None:
+            continue
+        sess, regions = prep
+        units.extend(build_units(acct, sess, regions, checks))
+    if deadline is not None:
+        # Cheap high-severity checks across every account first; the sort is
+        # stable, so account and region order is kept within a priority.
+        units.sort(key=lambda u: SCANNERS[u.service].priority)
 
-        if not demo:
-            try:
-                sess = session_for(acct.id, conf)
-                regions = conf.regions or discover_regions(sess)
-            except Exception as e:
-                print(f"[WARN] {acct.id}: {e}", file=sys.stderr)
-                continue
-        else:
-            print(f"[INFO] Demo mode: skipping AWS calls for {acct.id}")
+    # Findings are written as units produce them; the HTML is rendered from
+    # the JSONL spool at the end so nothing is held in memory. A shard only
+    # writes its partial JSONL; `merge` builds the reports from all of them.
+    generated_at = datetime.now(timezone.utc).isoformat()
+    if shard:
+        jsonl = JsonlWriter(conf.output_dir, partial_name(*shard))
+        writers = [jsonl]
+    else:
+        jsonl = JsonlWriter(conf.output_dir)
+        writers = [CsvWriter(conf.output_dir), jsonl]
+    cache = _open_cache(conf, full_rescan, suffix)
+    use_cache(cache)
+    processors = []
+    if cache is not None:
+        run_id = cache.begin_run(checkpoint.meta.get("cache_run_id"))
+        if checkpoint.meta.get("cache_run_id") != run_id:
+            checkpoint.update_meta(cache_run_id=run_id)
+        processors.append(cache)
+    # Waivers apply as units produce findings, so a suppressed finding is
+    # only counted: never spooled, checkpointed or written.
+    waivers = open_waivers(conf)
+    pipeline = FindingsPipeline(writers, processors)
 
-        # IAM is global
+    # (account, Finding.service, region) combinations that were fully scanned
+    scanned = set()
+
+    def mark_scanned(unit):
+        region = "*" if unit.region == "global" else unit.region
+        for svc in SCANNERS[unit.service].finding_services:
+            scanned.add((unit.account_id, svc, region))
+
+    spools = []
+
+    def execute(index, unit):
+        # Findings go to the unit's spool as they arrive; the pipeline reads
+        # them back from there if the unit finishes ahead of the head.
+        spool = checkpoint.spool(unit)
+        emit = pipeline.sink(index, spool)
         try:
-            f = SERVICES["iam"](sess, acct.id, "global", conf) if sess else []
-            all_findings.extend(f)
-            print(f"[OK] {acct.id} iam: {len(f)} findings")
-        except Exception as e:
-            print(f"[WARN] {acct.id} iam: {e}", file=sys.stderr)
-
-        # Per-region service scans
-        for region in regions:
-            for svc, fn in SERVICES.items():
-                if svc == "iam":
-                    continue
-                if only and svc not in only:
-                    continue
-                try:
-                    f = fn(sess, acct.id, region, conf) if sess else []
-                    all_findings.extend(f)
-                    print(f"[OK] {acct.id} {region} {svc}: {len(f)} findings")
-                except Exception as e:
-                    print(f"[WARN] {acct.id} {region} {svc}: {e}", file=sys.stderr)
-
-            # Extra custom checks
-            try:
-                extra_findings = []
-                scan_ec2_unused_eips(acct.id, region, extra_findings)
-                scan_rds_public_snapshots(acct.id, region, extra_findings)
-                scan_s3_buckets(acct.id, region, extra_findings)
-                all_findings.extend(extra_findings)
-                print(f"[OK] {acct.id} {region} extra-scanners: {len(extra_findings)} findings")
-            except Exception as e:
-                print(f"[WARN] {acct.id} {region} extra-scanners: {e}", file=sys.stderr)
-
-    # Write output
-    os.makedirs(conf.output_dir, exist_ok=True)
-    csv_path = write_csv(all_findings, conf.output_dir)
-    html_path = write_html(all_findings, conf.output_dir, datetime.now(timezone.utc).isoformat())
-    print(f"Wrote: {csv_path}\nWrote: {html_path}")
+            if spool.committed:
+                if waivers is not None:
+                    waivers.add(checkpoint.suppressed(unit))
+                n = 0
+                for finding in spool:
+                    emit(finding)
+                    n += 1
+                print(f"[RESUME] {unit.label}: {n} findings from checkpoint")
+                mark_scanned(unit)
+                return n
+            spools.append(spool)
+            dropped = Counter()
+
+            def tee(finding):
+                waiver = waivers.match(finding) if waivers is not None else None
+                if waiver is not None:
+                    if cache is not None:
+                        cache.label(finding)  # seen, so not reported as resolved
+                    dropped[waiver.id] += 1
+                    return
+                spool.add(finding)
+                emit(finding)
+
+            n = execute_unit(unit, conf, tee)
+            if waivers is not None:
+                waivers.add(dropped)
+            # None: the scanner raised. Such a unit is neither checkpointed nor
+            # counted as scanned, so --resume retries it and nothing resolves.
+            if n is None:
+                failed.append(unit.label)
+            elif unit.session:
+                spool.commit(dropped)
+                mark_scanned(unit)
+            return n
+        finally:
+            pipeline.unit_done(index)
+
+    skipped: list[dict] = []
+    failed: list[str] = []
+
+    def skip(index, unit):
+        skipped.append(skipped_record(unit))
+        pipeline.unit_done(index)
+
+    try:
+        ScanScheduler(conf.concurrency).run(units, execute, deadline, skip)
+        if cache is not None:
+            def in_scope(account_id, region, service):
+                return ((account_id, service, region) in scanned
+                        or (account_id, service, "*") in scanned)
+            for finding in cache.resolved(in_scope):
+                if waivers is None or waivers.match(finding) is None:
+                    pipeline.append(finding)
+        if not skipped and not failed:
+            checkpoint.finish()
+    finally:
+        paths = pipeline.close()
+        for spool in spools:
+            spool.close()  # removes what failed or interrupted units left behind
+        checkpoint.close()
+        if cache is not None:
+            cache.close()
+        use_cache(None)
+        use_inventory(None)
+        use_tag_index(None)
+    metrics_paths = ()
+    if factory is not None:
+        for line in factory.limiter.summary():
+            print(line)
+        for line in factory.metrics.slowest():
+            print(line)
+        metrics_paths = factory.metrics.write(conf.output_dir, suffix)
+
+    if skipped:
+        print(f"[WARN] Time budget of {time_budget:g}s exhausted: {len(skipped)} of "
+              f"{len(units)} units skipped; re-run with --resume to scan them", file=sys.stderr)
+    skipped_path = write_skipped(conf.output_dir, skipped, time_budget, suffix)
+    if skipped_path:
+        paths.append(skipped_path)
+    suppressed = None
+    if waivers is not None:
+        print(f"[INFO] waivers: suppressed {waivers.total} findings "
+              f"({len(waivers.counts)} of {len(waivers)} waivers matched)")
+        suppressed = waivers.summary()
+        if shard:
+            paths.append(waivers.write(conf.output_dir, suffix))
+    if not shard:
+        paths.append(write_html(iter_jsonl(jsonl.path), conf.output_dir, generated_at,
+                                suppressed, skipped))
+        if conf.history.enabled and skipped:
+            # A partial run would show up in history as a drop in findings.
+            print("[INFO] history: partial run not appended; "
+                  "the --resume run that completes it will be", file=sys.stderr)
+        elif conf.history.enabled:
+            root = _append_history(jsonl.path, _history_path(conf), generated_at)
+            if root:
+                paths.append(root)
+    for path in (*paths, *metrics_paths):
+        print(f"Wrote: {path}")
 
 def parse_args(argv):
     p = argparse.ArgumentParser(description="Multi-Account AWS Resource Auditor")
     p.add_argument("--config", required=True, help="Path to config.yaml")
-    p.add_argument("--only", help="Comma-separated services: ec2,s3,lambda,rds,iam")
+    p.add_argument("--only", help="Comma-separated checks or services: "
+                                  + ",".join(SCANNERS))
     p.add_argument("--out", help="Output directory")
     p.add_argument("--demo", action="store_true", help="Run in demo mode without AWS calls")
+    p.add_argument("--full-rescan", action="store_true",
+                   help="Ignore cached resource fingerprints and re-probe everything")
+    p.add_argument("--resume", action="store_true",
+                   help="Skip units completed in the checkpoint of an interrupted run")
+    p.add_argument("--shard", help="Scan only shard i of N of the accounts (e.g. 2/4) and "
+                                   "write a partial findings file for `merge`")
+    p.add_argument("--time-budget", help="Wall-time budget, e.g. 900, 45m or 2h: run cheap "
+                                         "high-severity checks first, start nothing new once "
+                                         "it is spent and write a partial report")
     args = p.parse_args(argv)
     only = args.only.split(",") if args.only else None
-    return args.config, only, args.out, args.demo
+    try:
+        if only:
+            select(only)
+        shard = parse_shard(args.shard) if args.shard else None
+        budget = parse_duration(args.time_budget) if args.time_budget else None
+    except ValueError as e:
+        p.error(str(e))
+    return (args.config, only, args.out, args.demo, args.full_rescan, args.resume, shard,
+            budget)
+
+def parse_merge_args(argv):
+    p = argparse.ArgumentParser(prog="auditor merge",
+                                description="Combine partial findings from sharded runs")
+    p.add_argument("partials", nargs="+", help="findings.shard-*.jsonl files")
+    p.add_argument("--out", default="./out", help="Output directory")
+    p.add_argument("--history", help="Also append the merged run to this history directory")
+    args = p.parse_args(argv)
+    return args.partials, args.out, args.history
+
+def parse_query_args(argv):
+    p = argparse.ArgumentParser(prog="auditor query",
+                                description="Count findings in the run history")
+    p.add_argument("--history", default="./out/history", help="History directory")
+    p.add_argument("--days", type=int, default=30,
+                   help="Only runs from the last N days (0: all history)")
+    p.add_argument("--severity", help="e.g. HIGH")
+    p.add_argument("--account", help="Account ID")
+    p.add_argument("--service", help="e.g. EC2")
+    p.add_argument("--by", default="account_id,run_date",
+                   help="Comma-separated columns to group by")
+    p.add_argument("--csv", action="store_true", help="Print CSV instead of a table")
+    return p.parse_args(argv)
+
+def parse_serve_args(argv):
+    p = argparse.ArgumentParser(prog="auditor serve",
+                                description="Rescan on change events and keep findings current")
+    p.add_argument("--config", required=True, help="Path to config.yaml")
+    p.add_argument("--events", required=True,
+                   help="JSONL file of CloudTrail/EventBridge events, tailed like a queue")
+    p.add_argument("--out", help="Output directory for snapshot reports")
+    p.add_argument("--only", type=lambda s: s.split(","), help="Comma-separated checks or services")
+    p.add_argument("--poll", type=float, default=2.0, help="Seconds between reads of --events")
+    p.add_argument("--snapshot-interval", type=float,
+                   help="Also write a snapshot every N seconds")
+    p.add_argument("--no-initial-scan", action="store_true",
+                   help="Start empty instead of scanning every unit once")
+    p.add_argument("--once", action="store_true",
+                   help="Process the events already in the file, write a snapshot and exit")
+    args = p.parse_args(argv)
+    try:
+        if args.only:
+            select(args.only)
+    except ValueError as e:
+        p.error(str(e))
+    return args
+
+def parse_plan_args(argv):
+    p = argparse.ArgumentParser(prog="auditor plan",
+                                description="Estimate API calls and wall time before a run")
+    p.add_argument("--config", required=True, help="Path to config.yaml")
+    p.add_argument("--only", type=lambda s: s.split(","), help="Comma-separated checks or services")
+    p.add_argument("--out", help="Output directory (region/org caches, earlier api-metrics.json)")
+    p.add_argument("--ou", action="append", help="Plan for this OU instead of "
+                                                 "organization.include_ous (repeatable)")
+    p.add_argument("--workers", type=int, help="Estimate at this max_workers")
+    p.add_argument("--per-account", type=int, help="Estimate at this per_account")
+    p.add_argument("--latency", type=float,
+                   help="Seconds per API call (default: from api-metrics.json, else 0.1)")
+    args = p.parse_args(argv)
+    try:
+        if args.only:
+            select(args.only)
+    except ValueError as e:
+        p.error(str(e))
+    return args
+
+def run_query(argv):
+    args = parse_query_args(argv)
+    if not os.path.isdir(args.history):
+        sys.exit(f"auditor query: no history at {args.history}")
+    try:
+        df = query(args.history, days=args.days or None, severity=args.severity,
+                   account_id=args.account, service=args.service,
+                   by=tuple(args.by.split(",")))
+    except ValueError as e:
+        sys.exit(f"auditor query: {e}")
+    if args.csv:
+        print(df.to_csv(index=False), end="")
+    else:
+        print(df.to_string(index=False))
+
+def cli(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["merge"]:
+        partials, out, history = parse_merge_args(argv[1:])
+        paths = merge_partials(partials, out)
+        for path in paths:
+            print(f"Wrote: {path}")
+        if history and os.path.exists(os.path.join(out, skipped_name())):
+            print("[INFO] history: shards skipped units; merged run not appended",
+                  file=sys.stderr)
+        elif history:
+            _append_history(paths[1], history, datetime.now(timezone.utc).isoformat())
+        return
+    if argv[:1] == ["query"]:
+        run_query(argv[1:])
+        return
+    if argv[:1] == ["plan"]:
+        args = parse_plan_args(argv[1:])
+        from .plan import plan  # deferred: plan imports this module
+        plan(args.config, args.only, args.out, args.workers, args.per_account, args.latency,
+             args.ou)
+        return
+    if argv[:1] == ["serve"]:
+        args = parse_serve_args(argv[1:])
+        from .serve import serve  # deferred: serve imports this module
+        serve(args.config, args.events, args.out, args.only, args.once, args.poll,
+              not args.no_initial_scan, args.snapshot_interval)
+        return
+    config_path, only, out, demo, full_rescan, resume, shard, budget = parse_args(argv)
+    run(config_path, only, out, demo, full_rescan, resume, shard, budget)
 
 if __name__ == "__main__":
-    config_path, only, out, demo = parse_args(sys.argv[1:])
-    run(config_path, only, out, demo)
+    cli()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+import os
+import re
+import sys
+from datetime import datetime, timezone
+
+from .reporters.csv_reporter import CsvWriter
+from .reporters.html_reporter import write_html
+from .reporters.jsonl_reporter import JsonlWriter, iter_jsonl
+from .budget import merge_skipped, skipped_name, write_skipped
+from .waivers import merge_suppressed, suppressed_name
+
+PARTIAL_RE = re.compile(r"\.shard-(\d+)-of-(\d+)\.jsonl$")
+
+
+def shard_suffix(index: int, count: int) -> str:
+    return f".shard-{index}-of-{count}"
+
+
+def shard_path(path: str, suffix: str) -> str:
+    """``path`` with ``suffix`` before its extension, so shards sharing ``--out`` keep
+    their own state (``auditor-cache.sqlite`` -> ``auditor-cache.shard-1-of-4.sqlite``)."""
+    root, ext = os.path.splitext(path)
+    return f"{root}{suffix}{ext}"
+
+
+def partial_name(index: int, count: int) -> str:
+    return f"findings{shard_suffix(index, count)}.jsonl"
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """``"2/4"`` -> ``(2, 4)``; shards are numbered from 1."""
+    try:
+        index, count = (int(x) for x in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard {value!r}: expected i/N, e.g. 1/4") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {value!r}: i must be between 1 and N")
+    return index, count
+
+
+def _order(path: str):
+    m = PARTIAL_RE.search(path)
+    return (int(m.group(1)) if m else 0, os.path.basename(path))
+
+
+def _sidecars(partials: list[str], name) -> list[str]:
+    """Files a shard wrote next to its partial findings file (``name(suffix)``)."""
+    paths = []
+    for partial in partials:
+        m = PARTIAL_RE.search(partial)
+        if m:
+            suffix = shard_suffix(int(m.group(1)), int(m.group(2)))
+            paths.append(os.path.join(os.path.dirname(partial), name(suffix)))
+    return paths
+
+
+def missing_shards(paths: list[str]) -> list[str]:
+    """Shards absent from a set of partial files, as ``"i/N"`` labels."""
+    seen: dict[int, set[int]] = {}
+    for p in paths:
+        m = PARTIAL_RE.search(p)
+        if m:
+            seen.setdefault(int(m.group(2)), set()).add(int(m.group(1)))
+    return [f"{i}/{n}" for n, got in sorted(seen.items())
+            for i in range(1, n + 1) if i not in got]
+
+
+def merge_partials(paths: list[str], outdir: str) -> tuple[str, str, str]:
+    """Stream partial findings files into the final CSV, JSONL and HTML reports.
+
+    Partials are concatenated in shard order, so merging is deterministic
+    and never holds more than one finding in memory.
+    """
+    merged = os.path.abspath(os.path.join(outdir, "findings.jsonl"))
+    paths = [p for p in paths if os.path.abspath(p) != merged]
+    for label in missing_shards(paths):
+        print(f"[WARN] merge: no partial findings for shard {label}", file=sys.stderr)
+    generated_at = datetime.now(timezone.utc).isoformat()
+    csv_writer = CsvWriter(outdir)
+    jsonl = JsonlWriter(outdir)
+    for path in sorted(paths, key=_order):
+        n = 0
+        for finding in iter_jsonl(path):
+            csv_writer.write(finding)
+            jsonl.write(finding)
+            n += 1
+        print(f"[OK] merge {os.path.basename(path)}: {n} findings")
+    csv_path, jsonl_path = csv_writer.close(), jsonl.close()
+    suppressed = merge_suppressed(_sidecars(paths, suppressed_name))
+    skipped = merge_skipped(_sidecars(sorted(paths, key=_order), skipped_name))
+    if skipped:
+        print(f"[WARN] merge: {len(skipped)} units were skipped by shard time budgets",
+              file=sys.stderr)
+    write_skipped(outdir, skipped, None)
+    html_path = write_html(iter_jsonl(jsonl_path), outdir, generated_at, suppressed, skipped)
+    return csv_path, jsonl_path, html_path
@@ -0,0 +1,167 @@
+from __future__ import annotations
+import bisect
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from .ratelimit import THROTTLE_CODES
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf.
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRICS_JSON = "api-metrics.json"
+METRICS_PROM = "api-metrics.prom"
+
+_START = "auditor_metrics_start"
+
+
+class OperationMetrics:
+    __slots__ = ("calls", "errors", "retries", "throttles", "latency_sum", "latency_max",
+                 "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.throttles = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, seconds: float):
+        self.calls += 1
+        self.latency_sum += seconds
+        self.latency_max = max(self.latency_max, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "throttles": self.throttles,
+            "latency_sum": round(self.latency_sum, 6),
+            "latency_max": round(self.latency_max, 6),
+            "latency_buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], self.buckets)),
+        }
+
+
+class ApiMetrics:
+    """Per-(account, region, service, operation) call metrics from botocore events.
+
+    ``attach()`` times each API call from ``before-call`` to ``after-call``
+    (so latency includes retries and backoff, but not rate-limiter waits,
+    which happen in the limiter's earlier ``before-call`` hook), counts
+    retries from the response metadata and throttles from ``needs-retry``.
+    """
+
+    def __init__(self):
+        self._ops: dict[tuple, OperationMetrics] = defaultdict(OperationMetrics)
+        self._lock = threading.Lock()
+
+    def attach(self, client, account_id: str, region: str | None):
+        service = client.meta.service_model.service_name
+        region = region or "global"
+
+        def before_call(model, context, **kwargs):
+            context[_START] = time.monotonic()
+
+        def after_call(model, parsed, context, **kwargs):
+            meta = parsed.get("ResponseMetadata", {})
+            self._observe((account_id, region, service, model.name), context,
+                          error="Error" in parsed, retries=meta.get("RetryAttempts", 0))
+
+        def after_call_error(model, context, exception=None, **kwargs):
+            self._observe((account_id, region, service, model.name), context, error=True)
+
+        def needs_retry(operation, response=None, **kwargs):
+            if response is not None and \
+                    response[1].get("Error", {}).get("Code") in THROTTLE_CODES:
+                with self._lock:
+                    self._ops[(account_id, region, service, operation.name)].throttles += 1
+
+        events = client.meta.events
+        events.register("before-call.*.*", before_call)
+        events.register("after-call.*.*", after_call)
+        events.register("after-call-error.*.*", after_call_error)
+        events.register("needs-retry.*.*", needs_retry)
+        return client
+
+    def _observe(self, key: tuple, context: dict, error: bool = False, retries: int = 0):
+        started = context.pop(_START, None)
+        elapsed = time.monotonic() - started if started is not None else 0.0
+        with self._lock:
+            op = self._ops[key]
+            op.observe(elapsed)
+            op.errors += error
+            op.retries += retries
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            items = sorted(self._ops.items())
+            return [{"account_id": a, "region": r, "service": s, "operation": o, **m.to_dict()}
+                    for (a, r, s, o), m in items]
+
+    def slowest(self, top: int = 5) -> list[str]:
+        """Operations with the most total time across all accounts and regions."""
+        totals: dict[str, list] = {}
+        for rec in self.snapshot():
+            t = totals.setdefault(f"{rec['service']}:{rec['operation']}", [0, 0.0, 0.0, 0, 0])
+            t[0] += rec["calls"]
+            t[1] += rec["latency_sum"]
+            t[2] = max(t[2], rec["latency_max"])
+            t[3] += rec["retries"]
+            t[4] += rec["throttles"]
+        ranked = sorted(totals.items(), key=lambda kv: kv[1][1], reverse=True)
+        return [f"[API] {op}: {calls} calls, {total:.1f}s total, "
+                f"avg {total / calls * 1000:.0f}ms, max {mx * 1000:.0f}ms, "
+                f"{retries} retries, {throttles} throttles"
+                for op, (calls, total, mx, retries, throttles) in ranked[:top] if calls]
+
+    def prometheus(self) -> str:
+        counters = (("calls", "auditor_api_calls_total", "API calls made"),
+                    ("errors", "auditor_api_errors_total", "API calls that returned an error"),
+                    ("retries", "auditor_api_retries_total", "Retry attempts"),
+                    ("throttles", "auditor_api_throttles_total", "Throttled attempts"))
+        records = self.snapshot()
+        lines = []
+
+        def labels(rec, extra=""):
+            return (f'{{account_id="{rec["account_id"]}",region="{rec["region"]}",'
+                    f'service="{rec["service"]}",operation="{rec["operation"]}"{extra}}}')
+
+        for field, name, help_text in counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f"{name}{labels(rec)} {rec[field]}" for rec in records]
+        name = "auditor_api_latency_seconds"
+        lines += [f"# HELP {name} API call latency including retries",
+                  f"# TYPE {name} histogram"]
+        for rec in records:
+            cumulative = 0
+            for le, count in rec["latency_buckets"].items():
+                cumulative += count
+                le_label = ',le="' + le + '"'
+                lines.append(f"{name}_bucket{labels(rec, le_label)} {cumulative}")
+            lines.append(f"{name}_sum{labels(rec)} {rec['latency_sum']}")
+            lines.append(f"{name}_count{labels(rec)} {rec['calls']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, outdir: str, suffix: str = "") -> tuple[str, str]:
+        """Write ``api-metrics.json`` and a node-exporter textfile ``api-metrics.prom``.
+
+        ``suffix`` is inserted before the extension (``api-metrics.shard-1-of-4.json``).
+        """
+        os.makedirs(outdir, exist_ok=True)
+        json_path = os.path.join(outdir, METRICS_JSON.replace(".json", f"{suffix}.json"))
+        prom_path = os.path.join(outdir, METRICS_PROM.replace(".prom", f"{suffix}.prom"))
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"latency_buckets": LATENCY_BUCKETS, "operations": self.snapshot()},
+                      f, indent=2)
+        # Written to a temp file and renamed, as the textfile collector may read at any time.
+        tmp = f"{prom_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, prom_path)
+        return json_path, prom_path
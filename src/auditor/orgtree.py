@@ -0,0 +1,114 @@
+"""Snapshot of the AWS Organization: OUs, accounts and account status.
+
+The tree is walked from the root with ``list_organizational_units_for_parent``
+and ``list_accounts_for_parent`` and cached on disk for ``ttl_hours``, so a
+run normally makes no Organizations calls at all. Account selection by OU and
+status happens on the snapshot, before any role is assumed.
+"""
+from __future__ import annotations
+import json
+import os
+import time
+
+from .fetch import fetch
+
+
+class OrgTree:
+    def __init__(self, root_id: str, ous: dict[str, dict], accounts: list[dict]):
+        self.root_id = root_id
+        self.ous = ous            # OU ID -> {"name", "parent"}
+        self.accounts = accounts  # [{"id", "name", "status", "parent"}]
+        self._ancestors: dict[str, tuple[str, ...]] = {}
+
+    @classmethod
+    def fetch(cls, client) -> OrgTree:
+        root_id = next(fetch(client, "list_roots", "Roots"))["Id"]
+        ous: dict[str, dict] = {}
+        accounts: list[dict] = []
+        parents = [root_id]
+        while parents:
+            parent = parents.pop()
+            for a in fetch(client, "list_accounts_for_parent", "Accounts", ParentId=parent):
+                # `State` supersedes the deprecated `Status` in newer API responses.
+                accounts.append({"id": a["Id"], "name": a.get("Name"),
+                                 "status": a.get("State") or a.get("Status", "ACTIVE"),
+                                 "parent": parent})
+            for ou in fetch(client, "list_organizational_units_for_parent",
+                            "OrganizationalUnits", ParentId=parent):
+                ous[ou["Id"]] = {"name": ou.get("Name", ou["Id"]), "parent": parent}
+                parents.append(ou["Id"])
+        accounts.sort(key=lambda a: a["id"])
+        return cls(root_id, ous, accounts)
+
+    def to_dict(self) -> dict:
+        return {"root": self.root_id, "ous": self.ous, "accounts": self.accounts}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> OrgTree:
+        return cls(d["root"], d["ous"], d["accounts"])
+
+    def ancestors(self, parent: str) -> tuple[str, ...]:
+        """``parent`` and every OU above it, up to and including the root."""
+        if parent not in self._ancestors:
+            ou = self.ous.get(parent)
+            above = self.ancestors(ou["parent"]) if ou else ()
+            self._ancestors[parent] = (parent, *above)
+        return self._ancestors[parent]
+
+    def path(self, ou_id: str) -> str:
+        """``"Prod/Web"`` for an OU; the root is ``""``."""
+        names = [self.ous[o]["name"] for o in self.ancestors(ou_id) if o in self.ous]
+        return "/".join(reversed(names))
+
+    def resolve(self, ref: str) -> str:
+        """An OU ID (``ou-...``, ``r-...``) or a name path (``Prod/Web``) -> OU ID."""
+        if ref == self.root_id or ref in self.ous:
+            return ref
+        wanted = ref.strip("/")
+        if wanted in ("", "Root"):
+            return self.root_id
+        wanted = wanted.removeprefix("Root/")
+        for ou_id in self.ous:
+            if self.path(ou_id) == wanted:
+                return ou_id
+        raise ValueError(f"Unknown organizational unit {ref!r}")
+
+    def select(self, include: list[str] | None = None,
+               exclude: list[str] | None = None) -> list[dict]:
+        """Accounts under any ``include`` OU (all if empty) and under no ``exclude`` OU."""
+        inc = {self.resolve(r) for r in include or ()}
+        exc = {self.resolve(r) for r in exclude or ()}
+        selected = []
+        for a in self.accounts:
+            above = self.ancestors(a["parent"])
+            if inc and inc.isdisjoint(above):
+                continue
+            if not exc.isdisjoint(above):
+                continue
+            selected.append(a)
+        return selected
+
+
+def load_org_tree(path: str, ttl_hours: float, client=None) -> OrgTree:
+    """The cached snapshot at ``path`` if younger than ``ttl_hours``, else a fresh walk."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if time.time() - cached["fetched_at"] <= ttl_hours * 3600:
+            tree = OrgTree.from_dict(cached)
+            print(f"[INFO] Organization: {len(tree.accounts)} accounts, {len(tree.ous)} OUs "
+                  f"(cached {os.path.basename(path)})")
+            return tree
+    except (OSError, ValueError, KeyError):
+        pass
+    if client is None:
+        from .aws_clients import org_client
+        client = org_client()
+    tree = OrgTree.fetch(client)
+    print(f"[INFO] Organization: {len(tree.accounts)} accounts, {len(tree.ous)} OUs (fetched)")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"fetched_at": time.time(), **tree.to_dict()}, f)
+    os.replace(tmp, path)
+    return tree
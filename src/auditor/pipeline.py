@@ -0,0 +1,95 @@
+from __future__ import annotations
+import itertools
+import threading
+from functools import partial
+from typing import Callable, Iterable
+
+from .findings import Finding
+
+
+class FindingsPipeline:
+    """Streams findings from concurrently running units to the writers in unit order.
+
+    Rows of the lowest unfinished unit (the head) go straight to disk; rows
+    of units ahead of it are held only until the head catches up, so output
+    order matches the unit list no matter how units were scheduled. A unit
+    whose ``sink()`` is given a ``spool`` (its findings already stored on
+    disk, in order) is only counted while it waits and read back from the
+    spool, so waiting units cost no memory. Writers are flushed whenever a
+    unit finishes, so a crash keeps completed units.
+
+    ``processors`` see every finding before the writers, in order; each has
+    ``process(finding)`` returning the (possibly updated) finding or None to
+    drop it, and ``flush()``.
+    """
+
+    def __init__(self, writers: list, processors: list | None = None):
+        self.writers = writers
+        self.processors = processors or []
+        self.count = 0
+        self._lock = threading.Lock()
+        self._head = 0
+        self._pending: dict[int, list | int] = {}
+        self._spools: dict[int, Iterable[Finding]] = {}
+        self._done: set[int] = set()
+
+    def _write(self, finding: Finding):
+        for p in self.processors:
+            finding = p.process(finding)
+            if finding is None:
+                return
+        self._put(finding)
+
+    def _put(self, finding: Finding):
+        for w in self.writers:
+            w.write(finding)
+        self.count += 1
+
+    def emit(self, index: int, finding: Finding):
+        with self._lock:
+            if index == self._head:
+                self._write(finding)
+            elif index in self._spools:
+                self._pending[index] = self._pending.get(index, 0) + 1
+            else:
+                self._pending.setdefault(index, []).append(finding)
+
+    def sink(self, index: int, spool: Iterable[Finding] | None = None
+             ) -> Callable[[Finding], None]:
+        if spool is not None:
+            with self._lock:
+                self._spools[index] = spool
+        return partial(self.emit, index)
+
+    def _release(self, index: int):
+        """Write the rows ``index`` emitted before it became the head."""
+        held = self._pending.pop(index, ())
+        spool = self._spools.pop(index, None)
+        if isinstance(held, int):
+            held = itertools.islice(spool, held)
+        for finding in held:
+            self._write(finding)
+
+    def unit_done(self, index: int):
+        with self._lock:
+            self._done.add(index)
+            while self._head in self._done:
+                self._done.discard(self._head)
+                self._head += 1
+                self._release(self._head)
+            for p in self.processors:
+                p.flush()
+            for w in self.writers:
+                w.flush()
+
+    def append(self, finding: Finding):
+        """Write a finding after all units, bypassing the processors."""
+        with self._lock:
+            self._put(finding)
+
+    def close(self) -> list[str]:
+        with self._lock:
+            # Units that never reported done (e.g. an aborted run) keep their rows.
+            for index in sorted(self._pending):
+                self._release(index)
+            return [w.close() for w in self.writers]
@@ -0,0 +1,288 @@
+"""Pre-flight planning: estimated API calls, rate limiting and wall time of a run.
+
+``plan`` assumes into each target account and runs a few cheap count probes
+per account and region: users, buckets, functions and DB instances. Each
+check's cost model in the registry turns the counts into calls per unit
+(``base_calls + calls_per_resource * count``). A unit lasts as long as its
+calls take at ``parallel_calls`` in flight, or longer when its operations'
+``rate_limits`` cannot keep up; the difference is time spent waiting on the
+rate limiter. The run's wall time follows from the scheduler's
+global, per-account and per-service limits.
+"""
+from __future__ import annotations
+import json
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+
+from .assume import get_target_accounts, session_for
+from .config import Concurrency
+from .main import _active_regions
+from .metrics import METRICS_JSON
+from .ratelimit import RateLimiter
+from .regions import RegionCache
+from .registry import SCANNERS, ScannerSpec, select
+from .tags import RESOURCES_PER_PAGE
+
+# Seconds per API call when no earlier run's api-metrics.json says otherwise.
+DEFAULT_LATENCY = 0.1
+# Candidate settings for the recommendation; the smallest within GOOD_ENOUGH
+# of the fastest wins, so threads are not added for a marginal gain.
+WORKER_CHOICES = (4, 8, 16, 32, 64, 128, 256)
+PER_ACCOUNT_CHOICES = (1, 2, 4, 8, 16)
+GOOD_ENOUGH = 1.1
+# Checks whose findings carry tags: their first use in an (account, region)
+# walks resourcegroupstaggingapi:GetResources, a page per RESOURCES_PER_PAGE.
+TAGGED_CHECKS = ("ec2", "ec2-eips", "rds", "s3", "lambda")
+
+
+def _count_users(session, region):
+    return session.client("iam").get_account_summary()["SummaryMap"].get("Users", 0)
+
+def _count_buckets(session, region):
+    s3 = session.client("s3", region_name="us-east-1")
+    return len(s3.list_buckets().get("Buckets", []))
+
+def _count_functions(session, region):
+    lam = session.client("lambda", region_name=region)
+    return lam.get_account_settings()["AccountUsage"]["FunctionCount"]
+
+def _count_db_instances(session, region):
+    rds = session.client("rds", region_name=region)
+    quotas = rds.describe_account_attributes().get("AccountQuotas", [])
+    return next((q["Used"] for q in quotas if q["AccountQuotaName"] == "DBInstances"), 0)
+
+# Check name -> (what is counted, probe). Checks without a probe cost their base calls.
+# Security groups are not counted: paging through them costs as much as the ec2
+# scan itself, whose cost model does not depend on the count.
+COUNT_PROBES = {
+    "iam": ("users", _count_users),
+    "s3": ("buckets", _count_buckets),
+    "lambda": ("functions", _count_functions),
+    "rds": ("DB instances", _count_db_instances),
+}
+
+
+@dataclass
+class UnitEstimate:
+    account_id: str
+    region: str
+    check: str
+    resources: int | None  # None: not probed, or the probe failed
+    calls: float
+    seconds: float
+    wait_seconds: float  # part of ``seconds`` spent waiting on the rate limiter
+    paced_calls: float  # calls that had to wait for a token
+
+
+def load_latencies(outdir: str) -> dict[str, float]:
+    """Mean latency per ``service:Operation`` from an earlier run's api-metrics.json."""
+    try:
+        with open(os.path.join(outdir, METRICS_JSON), encoding="utf-8") as f:
+            records = json.load(f)["operations"]
+    except (OSError, ValueError, KeyError):
+        return {}
+    totals: dict[str, list[float]] = defaultdict(lambda: [0, 0.0])
+    for rec in records:
+        t = totals[f"{rec['service']}:{rec['operation']}"]
+        t[0] += rec["calls"]
+        t[1] += rec["latency_sum"]
+    return {op: total / calls for op, (calls, total) in totals.items() if calls}
+
+
+def estimate_unit(spec: ScannerSpec, account_id: str, region: str, resources: int | None,
+                  limiter: RateLimiter, latencies: dict[str, float] | None = None,
+                  default_latency: float = DEFAULT_LATENCY) -> UnitEstimate:
+    """Calls and duration of one unit.
+
+    Calls are spread evenly over the check's operations, each with its own
+    token bucket, so the slowest bucket paces them all.
+    """
+    calls = spec.base_calls + spec.calls_per_resource * (resources or 0)
+    ops = spec.operations or (f"{spec.service}:",)
+    latencies = latencies or {}
+    latency = sum(latencies.get(op, default_latency) for op in ops) / len(ops)
+    demand = spec.parallel_calls / latency  # calls/s with nothing in the way
+    limit = len(ops) * min(limiter.rate_for(*op.split(":", 1)) for op in ops)
+    busy = calls / demand
+    if demand <= limit:
+        return UnitEstimate(account_id, region, spec.name, resources, calls, busy, 0.0, 0.0)
+    limited = calls / limit
+    return UnitEstimate(account_id, region, spec.name, resources, calls, limited,
+                        limited - busy, calls * (1 - limit / demand))
+
+
+def wall_time(units: list[UnitEstimate], concurrency: Concurrency) -> float:
+    """Estimated wall time of the scheduler running ``units`` under ``concurrency``.
+
+    The largest of the lower bounds set by the global pool, the busiest
+    account under ``per_account``, each ``per_service`` cap and the longest
+    unit. Greedy scheduling stays within twice this bound, and close to it
+    when there are many short units.
+    """
+    if not units:
+        return 0.0
+    workers = concurrency.max_workers
+    per_account: dict[str, float] = defaultdict(float)
+    per_check: dict[str, float] = defaultdict(float)
+    for u in units:
+        per_account[u.account_id] += u.seconds
+        per_check[u.check] += u.seconds
+    bounds = [sum(per_account.values()) / workers, max(u.seconds for u in units),
+              max(per_account.values()) / min(concurrency.per_account, workers)]
+    for check, seconds in per_check.items():
+        cap = concurrency.per_service.get(check)
+        if cap:
+            bounds.append(seconds / min(cap, workers))
+    return max(bounds)
+
+
+def recommend(units: list[UnitEstimate], current: Concurrency) -> Concurrency:
+    """The smallest ``max_workers`` / ``per_account`` nearly as fast as any candidate.
+
+    ``per_service`` caps are kept. The HTTP pool must fit a unit's parallel calls.
+    """
+    candidates = [replace(current, max_workers=w, per_account=p)
+                  for w in WORKER_CHOICES for p in PER_ACCOUNT_CHOICES if p <= w]
+    times = [wall_time(units, c) for c in candidates]
+    best = min(times)
+    chosen = next(c for c, t in zip(candidates, times) if t <= best * GOOD_ENOUGH)
+    pool = max([current.max_pool_connections]
+               + [SCANNERS[u.check].parallel_calls for u in units if u.check in SCANNERS])
+    return replace(chosen, max_pool_connections=pool)
+
+
+def format_duration(seconds: float) -> str:
+    seconds = round(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+
+
+def probe_units(conf, checks: list[ScannerSpec], factory, latencies: dict[str, float],
+                default_latency: float = DEFAULT_LATENCY) -> tuple[list[UnitEstimate], dict]:
+    """Count resources for every unit and estimate it; also returns run-wide overheads."""
+    cache = RegionCache(os.path.join(conf.output_dir, "regions-cache.json"),
+                        conf.region_discovery.cache_ttl_hours)
+    sessions, regions = {}, {}
+    accounts = get_target_accounts(conf)
+    for acct in accounts:
+        try:
+            sess = session_for(acct.id, conf, factory)
+            acct_regions = conf.regions or cache.regions_for(sess, acct.id)
+            if conf.region_discovery.activity_probe:
+                acct_regions = _active_regions(sess, acct, acct_regions, conf)
+        except Exception as e:
+            print(f"[WARN] {acct.id}: {e}", file=sys.stderr)
+            continue
+        sessions[acct.id], regions[acct.id] = sess, acct_regions
+
+    keys = [(a, "global" if spec.is_global else r, spec)
+            for a in sessions for spec in checks
+            for r in (["global"] if spec.is_global else regions[a])]
+
+    def count(key):
+        account_id, region, spec = key
+        probe = COUNT_PROBES.get(spec.name)
+        if probe is None:
+            return None
+        try:
+            return probe[1](sessions[account_id], None if region == "global" else region)
+        except Exception as e:
+            print(f"[WARN] {account_id} {region} {spec.name}: count probe failed ({e})",
+                  file=sys.stderr)
+            return None
+
+    with ThreadPoolExecutor(max_workers=conf.concurrency.max_workers) as pool:
+        counts = list(pool.map(count, keys))
+    limiter = RateLimiter(conf.rate_limits)
+    units = [estimate_unit(spec, a, r, n, limiter, latencies, default_latency)
+             for (a, r, spec), n in zip(keys, counts)]
+    tagged = {(u.account_id, u.region) for u in units if u.check in TAGGED_CHECKS}
+    tagged_resources = sum(u.resources or 0 for u in units if u.check in TAGGED_CHECKS)
+    overhead = {"accounts": len(accounts), "assumed": len(sessions),
+                "regions": sum(len(r) for r in regions.values()),
+                "role_assumptions": len(sessions),
+                "tag_calls": len(tagged) + tagged_resources / RESOURCES_PER_PAGE}
+    return units, overhead
+
+
+def report(units: list[UnitEstimate], overhead: dict, concurrency: Concurrency,
+           checks: list[ScannerSpec]) -> list[str]:
+    lines = [f"[INFO] plan: {overhead['assumed']} of {overhead['accounts']} accounts, "
+             f"{overhead['regions']} account-regions, {len(units)} units"]
+    lines.append(f"{'check':<14}{'units':>7}{'resources':>24}{'calls':>10}"
+                 f"{'unit time':>11}{'paced calls':>13}{'rate wait':>11}")
+    for spec in checks:
+        mine = [u for u in units if u.check == spec.name]
+        if not mine:
+            continue
+        probed = [u.resources for u in mine if u.resources is not None]
+        what = COUNT_PROBES[spec.name][0] if spec.name in COUNT_PROBES else ""
+        resources = f"{sum(probed)} {what}" if probed else "-"
+        if probed and len(probed) < len(mine):
+            resources += f" ({len(mine) - len(probed)} unknown)"
+        lines.append(
+            f"{spec.name:<14}{len(mine):>7}{resources:>24}{sum(u.calls for u in mine):>10.0f}"
+            f"{format_duration(sum(u.seconds for u in mine)):>11}"
+            f"{sum(u.paced_calls for u in mine):>13.0f}"
+            f"{format_duration(sum(u.wait_seconds for u in mine)):>11}")
+    calls = sum(u.calls for u in units)
+    extra = overhead["role_assumptions"] + overhead["tag_calls"]
+    lines.append(f"[INFO] plan: ~{calls + extra:,.0f} API calls, including "
+                 f"{overhead['role_assumptions']} role assumptions and "
+                 f"~{overhead['tag_calls']:.0f} tag index calls")
+    paced = sum(u.paced_calls for u in units)
+    if paced:
+        worst = max(checks, key=lambda s: sum(u.wait_seconds for u in units
+                                               if u.check == s.name))
+        lines.append(f"[RATE] plan: ~{paced:,.0f} calls ({paced / calls:.0%}) paced by "
+                     f"rate_limits, {format_duration(sum(u.wait_seconds for u in units))} "
+                     f"of waiting; most in {worst.name} ({', '.join(worst.operations)})")
+    else:
+        lines.append("[RATE] plan: no unit is expected to outrun its rate limits")
+    estimate = format_duration(wall_time(units, concurrency))
+    lines.append(f"[INFO] plan: estimated wall time {estimate} at "
+                 f"max_workers={concurrency.max_workers}, per_account={concurrency.per_account}")
+    best = recommend(units, concurrency)
+    lines.append(f"[INFO] plan: recommended settings, estimated wall time "
+                 f"{format_duration(wall_time(units, best))}:")
+    lines += ["concurrency:",
+              f"  max_workers: {best.max_workers}",
+              f"  per_account: {best.per_account}",
+              f"  max_pool_connections: {best.max_pool_connections}"]
+    if best.per_service:
+        lines.append("  per_service:")
+        lines += [f"    {k}: {v}" for k, v in sorted(best.per_service.items())]
+    return lines
+
+
+def plan(config_path: str, only: list[str] | None, outdir: str | None,
+         workers: int | None = None, per_account: int | None = None,
+         latency: float | None = None, include_ous: list[str] | None = None):
+    from .config import load_config
+    conf = load_config(config_path)
+    if outdir:
+        conf.output_dir = outdir
+    if include_ous:
+        conf.organization.include_ous = include_ous
+    concurrency = replace(conf.concurrency,
+                          max_workers=workers or conf.concurrency.max_workers,
+                          per_account=per_account or conf.concurrency.per_account)
+    # Latencies measured by an earlier run beat a guess; --latency overrides both.
+    latencies = {} if latency else load_latencies(conf.output_dir)
+    if latencies:
+        print(f"[INFO] plan: using call latencies from {conf.output_dir}/{METRICS_JSON}")
+    from .aws_clients import ClientFactory
+    factory = ClientFactory.from_config(conf)
+    checks = select(only)
+    units, overhead = probe_units(conf, checks, factory, latencies,
+                                  latency or DEFAULT_LATENCY)
+    probe_calls = sum(rec["calls"] for rec in factory.metrics.snapshot())
+    print(f"[INFO] plan: count probes made {probe_calls} API calls")
+    for line in report(units, overhead, concurrency, checks):
+        print(line)
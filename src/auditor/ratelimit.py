@@ -0,0 +1,144 @@
+from __future__ import annotations
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+from .config import RateLimits
+
+THROTTLE_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "TooManyRequestsException",
+    "SlowDown",
+}
+
+# AIMD: halve the rate on a throttle, then creep back towards the configured
+# rate by a small fraction of it on every successful call.
+DECREASE_FACTOR = 0.5
+INCREASE_FRACTION = 0.05
+MIN_RATE = 0.2
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float | None = None):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available. Returns seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            # A negative balance is a reservation: wait until it is paid back.
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def throttled(self):
+        with self._lock:
+            self.rate = max(MIN_RATE, self.rate * DECREASE_FACTOR)
+            self.tokens = min(self.tokens, 0.0)
+
+    def succeeded(self):
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * INCREASE_FRACTION)
+
+
+@dataclass
+class OperationStats:
+    calls: int = 0
+    wait_seconds: float = 0.0
+    throttles: int = 0
+    retries: int = 0
+
+
+class RateLimiter:
+    """Token buckets keyed by (account, region, service:Operation), shared by all clients.
+
+    ``attach()`` hooks a boto3 client's event system so every call takes a
+    token first, and throttling responses slow that bucket down.
+    """
+
+    def __init__(self, limits: RateLimits):
+        self.limits = limits
+        self._buckets: dict[tuple, TokenBucket] = {}
+        self._stats: dict[str, OperationStats] = defaultdict(OperationStats)
+        self._lock = threading.Lock()
+
+    def rate_for(self, service: str, operation: str) -> float:
+        ov = self.limits.overrides
+        return ov.get(f"{service}:{operation}", ov.get(service, self.limits.default))
+
+    def bucket(self, account_id: str, region: str, service: str, operation: str) -> TokenBucket:
+        key = (account_id, region, service, operation)
+        b = self._buckets.get(key)
+        if b is None:
+            with self._lock:
+                b = self._buckets.setdefault(
+                    key, TokenBucket(self.rate_for(service, operation), self.limits.burst))
+        return b
+
+    def _record(self, service: str, operation: str, calls=0, waited=0.0, throttles=0, retries=0):
+        with self._lock:
+            st = self._stats[f"{service}:{operation}"]
+            st.calls += calls
+            st.wait_seconds += waited
+            st.throttles += throttles
+            st.retries += retries
+
+    def attach(self, client, account_id: str, region: str | None):
+        service = client.meta.service_model.service_name
+        region = region or "global"
+
+        def before_call(model, **kwargs):
+            waited = self.bucket(account_id, region, service, model.name).acquire()
+            self._record(service, model.name, calls=1, waited=waited)
+
+        def after_call(model, parsed, **kwargs):
+            if "Error" not in parsed:
+                self.bucket(account_id, region, service, model.name).succeeded()
+
+        def needs_retry(operation, attempts=1, response=None, **kwargs):
+            if response is None:
+                return None
+            code = response[1].get("Error", {}).get("Code")
+            if code not in THROTTLE_CODES:
+                return None
+            b = self.bucket(account_id, region, service, operation.name)
+            b.throttled()
+            if attempts >= self.limits.max_attempts:
+                self._record(service, operation.name, throttles=1)
+                return None
+            # The retry also has to pass the (now slower) bucket.
+            self._record(service, operation.name, waited=b.acquire(), throttles=1, retries=1)
+            return None  # let botocore's retry handler decide and back off
+
+        events = client.meta.events
+        events.register("before-call.*.*", before_call)
+        events.register("after-call.*.*", after_call)
+        events.register_first("needs-retry.*.*", needs_retry)
+        return client
+
+    def summary(self, top: int = 10) -> list[str]:
+        with self._lock:
+            stats = sorted(self._stats.items(), key=lambda kv: kv[1].wait_seconds, reverse=True)
+        lines = []
+        for op, st in stats[:top]:
+            if not (st.wait_seconds or st.throttles):
+                continue
+            lines.append(f"[RATE] {op}: {st.calls} calls, waited {st.wait_seconds:.1f}s, "
+                         f"{st.throttles} throttles, {st.retries} retries")
+        return lines
@@ -0,0 +1,90 @@
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+
+
+def discover_regions(session):
+    ec2 = session.client("ec2", region_name="us-east-1")
+    resp = ec2.describe_regions(AllRegions=False)
+    return sorted([r["RegionName"] for r in resp.get("Regions", [])])
+
+
+class RegionCache:
+    """On-disk cache of each account's enabled regions, valid for ``ttl_hours``."""
+
+    def __init__(self, path: str, ttl_hours: float = 24):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._data = json.load(f)
+        except (OSError, ValueError):
+            self._data = {}
+
+    def get(self, account_id: str) -> list[str] | None:
+        entry = self._data.get(account_id)
+        if not entry or time.time() - entry["fetched_at"] > self.ttl:
+            return None
+        return entry["regions"]
+
+    def put(self, account_id: str, regions: list[str]):
+        with self._lock:
+            self._data[account_id] = {"regions": list(regions), "fetched_at": time.time()}
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f)
+            os.replace(tmp, self.path)
+
+    def regions_for(self, session, account_id: str) -> list[str]:
+        regions = self.get(account_id)
+        if regions is None:
+            regions = discover_regions(session)
+            self.put(account_id, regions)
+        return regions
+
+
+# Activity probes: one cheap, single-page call each. Default security groups
+# and VPCs exist everywhere, so they are deliberately not used as signals.
+def _probe_tagging(session, region):
+    tagging = session.client("resourcegroupstaggingapi", region_name=region)
+    return bool(tagging.get_resources(ResourcesPerPage=1).get("ResourceTagMappingList"))
+
+def _probe_lambda(session, region):
+    lam = session.client("lambda", region_name=region)
+    return bool(lam.list_functions(MaxItems=1).get("Functions"))
+
+def _probe_ec2(session, region):
+    ec2 = session.client("ec2", region_name=region)
+    return bool(ec2.describe_instances(MaxResults=5).get("Reservations"))
+
+def _probe_eip(session, region):
+    ec2 = session.client("ec2", region_name=region)
+    return bool(ec2.describe_addresses().get("Addresses"))
+
+def _probe_rds(session, region):
+    rds = session.client("rds", region_name=region)
+    return bool(rds.describe_db_instances(MaxRecords=20).get("DBInstances"))
+
+ACTIVITY_PROBES = {
+    "tagging": _probe_tagging,
+    "lambda": _probe_lambda,
+    "ec2": _probe_ec2,
+    "eip": _probe_eip,
+    "rds": _probe_rds,
+}
+
+
+def region_is_active(session, region: str, probes: list[str]) -> bool:
+    """True as soon as any probe finds a resource. A failing probe counts as
+    active, so missing permissions never hide a region."""
+    for name in probes:
+        try:
+            if ACTIVITY_PROBES[name](session, region):
+                return True
+        except Exception:
+            return True
+    return False
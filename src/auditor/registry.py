@@ -0,0 +1,92 @@
+from __future__ import annotations
+import importlib
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class ScannerSpec:
+    """A registered check, imported only when a run selects it.
+
+    ``target`` is ``"module:function"`` relative to ``auditor.scanners``.
+    Generator scanners take ``(session, account_id, region, conf)``; with
+    ``appends=True`` the function is an older-style check taking
+    ``(session, account_id, region, findings)`` that appends to a list.
+    ``base_calls`` and ``calls_per_resource`` are the expected API cost of
+    one unit, used by ``plan``; the calls go to ``operations``
+    (``"service:Operation"``, as in ``rate_limits.overrides``), at most
+    ``parallel_calls`` at a time. Under ``--time-budget`` units run in
+    ``priority`` order: 0 for cheap checks with high-severity findings,
+    2 for expensive ones (metrics, key history) that run only if time remains.
+    """
+    name: str
+    service: str
+    target: str
+    scope: str = "regional"  # "global" checks run once per account
+    finding_services: tuple[str, ...] = ()
+    base_calls: int = 1
+    calls_per_resource: float = 0.0
+    operations: tuple[str, ...] = ()
+    parallel_calls: int = 1
+    appends: bool = False
+    priority: int = 1
+    _loaded: dict = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def is_global(self) -> bool:
+        return self.scope == "global"
+
+    def load(self) -> Callable:
+        fn = self._loaded.get("fn")
+        if fn is None:
+            module, func = self.target.split(":")
+            fn = getattr(importlib.import_module(f"auditor.scanners.{module}"), func)
+            if self.appends:
+                fn = _collecting(fn)
+            self._loaded["fn"] = fn
+        return fn
+
+
+def _collecting(check: Callable) -> Callable:
+    def scan(session, account_id, region, conf):
+        findings = []
+        check(session, account_id, region, findings)
+        return findings
+    scan.__name__ = check.__name__
+    return scan
+
+
+SCANNERS: dict[str, ScannerSpec] = {spec.name: spec for spec in (
+    ScannerSpec("iam", "iam", "iam:scan_iam", scope="global", finding_services=("IAM",),
+                base_calls=2, operations=("iam:GenerateCredentialReport",
+                                          "iam:GetCredentialReport"), priority=2),
+    ScannerSpec("s3", "s3", "s3:scan_s3", scope="global", finding_services=("S3",),
+                base_calls=1, calls_per_resource=6, priority=0,
+                operations=("s3:GetBucketLocation", "s3:GetBucketPolicyStatus",
+                            "s3:GetBucketAcl", "s3:GetBucketEncryption",
+                            "s3:GetBucketVersioning", "s3:GetBucketLifecycleConfiguration"),
+                parallel_calls=16),  # scanners.s3.PROBE_WORKERS
+    ScannerSpec("ec2", "ec2", "ec2:scan_ec2", finding_services=("EC2",), priority=0,
+                operations=("ec2:DescribeSecurityGroups",)),
+    ScannerSpec("lambda", "lambda", "lambda_svc:scan_lambda", finding_services=("Lambda",),
+                # list_functions pages of 50, GetMetricData batches of 500
+                base_calls=2, calls_per_resource=1 / 50 + 1 / 500, priority=2,
+                operations=("lambda:ListFunctions", "cloudwatch:GetMetricData")),
+    ScannerSpec("rds", "rds", "rds:scan_rds", finding_services=("RDS",), priority=0,
+                operations=("rds:DescribeDBInstances",)),
+    ScannerSpec("ec2-eips", "ec2", "ec2:scan_ec2_unused_eips", finding_services=("EC2",),
+                operations=("ec2:DescribeAddresses",), appends=True),
+    ScannerSpec("rds-snapshots", "rds", "rds:scan_rds_public_snapshots",
+                finding_services=("RDS",), operations=("rds:DescribeDBSnapshots",),
+                appends=True, priority=0),
+)}
+
+
+def select(only: list[str] | None) -> list[ScannerSpec]:
+    """Checks matching ``--only`` entries, by check name or service; all when empty."""
+    if not only:
+        return list(SCANNERS.values())
+    unknown = set(only) - set(SCANNERS) - {s.service for s in SCANNERS.values()}
+    if unknown:
+        raise ValueError(f"Unknown checks or services: {', '.join(sorted(unknown))}")
+    return [s for s in SCANNERS.values() if s.name in only or s.service in only]
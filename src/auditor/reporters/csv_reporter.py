@@ -2,17 +2,36 @@ from __future__ import annotations
 import csv
 import os
 
-def write_csv(findings: list[dict], outdir: str):
-    os.makedirs(outdir, exist_ok=True)
-    path = os.path.join(outdir, "findings.csv")
-    if not findings:
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            f.write("")
-        return path
-    keys = ["account_id","region","service","resource_id","severity","title","details","remediation"]
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=keys)
-        w.writeheader()
-        for row in findings:
-            w.writerow({k: row.get(k, "") for k in keys})
-    return path
+from ..findings import Finding
+
+KEYS = ["account_id","region","service","resource_id","severity","title","details","remediation",
+        "status"]
+
+class CsvWriter:
+    """Appends findings to findings.csv one row at a time."""
+
+    def __init__(self, outdir: str):
+        os.makedirs(outdir, exist_ok=True)
+        self.path = os.path.join(outdir, "findings.csv")
+        self._f = open(self.path, "w", newline="", encoding="utf-8")
+        self._w = None
+
+    def write(self, row: Finding):
+        if self._w is None:
+            # Header only once there is a row; an empty run leaves an empty file.
+            self._w = csv.DictWriter(self._f, fieldnames=KEYS)
+            self._w.writeheader()
+        self._w.writerow({k: getattr(row, k) for k in KEYS})
+
+    def flush(self):
+        self._f.flush()
+
+    def close(self) -> str:
+        self._f.close()
+        return self.path
+
+def write_csv(findings, outdir: str):
+    w = CsvWriter(outdir)
+    for row in findings:
+        w.write(row)
+    return w.close()
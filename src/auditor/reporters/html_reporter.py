@@ -1,6 +1,22 @@
 from __future__ import annotations
+import glob
+import json
 import os
-from jinja2 import Template
+from collections import Counter
+from typing import Iterable
+
+from ..findings import Finding
+
+# Findings are paged in the browser in chunks of this many rows. A report with
+# at most one chunk embeds it; larger ones write findings-data/chunk-NNNNN.js
+# files next to the page (script files, so the report also opens from file://).
+CHUNK_SIZE = 5000
+DATA_DIR = "findings-data"
+SEVERITIES = ("HIGH", "MEDIUM", "LOW")
+# Skipped units listed in full on the page; the rest are only in skipped-units.json.
+MAX_SKIPPED_ROWS = 500
+ROW_FIELDS = ("account_id", "region", "service", "resource_id", "severity", "title",
+              "details", "remediation", "status")
 
 HTML = """
 <!doctype html>
@@ -11,49 +27,257 @@ HTML = """
   <style>
     body { font-family: system-ui, Arial, sans-serif; margin: 24px; }
     h1 { margin-bottom: 0; }
+    h2 { margin-top: 32px; }
     .meta { color: #666; margin-top: 4px; }
     table { border-collapse: collapse; width: 100%; margin-top: 16px; }
+    table.summary { width: auto; }
     th, td { border: 1px solid #ddd; padding: 8px; font-size: 14px; }
     th { background: #f6f6f6; text-align: left; }
+    td.n { text-align: right; }
     tr:nth-child(even) { background: #fafafa; }
     .sev-HIGH { color: #b30000; font-weight: bold; }
     .sev-MEDIUM { color: #b36b00; font-weight: bold; }
     .sev-LOW { color: #006bb3; font-weight: bold; }
+    .status-new { font-weight: bold; }
+    .status-resolved { color: #2e7d32; text-decoration: line-through; }
+    .pager { margin-top: 16px; }
+    .partial { background: #fff4e5; border: 1px solid #b36b00; padding: 8px; }
+    .pager button, .pager select { margin-right: 8px; }
   </style>
 </head>
 <body>
 <h1>AWS Resource Auditor Report</h1>
-<div class="meta">Generated at: {{ generated_at }}</div>
+<div class="meta">Generated at: {{ generated_at }} &middot; {{ total }} findings
+{%- for status, n in by_status.items() if status %} &middot; {{ n }} {{ status }}{% endfor %}
+{%- if suppressed_total %} &middot; {{ suppressed_total }} suppressed by waivers{% endif %}</div>
+{% if skipped %}
+<p class="partial"><strong>Partial report:</strong> the time budget ran out before
+{{ skipped|length }} units were scanned; their findings are missing below.</p>
+{% endif %}
+
+<h2>By severity</h2>
+<table class="summary">
+  <tr>{% for sev in severities %}<th class="sev-{{ sev }}">{{ sev }}</th>{% endfor %}<th>Total</th></tr>
+  <tr>{% for sev in severities %}<td class="n">{{ by_severity[sev] }}</td>{% endfor %}<td class="n">{{ total }}</td></tr>
+</table>
+
+<h2>By service</h2>
+<table class="summary">
+  <tr><th>Service</th>{% for sev in severities %}<th class="sev-{{ sev }}">{{ sev }}</th>{% endfor %}<th>Total</th></tr>
+  {% for service, counts in by_service %}
+  <tr><td>{{ service }}</td>{% for sev in severities %}<td class="n">{{ counts[sev] }}</td>{% endfor %}<td class="n">{{ counts.total() }}</td></tr>
+  {% endfor %}
+</table>
+
+<h2>By account</h2>
+<table class="summary">
+  <tr><th>Account</th>{% for sev in severities %}<th class="sev-{{ sev }}">{{ sev }}</th>{% endfor %}<th>Total</th></tr>
+  {% for account, counts in by_account %}
+  <tr><td><a href="#" data-account="{{ account }}">{{ account }}</a></td>{% for sev in severities %}<td class="n">{{ counts[sev] }}</td>{% endfor %}<td class="n">{{ counts.total() }}</td></tr>
+  {% endfor %}
+</table>
+
+{% if skipped %}
+<h2>Skipped units</h2>
+<table class="summary">
+  <tr><th>Check</th><th>Units skipped</th></tr>
+  {% for check, n in skipped_by_check %}
+  <tr><td>{{ check }}</td><td class="n">{{ n }}</td></tr>
+  {% endfor %}
+</table>
+<table class="summary">
+  <tr><th>Account</th><th>Region</th><th>Check</th></tr>
+  {% for u in skipped[:max_skipped_rows] %}
+  <tr><td>{{ u.account_id }}</td><td>{{ u.region }}</td><td>{{ u.check }}</td></tr>
+  {% endfor %}
+</table>
+{% if skipped|length > max_skipped_rows %}
+<p>&hellip; and {{ skipped|length - max_skipped_rows }} more,
+listed in skipped-units.json.</p>
+{% endif %}
+{% endif %}
+
+{% if suppressed %}
+<h2>Suppressed by waiver</h2>
+<table class="summary">
+  <tr><th>Waiver</th><th>Reason</th><th>Findings</th></tr>
+  {% for waiver, reason, n in suppressed %}
+  <tr><td>{{ waiver }}</td><td>{{ reason }}</td><td class="n">{{ n }}</td></tr>
+  {% endfor %}
+</table>
+{% endif %}
+
+<h2>Findings</h2>
+<div class="pager">
+  <select id="account"><option value="">All accounts</option>
+  {% for account, counts in by_account %}<option>{{ account }}</option>{% endfor %}
+  </select>
+  <select id="severity"><option value="">All severities</option>
+  {% for sev in severities %}<option>{{ sev }}</option>{% endfor %}
+  </select>
+  <button id="prev">&laquo; Prev</button><span id="page"></span><button id="next">Next &raquo;</button>
+</div>
 <table>
   <thead>
     <tr>
-      <th>Account</th><th>Region</th><th>Service</th><th>Resource</th><th>Severity</th><th>Title</th><th>Details</th><th>Remediation</th>
+      <th>Account</th><th>Region</th><th>Service</th><th>Resource</th><th>Severity</th><th>Title</th><th>Details</th><th>Remediation</th><th>Status</th>
     </tr>
   </thead>
-  <tbody>
-  {% for f in findings %}
-    <tr>
-      <td>{{ f.account_id }}</td>
-      <td>{{ f.region }}</td>
-      <td>{{ f.service }}</td>
-      <td>{{ f.resource_id }}</td>
-      <td class="sev-{{ f.severity }}">{{ f.severity }}</td>
-      <td>{{ f.title }}</td>
-      <td>{{ f.details }}</td>
-      <td>{{ f.remediation }}</td>
-    </tr>
-  {% endfor %}
-  </tbody>
+  <tbody id="rows"></tbody>
 </table>
+<script>
+const REPORT = {{ report|tojson }};
+const chunks = {};
+const waiting = {};
+{% if inline is not none %}chunks[0] = {{ inline|tojson }};{% endif %}
+window.auditorChunk = function (n, rows) {
+  chunks[n] = rows;
+  (waiting[n] || []).forEach(function (cb) { cb(rows); });
+  delete waiting[n];
+};
+function loadChunk(n, cb) {
+  if (chunks[n]) return cb(chunks[n]);
+  if (waiting[n]) return waiting[n].push(cb);
+  waiting[n] = [cb];
+  const s = document.createElement("script");
+  s.src = REPORT.data_dir + "/chunk-" + String(n).padStart(5, "0") + ".js";
+  document.body.appendChild(s);
+}
+let pages = [], page = 0;
+function render() {
+  const account = document.getElementById("account").value;
+  const severity = document.getElementById("severity").value;
+  pages = account || severity ? REPORT.filter_chunks[account + "/" + severity] || []
+                              : [...Array(REPORT.chunks).keys()];
+  page = Math.min(page, Math.max(pages.length - 1, 0));
+  document.getElementById("page").textContent =
+    pages.length ? " Page " + (page + 1) + " of " + pages.length + " " : " No findings ";
+  const body = document.getElementById("rows");
+  body.replaceChildren();
+  if (!pages.length) return;
+  loadChunk(pages[page], function (rows) {
+    const frag = document.createDocumentFragment();
+    rows.forEach(function (r) {
+      if ((account && r[0] !== account) || (severity && r[4] !== severity)) return;
+      const tr = document.createElement("tr");
+      r.forEach(function (v, i) {
+        const td = document.createElement("td");
+        td.textContent = v;
+        if (i === 4) td.className = "sev-" + v;
+        if (i === 8) td.className = "status-" + v;
+        tr.appendChild(td);
+      });
+      frag.appendChild(tr);
+    });
+    body.appendChild(frag);
+  });
+}
+document.getElementById("account").onchange = function () { page = 0; render(); };
+document.getElementById("severity").onchange = function () { page = 0; render(); };
+document.getElementById("prev").onclick = function () { if (page > 0) { page--; render(); } };
+document.getElementById("next").onclick = function () {
+  if (page < pages.length - 1) { page++; render(); }
+};
+document.querySelectorAll("a[data-account]").forEach(function (a) {
+  a.onclick = function (e) {
+    e.preventDefault();
+    document.getElementById("account").value = a.dataset.account;
+    page = 0;
+    render();
+    document.getElementById("account").scrollIntoView();
+  };
+});
+render();
+</script>
 </body>
 </html>
 """
 
-def write_html(findings: list[dict], outdir: str, generated_at: str):
+
+class _ChunkWriter:
+    """Writes findings as fixed-size chunk files, holding one chunk in memory."""
+
+    def __init__(self, outdir: str):
+        self.dir = os.path.join(outdir, DATA_DIR)
+        for stale in glob.glob(os.path.join(self.dir, "chunk-*.js")):
+            os.remove(stale)
+        self.rows: list[list] = []
+        self.count = 0  # chunks written so far
+
+    def add(self, row: list):
+        if len(self.rows) == CHUNK_SIZE:
+            self._write()
+        self.rows.append(row)
+
+    def _write(self):
+        os.makedirs(self.dir, exist_ok=True)
+        path = os.path.join(self.dir, f"chunk-{self.count:05d}.js")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"auditorChunk({self.count},{json.dumps(self.rows, default=str)});\n")
+        self.count += 1
+        self.rows = []
+
+    def finish(self) -> list | None:
+        """The only chunk, to embed in the page, or None once chunks are on disk."""
+        if self.count == 0:
+            return self.rows
+        if self.rows:
+            self._write()
+        return None
+
+
+def write_html(findings: Iterable[Finding], outdir: str, generated_at: str,
+               suppressed: list[tuple[str, str, int]] | None = None,
+               skipped: list[dict] | None = None):
+    """Aggregate and chunk ``findings`` in one streaming pass, then render the summary page.
+
+    The page holds per-severity, per-service and per-account counts and pages
+    through the findings in the browser, so its size and render time do not
+    grow with the number of findings. ``suppressed`` lists ``(waiver, reason,
+    count)`` for findings dropped by waivers; ``skipped`` the units a time
+    budget left unscanned, which marks the report as partial.
+    """
     os.makedirs(outdir, exist_ok=True)
     path = os.path.join(outdir, "findings.html")
+    by_severity: Counter = Counter()
+    by_status: Counter = Counter()
+    by_service: dict[str, Counter] = {}
+    by_account: dict[str, Counter] = {}
+    # Chunks holding rows that match each filter, keyed "<account>/<severity>"
+    # with either part empty for "all", so a filtered view only pages through
+    # chunks that have something to show.
+    filter_chunks: dict[str, list[int]] = {}
+    writer = _ChunkWriter(outdir)
+    total = rows = 0
+    for f in findings:
+        writer.add([getattr(f, k) for k in ROW_FIELDS])
+        chunk = writer.count  # the chunk this row lands in
+        for key in (f"{f.account_id}/", f"/{f.severity}", f"{f.account_id}/{f.severity}"):
+            seen = filter_chunks.setdefault(key, [])
+            if not seen or seen[-1] != chunk:
+                seen.append(chunk)
+        rows += 1
+        by_status[f.status] += 1
+        if f.status == "resolved":
+            continue  # listed, but no longer part of the open totals
+        by_severity[f.severity] += 1
+        by_service.setdefault(f.service, Counter())[f.severity] += 1
+        by_account.setdefault(f.account_id, Counter())[f.severity] += 1
+        total += 1
+    inline = writer.finish()
+
+    from jinja2 import Template  # deferred: only needed once findings are rendered
     tmpl = Template(HTML)
-    html = tmpl.render(findings=findings, generated_at=generated_at)
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(html)
+    report = {"chunks": max(writer.count, 1 if rows else 0), "data_dir": DATA_DIR,
+              "filter_chunks": filter_chunks}
+    with open(path, "w", encoding="utf-8") as out:
+        for part in tmpl.generate(
+                generated_at=generated_at, total=total, severities=SEVERITIES,
+                by_severity=by_severity, by_status=by_status,
+                by_service=sorted(by_service.items()), by_account=sorted(by_account.items()),
+                report=report, inline=inline, suppressed=suppressed or [],
+                suppressed_total=sum(n for _, _, n in suppressed or []),
+                skipped=skipped or [], max_skipped_rows=MAX_SKIPPED_ROWS,
+                skipped_by_check=sorted(Counter(u["check"] for u in skipped or []).items())):
+            out.write(part)
     return path
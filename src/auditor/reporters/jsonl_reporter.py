@@ -0,0 +1,31 @@
+from __future__ import annotations
+import json
+import os
+from typing import Iterator
+
+from ..findings import Finding
+
+class JsonlWriter:
+    """Appends findings to findings.jsonl, one JSON object per line."""
+
+    def __init__(self, outdir: str, filename: str = "findings.jsonl"):
+        os.makedirs(outdir, exist_ok=True)
+        self.path = os.path.join(outdir, filename)
+        self._f = open(self.path, "w", encoding="utf-8")
+
+    def write(self, row: Finding):
+        self._f.write(json.dumps(row.to_dict(), default=str))
+        self._f.write("\n")
+
+    def flush(self):
+        self._f.flush()
+
+    def close(self) -> str:
+        self._f.close()
+        return self.path
+
+def iter_jsonl(path: str) -> Iterator[Finding]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield Finding.from_dict(json.loads(line))
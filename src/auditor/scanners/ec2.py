@@ -1,45 +1,71 @@
-﻿import boto3
+from ..fetch import fetch
+from ..findings import Finding
+from ..inventory import get_inventory
+from ..tags import arn, get_tag_index
 
-def scan_ec2_unused_eips(account_id, region, findings):
+# Server-side pre-filter: only groups with an ingress rule open to the world.
+OPEN_TO_WORLD = {"ip-permission.cidr": ["0.0.0.0/0"]}
+SG_PAGE_SIZE = 1000
+
+def scan_ec2_unused_eips(session, account_id, region, findings):
     """
     Scan for unused Elastic IPs in the given account and region.
     """
-    ec2 = boto3.client('ec2', region_name=region)
+    ec2 = session.client('ec2', region_name=region)
+    index = get_tag_index()
 
     # Unused Elastic IPs (no association)
-    eips = ec2.describe_addresses().get("Addresses", [])
+    eips = get_inventory().records("AWS::EC2::EIP", account_id, region)
+    if eips is None:
+        eips = fetch(ec2, "describe_addresses", "Addresses")
     for eip in eips:
+        tags = None
+        if "Tags" in eip:  # Config inventory record
+            tags = eip["Tags"]
+        elif eip.get("AllocationId"):
+            tags = index.lookup(session, account_id, region,
+                                arn("ec2", region, account_id, f"elastic-ip/{eip['AllocationId']}"))
         if "InstanceId" not in eip and "NetworkInterfaceId" not in eip:
-            findings.append({
-                "account_id": account_id,
-                "region": region,
-                "service": "EC2",
-                "resource_id": eip.get("PublicIp"),
-                "severity": "LOW",
-                "title": "Unused Elastic IP",
-                "details": eip
-            })
+            findings.append(Finding(
+                account_id=account_id,
+                region=region,
+                service="EC2",
+                resource_id=eip.get("PublicIp"),
+                severity="LOW",
+                title="Unused Elastic IP",
+                details={
+                    "allocation_id": eip.get("AllocationId"),
+                    "domain": eip.get("Domain"),
+                },
+                tags=tags,
+            ))
+        findings.extend(index.missing(tags, account_id, region, "EC2", eip.get("PublicIp"),
+                                      "Elastic IP missing tags"))
 
 def scan_ec2(session, account_id, region, conf):
-    findings = []
     ec2 = session.client("ec2", region_name=region)
+    index = get_tag_index()
 
     # Example: Security groups open to 0.0.0.0/0
-    try:
-        sgs = ec2.describe_security_groups()["SecurityGroups"]
-        for sg in sgs:
-            for perm in sg.get("IpPermissions", []):
-                for ip_range in perm.get("IpRanges", []):
-                    if ip_range.get("CidrIp") == "0.0.0.0/0":
-                        findings.append({
-                            "account_id": account_id,
-                            "region": region,
-                            "service": "EC2",
-                            "resource_id": sg["GroupId"],
-                            "severity": "MEDIUM",
-                            "title": "Security group open to the world",
-                        })
-    except Exception as e:
-        print(f"[WARN] {account_id} {region} ec2: {e}")
-
-    return findings
+    sgs = get_inventory().records("AWS::EC2::SecurityGroup", account_id, region)
+    if sgs is None:
+        sgs = fetch(ec2, "describe_security_groups", "SecurityGroups",
+                    filters=OPEN_TO_WORLD, page_size=SG_PAGE_SIZE)
+    for sg in sgs:
+        tags = None
+        for perm in sg.get("IpPermissions", []):
+            for ip_range in perm.get("IpRanges", []):
+                if ip_range.get("CidrIp") == "0.0.0.0/0":
+                    if tags is None:
+                        tags = sg["Tags"] if "Tags" in sg else index.lookup(
+                            session, account_id, region,
+                            arn("ec2", region, account_id, f"security-group/{sg['GroupId']}"))
+                    yield Finding(
+                        account_id=account_id,
+                        region=region,
+                        service="EC2",
+                        resource_id=sg["GroupId"],
+                        severity="MEDIUM",
+                        title="Security group open to the world",
+                        tags=tags,
+                    )
@@ -1,57 +1,151 @@
 from __future__ import annotations
+import csv
+import io
+import sys
+import time
 from datetime import datetime, timezone
+from typing import Iterable, Iterator
 
-def scan_iam(session, account_id: str, region: str, conf) -> list[dict]:
-    # IAM is global; region parameter is unused but kept for uniformity
-    findings = []
-    iam = session.client("iam")
+from ..findings import Finding
+
+# generate_credential_report is asynchronous; poll until it reports COMPLETE.
+REPORT_POLL_SECONDS = 2
+REPORT_TIMEOUT_SECONDS = 120
 
+
+class CredentialReportUnavailable(Exception):
+    pass
+
+
+def _key_findings(account_id: str, resource_id: str, age_days, unused_for,
+                  conf) -> list[Finding]:
+    findings = []
     max_age = conf.stale_days.iam_key_max_age_days
     unused_days = conf.stale_days.iam_key_unused_days
+
+    # Age check
+    if age_days is not None and age_days > max_age:
+        findings.append(Finding(
+            account_id=account_id,
+            region="global",
+            service="IAM",
+            resource_id=resource_id,
+            severity="MEDIUM",
+            title="Access key exceeds max age",
+            details=f"Age {age_days}d > {max_age}d",
+            remediation="Rotate or remove aged access key; prefer IAM roles.",
+            tags={},
+        ))
+
+    # Unused check
+    if unused_for is None or unused_for > unused_days:
+        details = "Never used" if unused_for is None else f"Unused for {unused_for} days"
+        findings.append(Finding(
+            account_id=account_id,
+            region="global",
+            service="IAM",
+            resource_id=resource_id,
+            severity="LOW",
+            title="Stale or never-used access key",
+            details=details,
+            remediation="Disable or delete unused key; enforce key rotation policy.",
+            tags={},
+        ))
+    return findings
+
+
+def fetch_credential_report(iam, timeout: float = REPORT_TIMEOUT_SECONDS,
+                            poll: float = REPORT_POLL_SECONDS) -> Iterator[dict]:
+    """Generate (if needed) and download the account's credential report as CSV rows."""
+    deadline = time.monotonic() + timeout
+    while iam.generate_credential_report().get("State") != "COMPLETE":
+        if time.monotonic() >= deadline:
+            raise CredentialReportUnavailable("credential report not ready before timeout")
+        time.sleep(poll)
+    content = iam.get_credential_report()["Content"]
+    if isinstance(content, bytes):
+        content = content.decode("utf-8")
+    return csv.DictReader(io.StringIO(content))
+
+
+def _report_time(value: str | None):
+    # Unset columns hold markers such as "N/A", "no_information" or "not_supported".
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def findings_from_credential_report(rows: Iterable[dict], account_id: str, conf,
+                                    now: datetime | None = None) -> Iterator[Finding]:
+    """Evaluate access keys from credential report rows.
+
+    The report has no access key IDs, so keys are identified by their slot:
+    ``<user>/access_key_1`` and ``<user>/access_key_2``. Inactive keys cannot
+    be used to sign requests and are not reported, here or in the per-key scan.
+    """
+    now = now or datetime.now(timezone.utc)
+    for row in rows:
+        uname = row.get("user")
+        if not uname or uname == "<root_account>":
+            continue
+        for slot in ("1", "2"):
+            if row.get(f"access_key_{slot}_active") != "true":
+                continue  # no key in this slot, or a deactivated one
+            created = _report_time(row.get(f"access_key_{slot}_last_rotated"))
+            if created is None:
+                continue
+            last_used = _report_time(row.get(f"access_key_{slot}_last_used_date"))
+            age_days = (now - created).days
+            unused_for = (now - last_used).days if last_used else None
+            yield from _key_findings(account_id, f"{uname}/access_key_{slot}",
+                                     age_days, unused_for, conf)
+
+
+def _scan_iam_per_key(iam, account_id: str, conf) -> Iterator[Finding]:
+    """Evaluate access keys one API call at a time.
+
+    Keys get the credential report's IDs, so switching between the two paths
+    does not turn every key finding into a new one: the report lists a user's
+    keys in creation order, as ``access_key_1`` and ``access_key_2``.
+    """
     now = datetime.now(timezone.utc)
+    epoch = datetime.min.replace(tzinfo=timezone.utc)
 
     paginator = iam.get_paginator("list_users")
     for page in paginator.paginate():
         for user in page.get("Users", []):
             uname = user["UserName"]
             akp = iam.get_paginator("list_access_keys")
-            for kp in akp.paginate(UserName=uname):
-                for key in kp.get("AccessKeyMetadata", []):
-                    kid = key["AccessKeyId"]
-                    create = key.get("CreateDate")
-                    age_days = (now - create).days if create else None
-
-                    # Last used
-                    last = iam.get_access_key_last_used(AccessKeyId=kid)
-                    last_used = last.get("AccessKeyLastUsed", {}).get("LastUsedDate")
-                    unused_for = (now - last_used).days if last_used else None
-
-                    # Age check
-                    if age_days is not None and age_days > max_age:
-                        findings.append({
-                            "account_id": account_id,
-                            "region": "global",
-                            "service": "IAM",
-                            "resource_id": f"{uname}/{kid}",
-                            "severity": "MEDIUM",
-                            "title": "Access key exceeds max age",
-                            "details": f"Age {age_days}d > {max_age}d",
-                            "remediation": "Rotate or remove aged access key; prefer IAM roles.",
-                            "tags": {},
-                        })
-
-                    # Unused check
-                    if unused_for is None or unused_for > unused_days:
-                        details = "Never used" if unused_for is None else f"Unused for {unused_for} days"
-                        findings.append({
-                            "account_id": account_id,
-                            "region": "global",
-                            "service": "IAM",
-                            "resource_id": f"{uname}/{kid}",
-                            "severity": "LOW",
-                            "title": "Stale or never-used access key",
-                            "details": details,
-                            "remediation": "Disable or delete unused key; enforce key rotation policy.",
-                            "tags": {},
-                        })
-    return findings
+            keys = [k for kp in akp.paginate(UserName=uname)
+                    for k in kp.get("AccessKeyMetadata", [])]
+            keys.sort(key=lambda k: k.get("CreateDate") or epoch)
+            for slot, key in enumerate(keys, 1):
+                if key.get("Status") != "Active":
+                    continue
+                create = key.get("CreateDate")
+                age_days = (now - create).days if create else None
+
+                # Last used
+                last = iam.get_access_key_last_used(AccessKeyId=key["AccessKeyId"])
+                last_used = last.get("AccessKeyLastUsed", {}).get("LastUsedDate")
+                unused_for = (now - last_used).days if last_used else None
+
+                yield from _key_findings(account_id, f"{uname}/access_key_{slot}",
+                                         age_days, unused_for, conf)
+
+
+def scan_iam(session, account_id: str, region: str, conf) -> Iterator[Finding]:
+    # IAM is global; region parameter is unused but kept for uniformity
+    iam = session.client("iam")
+
+    # One credential report replaces a list_access_keys call per user and a
+    # get_access_key_last_used call per key. Fall back when it is unavailable.
+    try:
+        rows = fetch_credential_report(iam)
+    except Exception as e:
+        print(f"[WARN] {account_id} iam: credential report unavailable ({e}); "
+              "falling back to per-key scan", file=sys.stderr)
+        yield from _scan_iam_per_key(iam, account_id, conf)
+        return
+    yield from findings_from_credential_report(rows, account_id, conf)
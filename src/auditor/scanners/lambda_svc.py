@@ -1,54 +1,74 @@
 from __future__ import annotations
 from datetime import datetime, timezone, timedelta
+from typing import Iterator
 
-def scan_lambda(session, account_id: str, region: str, conf) -> list[dict]:
-    findings = []
+from ..findings import Finding
+from ..inventory import get_inventory
+from ..tags import get_tag_index
+
+# GetMetricData accepts at most 500 queries per request.
+METRIC_QUERIES_PER_REQUEST = 500
+
+
+def invocation_totals(cw, names: list[str], start: datetime, end: datetime) -> dict[str, float]:
+    """Sum of Lambda Invocations per function name, batched through GetMetricData."""
+    totals: dict[str, float] = {}
+    paginator = cw.get_paginator("get_metric_data")
+    for offset in range(0, len(names), METRIC_QUERIES_PER_REQUEST):
+        batch = names[offset:offset + METRIC_QUERIES_PER_REQUEST]
+        queries = [{
+            "Id": f"m{i}",
+            "MetricStat": {
+                "Metric": {
+                    "Namespace": "AWS/Lambda",
+                    "MetricName": "Invocations",
+                    "Dimensions": [{"Name": "FunctionName", "Value": name}],
+                },
+                "Period": 24 * 3600,
+                "Stat": "Sum",
+            },
+            "ReturnData": True,
+        } for i, name in enumerate(batch)]
+        for page in paginator.paginate(MetricDataQueries=queries, StartTime=start, EndTime=end):
+            for result in page.get("MetricDataResults", []):
+                name = batch[int(result["Id"][1:])]
+                totals[name] = totals.get(name, 0) + sum(result.get("Values", []))
+    return totals
+
+
+def scan_lambda(session, account_id: str, region: str, conf) -> Iterator[Finding]:
     lam = session.client("lambda", region_name=region)
     cw = session.client("cloudwatch", region_name=region)
 
-    paginator = lam.get_paginator("list_functions")
-    cutoff = datetime.now(timezone.utc) - timedelta(days=conf.stale_days.lambda_no_invocations)
-    for page in paginator.paginate():
-        for fn in page.get("Functions", []):
-            name = fn["FunctionName"]
-            # No invocation in period?
-            metrics = cw.get_metric_statistics(
-                Namespace="AWS/Lambda",
-                MetricName="Invocations",
-                Dimensions=[{"Name": "FunctionName", "Value": name}],
-                StartTime=cutoff,
-                EndTime=datetime.now(timezone.utc),
-                Period=24 * 3600,
-                Statistics=["Sum"],
+    index = get_tag_index()
+
+    # From the Config aggregator, functions come with their tags attached;
+    # otherwise they come from the shared tag index, not a list_tags per function.
+    functions = get_inventory().records("AWS::Lambda::Function", account_id, region)
+    if functions is None:
+        paginator = lam.get_paginator("list_functions")
+        functions = [fn for page in paginator.paginate() for fn in page.get("Functions", [])]
+
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=conf.stale_days.lambda_no_invocations)
+    totals = invocation_totals(cw, [fn["FunctionName"] for fn in functions], cutoff, now)
+
+    for fn in functions:
+        name = fn["FunctionName"]
+        tags = fn["Tags"] if "Tags" in fn else index.lookup(session, account_id, region,
+                                                            fn["FunctionArn"])
+        # No invocation in period?
+        if totals.get(name, 0) == 0:
+            yield Finding(
+                account_id=account_id,
+                region=region,
+                service="Lambda",
+                resource_id=name,
+                severity="LOW",
+                title="Lambda not invoked recently",
+                details=f"No invocations since {cutoff.date()}",
+                remediation="Remove unused function or document why it is idle.",
+                tags=tags,
             )
-            total_invocations = sum(pt.get("Sum", 0) for pt in metrics.get("Datapoints", []))
-            if total_invocations == 0:
-                findings.append({
-                    "account_id": account_id,
-                    "region": region,
-                    "service": "Lambda",
-                    "resource_id": name,
-                    "severity": "LOW",
-                    "title": "Lambda not invoked recently",
-                    "details": f"No invocations since {cutoff.date()}",
-                    "remediation": "Remove unused function or document why it is idle.",
-                    "tags": {},
-                })
-            # Missing tags
-            try:
-                tags = lam.list_tags(Resource=fn["FunctionArn"]).get("Tags", {})
-                if not tags:
-                    findings.append({
-                        "account_id": account_id,
-                        "region": region,
-                        "service": "Lambda",
-                        "resource_id": name,
-                        "severity": "LOW",
-                        "title": "Lambda missing tags",
-                        "details": "No tags present on function",
-                        "remediation": "Add ownership/cost-center/environment tags.",
-                        "tags": {},
-                    })
-            except Exception:
-                pass
-    return findings
+        yield from index.missing(tags, account_id, region, "Lambda", name,
+                                 "Lambda missing tags")
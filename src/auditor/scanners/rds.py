@@ -1,44 +1,54 @@
-﻿import boto3
+from ..fetch import fetch
+from ..findings import Finding
+from ..inventory import get_inventory
+from ..tags import arn, get_tag_index
 
-def scan_rds_public_snapshots(account_id, region, findings):
+def scan_rds_public_snapshots(session, account_id, region, findings):
     """
     Scan for public/shared RDS snapshots.
     """
-    rds = boto3.client('rds', region_name=region)
+    rds = session.client('rds', region_name=region)
 
     # Public snapshots
-    try:
-        for s in rds.describe_db_snapshots(SnapshotType="shared")["DBSnapshots"]:
-            if s.get("SnapshotType") == "shared":
-                findings.append({
-                    "account_id": account_id,
-                    "region": region,
-                    "service": "RDS",
-                    "resource_id": s.get("DBSnapshotIdentifier"),
-                    "severity": "HIGH",
-                    "title": "Public RDS snapshot",
-                    "details": s
-                })
-    except rds.exceptions.ClientError as e:
-        print(f"Error checking RDS snapshots in {region}: {e}")
+    for s in fetch(rds, "describe_db_snapshots", "DBSnapshots", SnapshotType="shared"):
+        if s.get("SnapshotType") == "shared":
+            findings.append(Finding(
+                account_id=account_id,
+                region=region,
+                service="RDS",
+                resource_id=s.get("DBSnapshotIdentifier"),
+                severity="HIGH",
+                title="Public RDS snapshot",
+                details={
+                    "db_instance": s.get("DBInstanceIdentifier"),
+                    "engine": s.get("Engine"),
+                    "encrypted": s.get("Encrypted"),
+                },
+            ))
 
 def scan_rds(session, account_id, region, conf):
-    findings = []
     rds = session.client("rds", region_name=region)
+    index = get_tag_index()
 
-    try:
-        instances = rds.describe_db_instances()["DBInstances"]
-        for db in instances:
-            if db.get("PubliclyAccessible"):
-                findings.append({
-                    "account_id": account_id,
-                    "region": region,
-                    "service": "RDS",
-                    "resource_id": db["DBInstanceIdentifier"],
-                    "severity": "HIGH",
-                    "title": "Publicly accessible RDS instance",
-                })
-    except Exception as e:
-        print(f"[WARN] {account_id} {region} rds: {e}")
-
-    return findings
+    instances = get_inventory().records("AWS::RDS::DBInstance", account_id, region)
+    if instances is None:
+        instances = fetch(rds, "describe_db_instances", "DBInstances")
+    for db in instances:
+        db_id = db["DBInstanceIdentifier"]
+        if "Tags" in db:  # Config inventory record
+            tags = db["Tags"]
+        else:
+            tags = index.lookup(session, account_id, region, db.get("DBInstanceArn")
+                                or arn("rds", region, account_id, f"db:{db_id}"))
+        if db.get("PubliclyAccessible"):
+            yield Finding(
+                account_id=account_id,
+                region=region,
+                service="RDS",
+                resource_id=db_id,
+                severity="HIGH",
+                title="Publicly accessible RDS instance",
+                tags=tags,
+            )
+        yield from index.missing(tags, account_id, region, "RDS", db_id,
+                                 "RDS instance missing tags")
@@ -1,110 +1,226 @@
-﻿import boto3
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 
-def scan_s3_buckets(account_id, region, findings):
-    """
-    Scan S3 buckets for various security issues, including lifecycle policy.
-    """
-    s3 = boto3.client('s3', region_name=region)
-
-    buckets = s3.list_buckets().get("Buckets", [])
-    for bucket in buckets:
-        name = bucket["Name"]
-        public = False
-        bpa_off = False
-        encryption_missing = False
-        versioning_missing = False
-        lifecycle_missing = False
-
-        try:
-            s3.get_bucket_acl(Bucket=name)
-        except Exception:
-            pass
-
-        try:
-            s3.get_bucket_policy_status(Bucket=name)
-        except Exception:
-            pass
-
-        try:
-            s3.get_bucket_encryption(Bucket=name)
-        except s3.exceptions.ClientError:
-            encryption_missing = True
-
-        try:
-            ver = s3.get_bucket_versioning(Bucket=name)
-            if ver.get("Status") != "Enabled":
-                versioning_missing = True
-        except Exception:
-            pass
-
-        try:
-            lc = s3.get_bucket_lifecycle_configuration(Bucket=name)
-            if not lc.get("Rules"):
-                lifecycle_missing = True
-        except s3.exceptions.ClientError:
-            lifecycle_missing = True
-
-        if public or bpa_off or encryption_missing or versioning_missing:
-            issues = []
-            if public:
-                issues.append("public ACL/policy")
-            if bpa_off:
-                issues.append("Public Access Block not fully enabled")
-            if encryption_missing:
-                issues.append("encryption missing")
-            if versioning_missing:
-                issues.append("versioning not enabled")
-
-            findings.append({
-                "account_id": account_id,
-                "region": region,
-                "service": "S3",
-                "resource_id": name,
-                "severity": "MEDIUM",
-                "title": "S3 bucket misconfigurations",
-                "details": issues
-            })
-
-        if lifecycle_missing:
-            findings.append({
-                "account_id": account_id,
-                "region": region,
-                "service": "S3",
-                "resource_id": name,
-                "severity": "LOW",
-                "title": "S3 bucket missing lifecycle policy",
-                "details": {}
-            })
+from botocore.exceptions import ClientError
 
-def scan_s3(session, account_id, region, conf):
-    findings = []
-    s3 = session.client("s3", region_name=region)
+from ..cache import fingerprint, get_cache
+from ..config import Concurrency
+from ..findings import Finding
+from ..inventory import get_inventory
+from ..tags import arn, get_tag_index
+
+# Per-bucket property probes are independent, so they run on a small pool.
+PROBE_WORKERS = 16
+
+PUBLIC_GRANTEES = {
+    "http://acs.amazonaws.com/groups/global/AllUsers",
+    "http://acs.amazonaws.com/groups/global/AuthenticatedUsers",
+}
+
+
+def bucket_region(s3, name: str) -> str:
+    try:
+        loc = s3.get_bucket_location(Bucket=name).get("LocationConstraint")
+    except Exception:
+        # botocore follows S3 region redirects, so the global endpoint still works.
+        return "us-east-1"
+    # Buckets in us-east-1 report no constraint; very old eu-west-1 buckets report "EU".
+    if not loc:
+        return "us-east-1"
+    return "eu-west-1" if loc == "EU" else loc
+
+
+def _probe_policy_public(s3, name):
+    try:
+        return s3.get_bucket_policy_status(Bucket=name)["PolicyStatus"]["IsPublic"]
+    except Exception:
+        return False
+
+
+def _probe_acl_public(s3, name):
+    try:
+        grants = s3.get_bucket_acl(Bucket=name).get("Grants", [])
+    except Exception:
+        return False
+    return any(g.get("Grantee", {}).get("URI") in PUBLIC_GRANTEES for g in grants)
+
+
+def _probe_encryption_missing(s3, name):
+    try:
+        s3.get_bucket_encryption(Bucket=name)
+        return False
+    except ClientError:
+        return True
 
+
+def _probe_versioning_missing(s3, name):
     try:
-        buckets = s3.list_buckets()["Buckets"]
-        for bucket in buckets:
-            name = bucket["Name"]
-
-            # Example: check public access
-            public = False
-            try:
-                pab = s3.get_bucket_policy_status(Bucket=name)
-                if pab["PolicyStatus"]["IsPublic"]:
-                    public = True
-            except Exception:
-                pass
-
-            if public:
-                findings.append({
-                    "account_id": account_id,
-                    "region": region,
-                    "service": "S3",
-                    "resource_id": name,
-                    "severity": "HIGH",
-                    "title": "S3 bucket is public",
-                })
-
-    except Exception as e:
-        print(f"[WARN] {account_id} {region} s3: {e}")
+        return s3.get_bucket_versioning(Bucket=name).get("Status") != "Enabled"
+    except Exception:
+        return False
+
+
+def _probe_lifecycle_missing(s3, name):
+    try:
+        return not s3.get_bucket_lifecycle_configuration(Bucket=name).get("Rules")
+    except ClientError:
+        return True
+
 
+PROBES = {
+    "policy_public": _probe_policy_public,
+    "acl_public": _probe_acl_public,
+    "encryption_missing": _probe_encryption_missing,
+    "versioning_missing": _probe_versioning_missing,
+    "lifecycle_missing": _probe_lifecycle_missing,
+}
+
+
+def _bucket_findings(account_id, region, name, props, tags=None) -> list[Finding]:
+    findings = []
+    if props["policy_public"] or props["acl_public"]:
+        via = [k for k in ("policy", "ACL") if props[f"{k.lower()}_public"]]
+        findings.append(Finding(
+            account_id=account_id,
+            region=region,
+            service="S3",
+            resource_id=name,
+            severity="HIGH",
+            title="S3 bucket is public",
+            details=f"Public via {' and '.join(via)}",
+            tags=tags,
+        ))
+
+    issues = []
+    if props["encryption_missing"]:
+        issues.append("encryption missing")
+    if props["versioning_missing"]:
+        issues.append("versioning not enabled")
+    if issues:
+        findings.append(Finding(
+            account_id=account_id,
+            region=region,
+            service="S3",
+            resource_id=name,
+            severity="MEDIUM",
+            title="S3 bucket misconfigurations",
+            details=issues,
+            tags=tags,
+        ))
+
+    if props["lifecycle_missing"]:
+        findings.append(Finding(
+            account_id=account_id,
+            region=region,
+            service="S3",
+            resource_id=name,
+            severity="LOW",
+            title="S3 bucket missing lifecycle policy",
+            tags=tags,
+        ))
+    findings.extend(get_tag_index().missing(tags, account_id, region, "S3", name,
+                                            "S3 bucket missing tags"))
     return findings
+
+
+def _props_from_config(supplementary: dict) -> dict:
+    """Probe results derived from a Config bucket record's supplementary configuration.
+
+    Config has no equivalent of GetBucketPolicyStatus, so ``policy_public``
+    is None when the bucket has a policy and must be probed live.
+    """
+    acl = supplementary.get("AccessControlList") or {}
+    grantees = []
+    for g in acl.get("grantList") or []:
+        grantee = g.get("grantee")
+        grantees.append(grantee.get("uri") if isinstance(grantee, dict) else grantee)
+    versioning = supplementary.get("BucketVersioningConfiguration") or {}
+    lifecycle = supplementary.get("BucketLifecycleConfiguration") or {}
+    policy = supplementary.get("BucketPolicy") or {}
+    return {
+        "policy_public": None if policy.get("policyText") else False,
+        "acl_public": any(g in PUBLIC_GRANTEES or g in ("AllUsers", "AuthenticatedUsers")
+                          for g in grantees),
+        "encryption_missing": not supplementary.get("ServerSideEncryptionConfiguration"),
+        "versioning_missing": versioning.get("status") != "Enabled",
+        "lifecycle_missing": not lifecycle.get("rules"),
+    }
+
+
+def _probe_workers(conf) -> int:
+    """Probe threads share each region's client, so never outnumber its HTTP pool."""
+    pool = (conf.concurrency if conf is not None else Concurrency()).max_pool_connections
+    return min(PROBE_WORKERS, pool)
+
+
+def _bucket_tags(session, account_id, region, name):
+    return get_tag_index().lookup(session, account_id, region, arn("s3", region, account_id, name))
+
+
+def _scan_s3_from_config(session, account_id, records, workers):
+    """Evaluate Config bucket records; only buckets with a policy cost an API call.
+
+    A bucket whose configuration item is unchanged since the cached scan
+    replays its cached findings instead of that call. Config captures a new
+    item whenever the bucket's policy, ACL or tags change, so the capture
+    time fingerprints everything the findings are derived from.
+    """
+    cache = get_cache()
+    index = get_tag_index()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for rec in records:
+            props = _props_from_config(rec["Supplementary"])
+            policy = fp = hit = None
+            if props["policy_public"] is None:
+                if rec.get("CaptureTime"):
+                    fp = fingerprint(rec["Name"], rec["CaptureTime"], index.required,
+                                     index.check_missing)
+                    hit = cache.lookup(account_id, "s3:bucket", rec["Name"], fp)
+                if hit is None:
+                    s3 = session.client("s3", region_name=rec["Region"])
+                    policy = pool.submit(_probe_policy_public, s3, rec["Name"])
+            pending.append((rec, props, policy, fp, hit))
+        for rec, props, policy, fp, hit in pending:
+            if hit is not None:
+                yield from hit
+                continue
+            if policy is not None:
+                props["policy_public"] = policy.result()
+            tags = rec["Tags"] if "Tags" in rec else _bucket_tags(
+                session, account_id, rec["Region"], rec["Name"])
+            findings = _bucket_findings(account_id, rec["Region"], rec["Name"], props, tags)
+            if fp is not None:
+                cache.store(account_id, "s3:bucket", rec["Name"], fp, findings)
+            yield from findings
+
+
+def scan_s3(session, account_id, region, conf):
+    """Scan every bucket in the account once.
+
+    S3 is account-scoped: ``region`` is ignored and each bucket is probed
+    through a client in its home region, which is reported on the finding.
+    With the Config inventory backend the bucket records are evaluated
+    instead of listing and probing buckets.
+    """
+    records = get_inventory().records("AWS::S3::Bucket", account_id)
+    if records is not None:
+        yield from _scan_s3_from_config(session, account_id, records, _probe_workers(conf))
+        return
+
+    s3 = session.client("s3", region_name="us-east-1")
+    # list_buckets exposes no modification time, so there is nothing to
+    # fingerprint a listed bucket on: every bucket is probed.
+    names = [b["Name"] for b in s3.list_buckets().get("Buckets", [])]
+
+    with ThreadPoolExecutor(max_workers=_probe_workers(conf)) as pool:
+        regions = dict(zip(names, pool.map(lambda n: bucket_region(s3, n), names)))
+        pending = {
+            n: {key: pool.submit(probe, session.client("s3", region_name=r), n)
+                for key, probe in PROBES.items()}
+            for n, r in regions.items()
+        }
+        for name in names:
+            props = {key: fut.result() for key, fut in pending[name].items()}
+            tags = _bucket_tags(session, account_id, regions[name], name)
+            yield from _bucket_findings(account_id, regions[name], name, props, tags)
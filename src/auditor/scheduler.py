@@ -0,0 +1,115 @@
+from __future__ import annotations
+import sys
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from .config import Concurrency
+from .findings import Finding
+
+
+@dataclass
+class ScanUnit:
+    """One (account, region, service) slice of the audit."""
+    account_id: str
+    region: str
+    service: str
+    fn: Callable
+    session: Any = None
+
+    @property
+    def label(self) -> str:
+        if self.region == "global":
+            return f"{self.account_id} {self.service}"
+        return f"{self.account_id} {self.region} {self.service}"
+
+
+def execute_unit(unit: ScanUnit, conf, emit: Callable[[Finding], None]) -> int | None:
+    """Run one unit, passing each finding to ``emit`` as the scanner yields it.
+
+    Returns the number of findings, or None if the scanner failed.
+    """
+    n = 0
+    try:
+        if unit.session:
+            for finding in unit.fn(unit.session, unit.account_id, unit.region, conf):
+                emit(finding)
+                n += 1
+        print(f"[OK] {unit.label}: {n} findings")
+    except Exception as e:
+        print(f"[WARN] {unit.label}: {e}", file=sys.stderr)
+        return None
+    return n
+
+
+class ScanScheduler:
+    """Runs scan units on a bounded thread pool.
+
+    A unit is only dispatched while the global, per-account and per-service
+    limits all have a free slot; among the accounts with a free slot, the one
+    whose next unit comes earliest in the list goes first, so list order is
+    also priority order. ``execute(index, unit)`` is called on a worker
+    thread; its return values are handed back in unit order.
+
+    Past ``deadline`` (a ``time.monotonic()`` value) nothing new starts:
+    running units finish and each unit never started is passed to
+    ``on_skip(index, unit)``; its result stays None.
+    """
+
+    def __init__(self, limits: Concurrency):
+        self.limits = limits
+
+    def _service_limit(self, service: str) -> int:
+        return self.limits.per_service.get(service, self.limits.max_workers)
+
+    def run(self, units: list[ScanUnit], execute: Callable[[int, ScanUnit], Any],
+            deadline: float | None = None,
+            on_skip: Callable[[int, ScanUnit], None] | None = None) -> list:
+        results: list = [None] * len(units)
+
+        # Per-account FIFO queues keep dispatch cheap: a saturated account is
+        # skipped with one lookup instead of walking all of its units.
+        queues: dict[str, deque[int]] = {}
+        for i, u in enumerate(units):
+            queues.setdefault(u.account_id, deque()).append(i)
+
+        acct_busy: dict[str, int] = defaultdict(int)
+        svc_busy: dict[str, int] = defaultdict(int)
+        in_flight: dict[Any, int] = {}
+
+        with ThreadPoolExecutor(max_workers=self.limits.max_workers) as pool:
+            while queues or in_flight:
+                if deadline is not None and queues and time.monotonic() >= deadline:
+                    for idx in sorted(i for q in queues.values() for i in q):
+                        if on_skip is not None:
+                            on_skip(idx, units[idx])
+                    queues.clear()
+                for acct in sorted(queues, key=lambda a: queues[a][0]):
+                    if len(in_flight) >= self.limits.max_workers:
+                        break
+                    q = queues[acct]
+                    for idx in list(q):
+                        if acct_busy[acct] >= self.limits.per_account:
+                            break
+                        if len(in_flight) >= self.limits.max_workers:
+                            break
+                        u = units[idx]
+                        if svc_busy[u.service] >= self._service_limit(u.service):
+                            continue
+                        q.remove(idx)
+                        acct_busy[acct] += 1
+                        svc_busy[u.service] += 1
+                        in_flight[pool.submit(execute, idx, u)] = idx
+                    if not q:
+                        del queues[acct]
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    idx = in_flight.pop(fut)
+                    u = units[idx]
+                    acct_busy[u.account_id] -= 1
+                    svc_busy[u.service] -= 1
+                    results[idx] = fut.result()
+        return results
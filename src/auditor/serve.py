@@ -0,0 +1,274 @@
+"""Long-running ``serve`` mode: event-driven rescans over warm sessions.
+
+Change events (CloudTrail records or EventBridge events, one JSON object per
+line) are read from a file that stands in for a queue. Each mutating event
+rescans only the affected (account, region, check) units, replacing their
+entries in an in-memory set of current findings. Reports are written from
+that set on demand. Roles are assumed once, and the client factory keeps
+sessions, clients and credentials warm between rescans.
+"""
+from __future__ import annotations
+import json
+import os
+import signal
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from .assume import get_target_accounts, session_for
+from .config import Account
+from .findings import Finding
+from .main import _active_regions, build_units
+from .regions import RegionCache
+from .registry import ScannerSpec, select
+from .reporters.csv_reporter import CsvWriter
+from .reporters.html_reporter import write_html
+from .reporters.jsonl_reporter import JsonlWriter, iter_jsonl
+from .scheduler import ScanScheduler, ScanUnit, execute_unit
+from .tags import TagIndex, use_tag_index
+from .waivers import WaiverIndex, open_waivers
+
+# Calls that change nothing; CloudTrail records them too.
+READ_ONLY_PREFIXES = ("Describe", "List", "Get", "Head", "Lookup")
+# Tag changes can affect every check's missing-tags result.
+TAGGING_SOURCE = "tagging"
+
+UnitKey = tuple[str, str, str]  # (account_id, region or "global", check name)
+
+
+def _records(event: dict) -> list[dict]:
+    """A CloudTrail log file holds many records; anything else is one event."""
+    return event["Records"] if isinstance(event.get("Records"), list) else [event]
+
+
+def event_targets(event: dict) -> tuple[str, str, str] | None:
+    """``(account_id, region, service)`` affected by one event, or None to ignore it.
+
+    Accepts EventBridge events (``account``, ``region``, ``detail``),
+    CloudTrail records (``recipientAccountId``, ``awsRegion``, ``eventSource``)
+    and the plain ``{"account_id", "region", "service"}`` stand-in. ``service``
+    is a registry service (``ec2``, ``s3``, ...) or ``"tagging"``.
+    """
+    if "account_id" in event and "service" in event:
+        return str(event["account_id"]), event.get("region") or "global", event["service"]
+    detail = event.get("detail") if isinstance(event.get("detail"), dict) else event
+    name = detail.get("eventName") or ""
+    if detail.get("readOnly") or name.startswith(READ_ONLY_PREFIXES):
+        return None
+    source = detail.get("eventSource") or ""
+    if not source.endswith(".amazonaws.com"):
+        return None
+    service = source.split(".", 1)[0]
+    account = (event.get("account") or detail.get("recipientAccountId")
+               or (detail.get("userIdentity") or {}).get("accountId"))
+    region = event.get("region") or detail.get("awsRegion")
+    if not account or not region:
+        return None
+    return str(account), region, service
+
+
+class EventFile:
+    """Tails a JSONL file like a queue: each poll returns the complete lines added since."""
+
+    def __init__(self, path: str, from_start: bool = True):
+        self.path = path
+        self.offset = 0 if from_start or not os.path.exists(path) else os.path.getsize(path)
+
+    def poll(self) -> list[dict]:
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        end = data.rfind(b"\n") + 1  # a partly written last line waits for the next poll
+        self.offset += end
+        events = []
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                print(f"[WARN] serve: skipping malformed event: {line[:80]!r}", file=sys.stderr)
+        return events
+
+
+class AuditDaemon:
+    """Keeps the current findings of every (account, region, check) unit in memory."""
+
+    def __init__(self, conf, checks: list[ScannerSpec], factory=None):
+        self.conf = conf
+        self.checks = checks
+        self.factory = factory
+        self.sessions: dict[str, object] = {}
+        self.regions: dict[str, list[str]] = {}
+        self.findings: dict[UnitKey, list[Finding]] = {}
+        self.suppressed: dict[UnitKey, Counter] = {}
+        self.waivers: WaiverIndex | None = open_waivers(conf)
+        self.tags = TagIndex(conf.tags.required, conf.tags.check_missing)
+        self.rescans = 0
+
+    def prepare(self):
+        """Assume into every target account once and resolve its regions."""
+        cache = RegionCache(os.path.join(self.conf.output_dir, "regions-cache.json"),
+                            self.conf.region_discovery.cache_ttl_hours)
+        for acct in get_target_accounts(self.conf):
+            try:
+                sess = session_for(acct.id, self.conf, self.factory)
+                regions = self.conf.regions or cache.regions_for(sess, acct.id)
+                if self.conf.region_discovery.activity_probe:
+                    regions = _active_regions(sess, acct, regions, self.conf)
+            except Exception as e:
+                print(f"[WARN] {acct.id}: {e}", file=sys.stderr)
+                continue
+            self.sessions[acct.id] = sess
+            self.regions[acct.id] = regions
+
+    def all_units(self) -> list[ScanUnit]:
+        units = []
+        for account_id, sess in self.sessions.items():
+            units.extend(build_units(Account(id=account_id), sess, self.regions[account_id],
+                                     self.checks))
+        return units
+
+    def units_for(self, account_id: str, region: str, service: str) -> list[ScanUnit]:
+        sess = self.sessions.get(account_id)
+        if sess is None:
+            return []
+        units = []
+        for spec in self.checks:
+            if service != TAGGING_SOURCE and service not in (spec.service, spec.name):
+                continue
+            if spec.is_global:
+                units.append(ScanUnit(account_id, "global", spec.name, spec.load(), sess))
+            elif region == "global":
+                for r in self.regions[account_id]:
+                    units.append(ScanUnit(account_id, r, spec.name, spec.load(), sess))
+            elif region in self.regions[account_id]:  # not a region the audit excludes
+                units.append(ScanUnit(account_id, region, spec.name, spec.load(), sess))
+        return units
+
+    def rescan(self, units: list[ScanUnit]):
+        """Scan ``units`` and replace their current findings; failed units keep the old ones."""
+        use_tag_index(self.tags)
+        try:
+            for u in units:  # tags may have changed along with the resource
+                self.tags.invalidate(u.account_id, None if u.region == "global" else u.region)
+
+            def execute(index, unit):
+                kept, dropped = [], Counter()
+
+                def keep(finding):
+                    waiver = self.waivers.match(finding) if self.waivers else None
+                    if waiver is None:
+                        kept.append(finding)
+                    else:
+                        dropped[waiver.id] += 1
+
+                if execute_unit(unit, self.conf, keep) is not None:
+                    key = (unit.account_id, unit.region, unit.service)
+                    self.findings[key] = kept
+                    self.suppressed[key] = dropped
+
+            ScanScheduler(self.conf.concurrency).run(units, execute)
+        finally:
+            use_tag_index(None)
+        self.rescans += len(units)
+
+    def handle(self, events: list[dict]) -> int:
+        """Rescan the units touched by ``events``, each once; returns how many were scanned."""
+        wanted: dict[UnitKey, ScanUnit] = {}
+        for event in events:
+            for record in _records(event):
+                target = event_targets(record)
+                if target is None:
+                    continue
+                if target[0] not in self.sessions:
+                    print(f"[SKIP] serve: event for untargeted account {target[0]}")
+                    continue
+                for u in self.units_for(*target):
+                    wanted.setdefault((u.account_id, u.region, u.service), u)
+        if wanted:
+            self.rescan([wanted[k] for k in sorted(wanted)])
+        return len(wanted)
+
+    def snapshot(self, outdir: str) -> list[str]:
+        """Write CSV, JSONL and HTML reports of the current findings."""
+        generated_at = datetime.now(timezone.utc).isoformat()
+        csv_writer, jsonl = CsvWriter(outdir), JsonlWriter(outdir)
+        for key in sorted(self.findings):
+            for finding in self.findings[key]:
+                csv_writer.write(finding)
+                jsonl.write(finding)
+        paths = [csv_writer.close(), jsonl.close()]
+        suppressed = None
+        if self.waivers is not None:
+            counts = sum(self.suppressed.values(), Counter())
+            suppressed = sorted(((i, self.waivers.reasons.get(i, ""), n)
+                                 for i, n in counts.items()), key=lambda r: (-r[2], r[0]))
+        paths.append(write_html(iter_jsonl(paths[1]), outdir, generated_at, suppressed))
+        if self.factory is not None:
+            paths.extend(self.factory.metrics.write(outdir))
+        return paths
+
+
+def serve(config_path: str, events_path: str, outdir: str | None, only: list[str] | None,
+          once: bool = False, poll_seconds: float = 2.0, initial_scan: bool = True,
+          snapshot_interval: float | None = None):
+    from .config import load_config
+    conf = load_config(config_path)
+    if outdir:
+        conf.output_dir = outdir
+    if conf.inventory.backend != "live":
+        print("[INFO] serve: inventory snapshots go stale, using live scans", file=sys.stderr)
+    from .aws_clients import ClientFactory
+    daemon = AuditDaemon(conf, select(only), ClientFactory.from_config(conf))
+    daemon.prepare()
+    print(f"[INFO] serve: {len(daemon.sessions)} accounts ready")
+    if initial_scan:
+        daemon.rescan(daemon.all_units())
+
+    requested = False
+
+    def on_signal(signum, frame):
+        nonlocal requested
+        requested = True
+
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, on_signal)
+
+    def write_snapshot():
+        for path in daemon.snapshot(conf.output_dir):
+            print(f"Wrote: {path}")
+
+    events = EventFile(events_path)
+    last_snapshot = time.monotonic()
+    try:
+        while True:
+            segment: list[dict] = []
+            for event in events.poll():
+                # {"snapshot": true} in the stream asks for a report at that point.
+                if event.get("snapshot"):
+                    daemon.handle(segment)
+                    segment = []
+                    write_snapshot()
+                    last_snapshot = time.monotonic()
+                else:
+                    segment.append(event)
+            n = daemon.handle(segment)
+            if n:
+                print(f"[INFO] serve: {len(segment)} events -> {n} units rescanned")
+            due = (snapshot_interval is not None
+                   and time.monotonic() - last_snapshot >= snapshot_interval)
+            if requested or due:
+                requested = False
+                write_snapshot()
+                last_snapshot = time.monotonic()
+            if once:
+                break
+            time.sleep(poll_seconds)
+    except KeyboardInterrupt:
+        print("[INFO] serve: stopping")
+    write_snapshot()
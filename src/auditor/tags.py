@@ -0,0 +1,123 @@
+"""Per-(account, region) tag index from the Resource Groups Tagging API.
+
+One paginated ``get_resources`` walk per account and region returns the tags
+of every tagged resource of the audited types, so scanners fill in
+``Finding.tags`` and check required tags without per-resource tag calls.
+Resources missing from the index have no tags.
+"""
+from __future__ import annotations
+import sys
+import threading
+
+from .fetch import fetch
+from .findings import Finding
+
+# ResourceTypeFilters for get_resources: the resources the scanners report on.
+RESOURCE_TYPES = ("ec2:elastic-ip", "ec2:security-group", "rds:db", "s3", "lambda:function")
+RESOURCES_PER_PAGE = 100
+
+
+def partition(region: str) -> str:
+    if region.startswith("cn-"):
+        return "aws-cn"
+    if region.startswith("us-gov-"):
+        return "aws-us-gov"
+    return "aws"
+
+
+def arn(service: str, region: str, account_id: str, resource: str) -> str:
+    """ARN of a resource the scanners know by ID; S3 bucket ARNs have no region or account."""
+    if service == "s3":
+        return f"arn:{partition(region)}:s3:::{resource}"
+    return f"arn:{partition(region)}:{service}:{region}:{account_id}:{resource}"
+
+
+class TagIndex:
+    """Tags by ARN, built once per (account, region) on first use and shared by all scanners.
+
+    ``required`` are the tag keys every resource must carry; empty means any
+    tag at all. A walk that fails (e.g. no tag:GetResources permission) is
+    reported once and leaves that unit's findings untagged and unchecked.
+    """
+
+    def __init__(self, required: list[str] | None = None, check_missing: bool = True):
+        self.required = list(required or [])
+        self.check_missing = check_missing
+        self._lock = threading.Lock()
+        self._locks: dict[tuple[str, str], threading.Lock] = {}
+        self._maps: dict[tuple[str, str], dict[str, dict] | None] = {}
+
+    def tags(self, session, account_id: str, region: str) -> dict[str, dict] | None:
+        key = (account_id, region)
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._maps:
+                self._maps[key] = self._build(session, account_id, region)
+            return self._maps[key]
+
+    def lookup(self, session, account_id: str, region: str, resource_arn: str) -> dict | None:
+        """Tags of one resource ({} when untagged), or None when the index is unavailable."""
+        by_arn = self.tags(session, account_id, region)
+        return None if by_arn is None else by_arn.get(resource_arn, {})
+
+    def _build(self, session, account_id, region) -> dict[str, dict] | None:
+        client = session.client("resourcegroupstaggingapi", region_name=region)
+        index = {}
+        try:
+            for r in fetch(client, "get_resources", "ResourceTagMappingList",
+                           ResourceTypeFilters=list(RESOURCE_TYPES),
+                           ResourcesPerPage=RESOURCES_PER_PAGE):
+                index[r["ResourceARN"]] = {t["Key"]: t["Value"] for t in r.get("Tags", [])}
+        except Exception as e:
+            print(f"[WARN] {account_id} {region} tags: {e}", file=sys.stderr)
+            return None
+        return index
+
+    def invalidate(self, account_id: str, region: str | None = None):
+        """Forget cached tags so the next lookup walks the API again."""
+        with self._lock:
+            for key in [k for k in self._maps if k[0] == account_id
+                        and (region is None or k[1] == region)]:
+                del self._maps[key]
+
+    def missing(self, tags: dict | None, account_id: str, region: str, service: str,
+                resource_id: str, title: str) -> list[Finding]:
+        """A LOW finding when ``tags`` lacks a required key (or, with none required, is empty).
+
+        ``tags`` is None when the index could not be built; nothing is reported then.
+        """
+        if tags is None or not self.check_missing:
+            return []
+        if self.required:
+            absent = [k for k in self.required if k not in tags]
+            details = f"Missing tags: {', '.join(absent)}"
+        else:
+            absent = [] if tags else ["*"]
+            details = "No tags present"
+        if not absent:
+            return []
+        return [Finding(
+            account_id=account_id,
+            region=region,
+            service=service,
+            resource_id=resource_id,
+            severity="LOW",
+            title=title,
+            details=details,
+            remediation="Add ownership/cost-center/environment tags.",
+            tags=tags,
+        )]
+
+
+_active: TagIndex | None = None
+
+
+def use_tag_index(index: TagIndex | None):
+    global _active
+    _active = index
+
+
+def get_tag_index() -> TagIndex:
+    """The run's shared index; callers outside a run get a private one."""
+    return _active if _active is not None else TagIndex()
@@ -0,0 +1,133 @@
+"""Accepted-risk waivers applied to the findings stream.
+
+A waiver pins any of a finding's account, region, service, resource ID and
+title to an exact value or a glob (``*``, ``?``, ``[...]``). Matching
+findings are counted per waiver and dropped as their unit produces them,
+before they are buffered, checkpointed or written.
+"""
+from __future__ import annotations
+import fnmatch
+import json
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import date
+from operator import attrgetter
+
+from .config import WAIVER_FIELDS, Waiver
+from .findings import Finding
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+def suppressed_name(suffix: str = "") -> str:
+    return f"suppressed{suffix}.json"
+
+
+class WaiverIndex:
+    """Waivers compiled for near constant-time matching.
+
+    Waivers are grouped by which fields they pin exactly. Each group is a dict
+    keyed by those values, so a finding costs one lookup per group (there are
+    only a few) and only the waivers found that way test their glob fields,
+    with the patterns compiled once here.
+    """
+
+    def __init__(self, waivers: list[Waiver], today: date | None = None):
+        today = today or date.today()
+        self.reasons: dict[str, str] = {}
+        self.expired: list[Waiver] = []
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+        groups: dict[tuple[str, ...], dict] = {}
+        for w in waivers:
+            if w.expires is not None and w.expires <= today:
+                self.expired.append(w)
+                continue
+            self.reasons[w.id] = w.reason
+            exact, globs = [], []
+            for k in WAIVER_FIELDS:
+                value = getattr(w, k)
+                if value is None:
+                    continue
+                if _GLOB_CHARS.search(value):
+                    globs.append((attrgetter(k), re.compile(fnmatch.translate(value)).match))
+                else:
+                    exact.append((k, value))
+            fields = tuple(k for k, _ in exact)
+            key = tuple(v for _, v in exact)
+            groups.setdefault(fields, {}).setdefault(key, []).append((w, tuple(globs)))
+        # attrgetter of several fields returns a tuple; of one, a bare value.
+        self._groups = [(attrgetter(*fields) if fields else None,
+                         {(k[0] if len(k) == 1 else k): v for k, v in table.items()})
+                        for fields, table in groups.items()]
+
+    def __len__(self):
+        return len(self.reasons)
+
+    def match(self, f: Finding) -> Waiver | None:
+        for key_of, table in self._groups:
+            candidates = table.get(key_of(f) if key_of else ())
+            if not candidates:
+                continue
+            for waiver, globs in candidates:
+                if all(matches(get(f)) for get, matches in globs):
+                    return waiver
+        return None
+
+    def process(self, f: Finding) -> Finding | None:
+        """``f``, or None (and counted) when a waiver suppresses it."""
+        waiver = self.match(f)
+        if waiver is None:
+            return f
+        self.add({waiver.id: 1})
+        return None
+
+    def add(self, counts: dict[str, int]):
+        """Count suppressed findings per waiver id; units call this concurrently."""
+        with self._lock:
+            self.counts.update(counts)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def summary(self) -> list[tuple[str, str, int]]:
+        """``(waiver id, reason, suppressed findings)``, most used first."""
+        return sorted(((i, self.reasons.get(i, ""), n) for i, n in self.counts.items()),
+                      key=lambda row: (-row[2], row[0]))
+
+    def write(self, outdir: str, suffix: str = "") -> str:
+        """Write the counts for ``merge`` to combine across shards."""
+        path = os.path.join(outdir, suppressed_name(suffix))
+        with open(path, "w", encoding="utf-8") as out:
+            json.dump([{"id": i, "reason": r, "count": n} for i, r, n in self.summary()], out)
+        return path
+
+
+def open_waivers(conf) -> WaiverIndex | None:
+    if not conf.waivers:
+        return None
+    index = WaiverIndex(conf.waivers)
+    for w in index.expired:
+        print(f"[WARN] waiver {w.id} expired on {w.expires}; not applied", file=sys.stderr)
+    return index
+
+
+def merge_suppressed(paths: list[str]) -> list[tuple[str, str, int]]:
+    """Sum per-waiver counts from several ``suppressed*.json`` files (missing ones skipped)."""
+    counts: Counter = Counter()
+    reasons: dict[str, str] = {}
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                rows = json.load(f)
+        except FileNotFoundError:
+            continue
+        for row in rows:
+            counts[row["id"]] += row["count"]
+            reasons[row["id"]] = row["reason"]
+    return sorted(((i, reasons[i], n) for i, n in counts.items()),
+                  key=lambda row: (-row[2], row[0]))
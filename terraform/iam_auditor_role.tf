@@ -40,12 +40,19 @@ resource "aws_iam_role_policy" "readonly" {
       Action = [
         "ec2:Describe*",
         "rds:Describe*",
+        "iam:GenerateCredentialReport",
+        "iam:GetCredentialReport",
+        "iam:ListUsers",
+        "iam:ListAccessKeys",
+        "iam:GetAccessKeyLastUsed",
+        "iam:GetAccountSummary",
         "lambda:List*",
         "lambda:Get*",
-        "cloudwatch:GetMetricStatistics",
+        "cloudwatch:GetMetricData",
         "s3:ListAllMyBuckets",
         "s3:GetBucket*",
         "s3:ListBucket",
+        "tag:GetResources",
         "organizations:List*"
       ],
       Resource = "*"
@@ -54,3 +61,14 @@ resource "aws_iam_role_policy" "readonly" {
 }
 
 output "auditor_role_arn" { value = aws_iam_role.auditor.arn }
+
+# Attach to the principal that runs the auditor (auditor_principal_arn) when
+# inventory.backend is "config": it queries the aggregator directly.
+data "aws_iam_policy_document" "management" {
+  statement {
+    actions   = ["config:SelectAggregateResourceConfig"]
+    resources = ["*"]
+  }
+}
+
+output "management_policy_json" { value = data.aws_iam_policy_document.management.json }
@@ -0,0 +1,78 @@
+import boto3
+import pytest
+from botocore.awsrequest import AWSResponse
+
+from auditor import main, serve
+from auditor.findings import Finding
+from auditor.registry import ScannerSpec
+
+
+class FakeScanners:
+    """Stands in for every scanner during a run.
+
+    ``scan(spec, account_id, region)`` yields each unit's findings; by default
+    one LOW finding named ``<account>-<check>``. ``calls`` records every
+    (account, region, check) unit scanned, in order.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.scan = self.one_finding
+
+    @staticmethod
+    def one_finding(spec, account_id, region):
+        if not spec.appends:
+            yield Finding(account_id, region, spec.finding_services[0],
+                          f"{account_id}-{spec.name}", "LOW", "t")
+
+    def load(self, spec):
+        def scan(session, account_id, region, conf):
+            self.calls.append((account_id, region, spec.name))
+            yield from self.scan(spec, account_id, region)
+        return scan
+
+
+@pytest.fixture
+def fake_scanners(monkeypatch):
+    """Replace scanners with a FakeScanners and role assumption with a dummy session."""
+    fake = FakeScanners()
+    monkeypatch.setattr(ScannerSpec, "load", lambda spec: fake.load(spec))
+    for module in (main, serve):
+        monkeypatch.setattr(module, "session_for", lambda *a: object())
+    return fake
+
+
+# Canned EC2 responses, by name, for clients that never reach the network.
+EC2_RESPONSES = {
+    "throttle": (400, b'<Response><Errors><Error><Code>RequestLimitExceeded</Code>'
+                      b'<Message>slow down</Message></Error></Errors></Response>'),
+    "ok": (200, b'<DescribeAddressesResponse xmlns="http://ec2.amazonaws.com/doc/2016-11-15/">'
+                b'<addressesSet/></DescribeAddressesResponse>'),
+}
+
+
+class _Raw:
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+@pytest.fixture
+def ec2_client():
+    """Build an EC2 client (standard retries) answering with ``EC2_RESPONSES``, in order."""
+    def build(*names):
+        responses = [EC2_RESPONSES[n] for n in names]
+        client = boto3.Session(
+            aws_access_key_id="x", aws_secret_access_key="y", region_name="us-east-1",
+        ).client("ec2", config=boto3.session.Config(retries={"mode": "standard",
+                                                             "max_attempts": 5}))
+
+        def send(request, **kwargs):
+            status, body = responses.pop(0)
+            return AWSResponse(request.url, status, {}, _Raw(body))
+
+        client.meta.events.register("before-send", send)
+        return client
+    return build
@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta, timezone
+
+from auditor import aws_clients
+from auditor.aws_clients import ClientFactory
+
+
+class FakeSTS:
+    def __init__(self, lifetimes):
+        self.lifetimes = list(lifetimes)
+        self.calls = 0
+
+    def assume_role(self, **params):
+        self.calls += 1
+        ttl = self.lifetimes.pop(0)
+        return {"Credentials": {
+            "AccessKeyId": f"AKIA{self.calls}",
+            "SecretAccessKey": "secret",
+            "SessionToken": "token",
+            "Expiration": datetime.now(timezone.utc) + ttl,
+        }}
+
+
+def test_factory_reuses_clients_and_refreshes_expiring_credentials(monkeypatch):
+    sts = FakeSTS([timedelta(minutes=1), timedelta(hours=1)])
+    monkeypatch.setattr(aws_clients, "sts_client", lambda: sts)
+    factory = ClientFactory("AuditRole", max_pool_connections=25)
+
+    sess = factory.session("111")
+    ec2 = sess.client("ec2", region_name="us-east-1")
+    assert sess.client("ec2", region_name="us-east-1") is ec2
+    assert sess.client("ec2", region_name="eu-west-1") is not ec2
+    assert ec2.meta.config.max_pool_connections == 25
+
+    # The first credentials are inside botocore's refresh window.
+    creds = ec2._request_signer._credentials.get_frozen_credentials()
+    assert creds.access_key == "AKIA2"
+    assert sts.calls == 2
@@ -0,0 +1,39 @@
+from benchmarks import run as bench
+from benchmarks.startup import loaded_modules
+from benchmarks.synthetic_org import SyntheticOrg
+
+
+def test_synthetic_org_serves_paginated_calls_per_account():
+    import boto3
+
+    org = SyntheticOrg(accounts=2, regions=["us-east-1"], resources=120)
+    with org.install():
+        sts = boto3.Session().client("sts", region_name="us-east-1")
+        creds = sts.assume_role(RoleArn=f"arn:aws:iam::{org.account_ids[1]}:role/r",
+                                RoleSessionName="bench")["Credentials"]
+        sess = boto3.Session(aws_access_key_id=creds["AccessKeyId"],
+                             aws_secret_access_key=creds["SecretAccessKey"],
+                             aws_session_token=creds["SessionToken"])
+        lam = sess.client("lambda", region_name="us-east-1")
+        fns = [f for p in lam.get_paginator("list_functions").paginate() for f in p["Functions"]]
+    assert len(fns) == 120
+    assert fns[0]["FunctionArn"].split(":")[4] == org.account_ids[1]
+    assert org.calls[("lambda", "ListFunctions")] == 3
+
+
+def test_benchmarks_report_every_scanner_and_detect_regressions():
+    args = bench.parse_args(["--accounts", "2", "--regions", "1", "--resources", "5",
+                             "--throttle-rate", "0.1", "--no-trace", "--skip-startup"])
+    results = bench.run_benchmarks(args)
+    names = [r["name"] for r in results]
+    assert names == ["iam", "s3", "ec2", "lambda", "rds", "ec2-eips", "rds-snapshots", "run()"]
+    assert all(r["api_calls"] > 0 for r in results)
+    assert results[-1]["findings"] > 0
+
+    slower = [dict(r, api_calls=r["api_calls"] + 1) for r in results]
+    assert bench.compare(results, results, 0.25) == []
+    assert len(bench.compare(slower, results, 0.25)) == len(results)
+
+
+def test_importing_the_cli_defers_boto3_jinja2_and_scanners():
+    assert loaded_modules("import auditor.main") == []
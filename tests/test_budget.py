@@ -0,0 +1,72 @@
+import csv
+import json
+import time
+
+import pytest
+
+from auditor import main
+from auditor.budget import parse_duration
+from auditor.config import Concurrency
+from auditor.findings import Finding
+from auditor.scheduler import ScanScheduler, ScanUnit
+
+
+def test_parse_duration():
+    assert parse_duration("90") == 90
+    assert parse_duration("45m") == 2700
+    assert parse_duration("1.5h") == 5400
+    with pytest.raises(ValueError):
+        parse_duration("soon")
+
+
+def test_scheduler_skips_units_not_started_by_the_deadline():
+    units = [ScanUnit(a, "us-east-1", s, fn=None, session=object())
+             for s in ("rds", "lambda") for a in ("111", "222")]
+    started, skipped = [], []
+
+    def execute(i, u):
+        started.append(i)
+        time.sleep(0.2)
+        return 1
+
+    results = ScanScheduler(Concurrency(max_workers=1)).run(
+        units, execute, time.monotonic() + 0.1, lambda i, u: skipped.append(i))
+    assert started == [0]
+    assert skipped == [1, 2, 3]
+    assert results == [1, None, None, None]
+
+
+def test_accounts_are_served_in_unit_order():
+    # The second account's first unit comes before the first account's second.
+    units = [ScanUnit(a, "r", s, None, object())
+             for a, s in (("111", "rds"), ("222", "rds"), ("111", "iam"))]
+    order = []
+    ScanScheduler(Concurrency(max_workers=1)).run(units, lambda i, u: order.append(i))
+    assert order == [0, 1, 2]
+
+
+def test_run_writes_partial_report(tmp_path, fake_scanners):
+    cfg = tmp_path / "c.yaml"
+    cfg.write_text('accounts: [{id: "111"}, {id: "222"}]\nregions: ["us-east-1"]\n'
+                   'cache: {enabled: false}\nconcurrency: {max_workers: 1}\n')
+
+    def slow_scan(spec, account_id, region):
+        time.sleep(0.4)
+        yield Finding(account_id, region, spec.finding_services[0], spec.name, "HIGH", "t")
+
+    fake_scanners.scan = slow_scan
+    out = tmp_path / "out"
+    main.cli(["--config", str(cfg), "--only", "iam,s3", "--out", str(out),
+              "--time-budget", "0.2s"])
+
+    rows = list(csv.DictReader(open(out / "findings.csv")))
+    assert [(r["account_id"], r["service"]) for r in rows] == [("111", "S3")]
+    skipped = json.loads((out / "skipped-units.json").read_text())
+    assert [(u["account_id"], u["check"]) for u in skipped["units"]] == [
+        ("222", "s3"), ("111", "iam"), ("222", "iam")]
+    assert "Partial report" in (out / "findings.html").read_text()
+    assert not (out / "history").exists()  # a partial run is not history
+
+    main.cli(["--config", str(cfg), "--only", "rds", "--out", str(out)])
+    assert not (out / "skipped-units.json").exists()
+    assert (out / "history").is_dir()
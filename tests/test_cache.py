@@ -0,0 +1,82 @@
+from botocore.exceptions import ClientError
+
+from auditor.cache import AuditCache
+from auditor.findings import Finding
+
+
+def _f(rid, service="EC2"):
+    return Finding("111", "us-east-1", service, rid, "LOW", "t")
+
+
+def test_fingerprint_hit_miss_and_expiry(tmp_path):
+    cache = AuditCache(str(tmp_path / "c.sqlite"))
+    assert cache.lookup("111", "s3:bucket", "b", "fp1") is None
+    cache.store("111", "s3:bucket", "b", "fp1", [_f("b")])
+    assert [f.resource_id for f in cache.lookup("111", "s3:bucket", "b", "fp1")] == ["b"]
+    assert cache.lookup("111", "s3:bucket", "b", "fp2") is None
+
+    stale = AuditCache(str(tmp_path / "c.sqlite"), max_age_days=0)
+    assert stale.lookup("111", "s3:bucket", "b", "fp1") is None
+    full = AuditCache(str(tmp_path / "c.sqlite"), use_fingerprints=False)
+    assert full.lookup("111", "s3:bucket", "b", "fp1") is None
+
+
+def test_status_labels_across_runs(tmp_path):
+    path = str(tmp_path / "c.sqlite")
+    cache = AuditCache(path)
+    cache.begin_run()
+    assert [cache.label(_f(r)).status for r in ("a", "b", "b")] == ["new", "new", "new"]
+    cache.label(_f("x", service="RDS"))
+    assert list(cache.resolved(lambda *k: True)) == []
+    cache.close()
+
+    cache = AuditCache(path)
+    cache.begin_run()
+    assert cache.label(_f("b")).status == "persisting"
+    assert cache.label(_f("c")).status == "new"
+    # Only EC2 was scanned this time: the RDS finding is out of scope.
+    gone = list(cache.resolved(lambda a, r, s: s == "EC2"))
+    assert [(f.resource_id, f.status) for f in gone] == [("a", "resolved")]
+    # Resolved findings are reported once.
+    assert list(cache.resolved(lambda a, r, s: s == "EC2")) == []
+
+
+class _Ec2:
+    def __init__(self, fail):
+        self.fail = fail
+
+    def can_paginate(self, operation):
+        return False
+
+    def describe_security_groups(self, **kwargs):
+        if self.fail:
+            raise ClientError({"Error": {"Code": "Throttling", "Message": "slow down"}},
+                              "DescribeSecurityGroups")
+        return {"SecurityGroups": [{"GroupId": "sg-1", "IpPermissions": [
+            {"IpRanges": [{"CidrIp": "0.0.0.0/0"}]}]}]}
+
+    def get_resources(self, **kwargs):
+        return {"ResourceTagMappingList": []}
+
+
+def test_failed_unit_does_not_resolve_earlier_findings(tmp_path, monkeypatch, capsys):
+    from auditor import main
+
+    cfg = tmp_path / "c.yaml"
+    cfg.write_text(f'output_dir: {tmp_path}\naccounts: [{{id: "111"}}]\n'
+                   'regions: ["us-east-1"]\nhistory: {enabled: false}\n')
+    fail = {"on": False}
+
+    class Session:
+        def client(self, name, region_name=None):
+            return _Ec2(fail["on"])
+
+    monkeypatch.setattr(main, "session_for", lambda *a: Session())
+    main.cli(["--config", str(cfg), "--only", "ec2"])
+    fail["on"] = True
+    main.cli(["--config", str(cfg), "--only", "ec2"])
+    assert "[WARN] 111 us-east-1 ec2: An error occurred (Throttling)" in capsys.readouterr().err
+    assert (tmp_path / "findings.jsonl").read_text() == ""  # sg-1 is not "resolved"
+    fail["on"] = False
+    main.cli(["--config", str(cfg), "--only", "ec2"])
+    assert '"status": "persisting"' in (tmp_path / "findings.jsonl").read_text()
@@ -0,0 +1,131 @@
+import csv
+
+import pytest
+from botocore.exceptions import ClientError
+
+from auditor import main
+from auditor.checkpoint import Checkpoint
+from auditor.findings import Finding
+from auditor.scheduler import ScanUnit
+
+CONFIG = """
+accounts:
+  - id: "111"
+  - id: "222"
+regions: ["us-east-1"]
+cache:
+  enabled: false
+concurrency:
+  max_workers: 1
+"""
+
+
+def test_checkpoint_replays_units_and_ignores_torn_tail(tmp_path):
+    unit = ScanUnit("111", "us-east-1", "ec2", fn=None)
+    cp = Checkpoint(str(tmp_path))
+    cp.record_regions("111", ["us-east-1"])
+    cp.record(unit, [Finding("111", "us-east-1", "EC2", "sg-1", "LOW", "t")])
+    cp.close()
+    with open(cp.path, "ab") as f:
+        f.write(b'{"unit": "111|us-east-1|rds", "findi')
+
+    cp = Checkpoint(str(tmp_path), resume=True)
+    assert cp.completed == 1 and cp.regions("111") == ["us-east-1"]
+    assert [f.resource_id for f in cp.replay(unit)] == ["sg-1"]
+    assert not cp.is_done(ScanUnit("111", "us-east-1", "rds", fn=None))
+
+
+def test_spool_reads_back_while_running_and_after_commit(tmp_path):
+    cp = Checkpoint(str(tmp_path))
+    unit = ScanUnit("111", "us-east-1", "ec2", fn=None)
+    spool = cp.spool(unit)
+    spool.add(Finding("111", "us-east-1", "EC2", "sg-1", "LOW", "t"))
+    assert [f.resource_id for f in spool] == ["sg-1"]
+    spool.add(Finding("111", "us-east-1", "EC2", "sg-2", "LOW", "t"))
+    spool.commit()
+    assert spool.committed and not list(tmp_path.glob(".spool-*"))
+    assert [f.resource_id for f in cp.spool(unit)] == ["sg-1", "sg-2"]
+    cp.close()
+
+    cp = Checkpoint(str(tmp_path), resume=True)
+    assert [f.resource_id for f in cp.replay(unit)] == ["sg-1", "sg-2"]
+
+
+def test_resume_skips_completed_units(tmp_path, fake_scanners):
+    cfg = tmp_path / "c.yaml"
+    cfg.write_text(CONFIG)
+    out = tmp_path / "out"
+
+    def crash_on_222_ec2(spec, account_id, region):
+        if (account_id, spec.name) == ("222", "ec2"):
+            raise KeyboardInterrupt
+        yield from fake_scanners.one_finding(spec, account_id, region)
+
+    fake_scanners.scan = crash_on_222_ec2
+    with pytest.raises(KeyboardInterrupt):
+        main.run(str(cfg), None, str(out))
+    assert not list(out.glob(".spool-*"))
+    first = [(a, check) for a, _, check in fake_scanners.calls]
+    assert ("111", "rds") in first and first[-1] == ("222", "ec2")
+
+    fake_scanners.calls.clear()
+    fake_scanners.scan = fake_scanners.one_finding
+    main.run(str(cfg), None, str(out), resume=True)
+    calls = [(a, check) for a, _, check in fake_scanners.calls]
+    assert not set(calls) & set(first[:-1])
+    assert ("222", "ec2") in calls
+
+    rows = list(csv.DictReader(open(out / "findings.csv")))
+    ids = [r["resource_id"] for r in rows]
+    assert ids == [f"{a}-{s}" for a in ("111", "222") for s in ("iam", "s3", "ec2", "lambda", "rds")]
+
+
+def test_unit_failing_with_client_error_is_not_checkpointed(tmp_path, monkeypatch):
+    class Rds:
+        def can_paginate(self, operation):
+            return False
+
+        def describe_db_instances(self, **kwargs):
+            raise ClientError({"Error": {"Code": "Throttling", "Message": "slow down"}},
+                              "DescribeDBInstances")
+
+        def describe_db_snapshots(self, **kwargs):
+            return {"DBSnapshots": []}
+
+    class Session:
+        def client(self, name, region_name=None):
+            return Rds()
+
+    cfg = tmp_path / "c.yaml"
+    cfg.write_text(CONFIG)
+    monkeypatch.setattr(main, "session_for", lambda *a: Session())
+    main.run(str(cfg), ["rds"], str(tmp_path))
+
+    cp = Checkpoint(str(tmp_path), resume=True)
+    assert cp.is_done(ScanUnit("111", "us-east-1", "rds-snapshots", fn=None))
+    assert not cp.is_done(ScanUnit("111", "us-east-1", "rds", fn=None))
+    assert cp.completed == 2  # both accounts' rds-snapshots units only
+
+
+def test_finished_or_different_run_cannot_be_resumed(tmp_path, fake_scanners):
+    cfg = tmp_path / "c.yaml"
+    cfg.write_text(CONFIG)
+    out = tmp_path / "out"
+
+    def crash_on_222(spec, account_id, region):
+        if account_id == "222":
+            raise KeyboardInterrupt
+        yield from fake_scanners.one_finding(spec, account_id, region)
+
+    fake_scanners.scan = crash_on_222
+    with pytest.raises(KeyboardInterrupt):
+        main.run(str(cfg), ["ec2"], str(out))
+    with pytest.raises(SystemExit, match="checks"):
+        main.run(str(cfg), ["rds"], str(out), resume=True)
+
+    fake_scanners.scan = fake_scanners.one_finding
+    main.run(str(cfg), ["ec2"], str(out), resume=True)
+    fake_scanners.calls.clear()
+    with pytest.raises(SystemExit, match="finished"):
+        main.run(str(cfg), ["ec2"], str(out), resume=True)
+    assert fake_scanners.calls == []
@@ -0,0 +1,60 @@
+import boto3
+from botocore.stub import Stubber
+
+from auditor.fetch import fetch
+from auditor.scanners.ec2 import OPEN_TO_WORLD, SG_PAGE_SIZE, scan_ec2
+
+
+def _ec2():
+    return boto3.Session(aws_access_key_id="x", aws_secret_access_key="y",
+                         region_name="us-east-1").client("ec2")
+
+
+def _sg(group_id, cidr):
+    return {"GroupId": group_id, "IpPermissions": [{"IpRanges": [{"CidrIp": cidr}]}]}
+
+
+def test_fetch_pushes_filters_and_pages_lazily():
+    ec2 = _ec2()
+    filters = [{"Name": "ip-permission.cidr", "Values": ["0.0.0.0/0"]}]
+    with Stubber(ec2) as stub:
+        stub.add_response("describe_security_groups",
+                          {"SecurityGroups": [_sg("sg-1", "0.0.0.0/0")], "NextToken": "t"},
+                          {"Filters": filters, "MaxResults": 5})
+        stub.add_response("describe_security_groups",
+                          {"SecurityGroups": [_sg("sg-2", "0.0.0.0/0")]},
+                          {"Filters": filters, "MaxResults": 5, "NextToken": "t"})
+        items = fetch(ec2, "describe_security_groups", "SecurityGroups",
+                      filters=OPEN_TO_WORLD, page_size=5)
+        assert next(items)["GroupId"] == "sg-1"
+        assert len(stub._queue) == 1  # second page not requested yet
+        assert [sg["GroupId"] for sg in items] == ["sg-2"]
+        stub.assert_no_pending_responses()
+
+
+def test_fetch_calls_unpaginated_operations_once():
+    ec2 = _ec2()
+    with Stubber(ec2) as stub:
+        stub.add_response("describe_addresses", {"Addresses": [{"PublicIp": "1.2.3.4"}]}, {})
+        assert [a["PublicIp"] for a in fetch(ec2, "describe_addresses", "Addresses")] == \
+            ["1.2.3.4"]
+
+
+class _Session:
+    def __init__(self, client):
+        self._client = client
+
+    def client(self, name, region_name=None):
+        return self._client
+
+
+def test_scan_ec2_only_reports_world_open_rules():
+    ec2 = _ec2()
+    with Stubber(ec2) as stub:
+        # The filter matches a group by any rule; the scanner still checks each one.
+        stub.add_response("describe_security_groups",
+                          {"SecurityGroups": [_sg("sg-1", "0.0.0.0/0"), _sg("sg-2", "10.0.0.0/8")]},
+                          {"Filters": [{"Name": "ip-permission.cidr", "Values": ["0.0.0.0/0"]}],
+                           "MaxResults": SG_PAGE_SIZE})
+        findings = list(scan_ec2(_Session(ec2), "111", "us-east-1", None))
+    assert [f.resource_id for f in findings] == ["sg-1"]
@@ -0,0 +1,35 @@
+from auditor.findings import MAX_DETAILS_LEN, Finding, format_details
+
+
+def _f(**kw):
+    # The account ID is built at run time, so only interning makes two of them identical.
+    return Finding(**{"account_id": "".join(["1", "11"]), "region": "us-east-1",
+                      "service": "EC2", "resource_id": "i-1", "severity": "LOW",
+                      "title": "t", **kw})
+
+
+def test_low_cardinality_fields_are_interned():
+    a, b = _f(), _f()
+    for name in ("account_id", "region", "service", "severity", "title", "remediation",
+                 "status"):
+        assert getattr(a, name) is getattr(b, name)
+    assert not hasattr(a, "__dict__")
+
+
+def test_details_are_flattened_and_bounded():
+    assert format_details(None) == ""
+    assert format_details({"a": 1, "b": True, "nested": {"x": 1}}) == "a=1, b=True"
+    assert format_details(["x", "y"]) == "x; y"
+    text = format_details("z" * 2000)
+    assert len(text) == MAX_DETAILS_LEN and text.endswith("…")
+    assert format_details("z" * MAX_DETAILS_LEN) == "z" * MAX_DETAILS_LEN
+    assert _f(details=["q"] * 1000).details == format_details(["q"] * 1000)
+
+
+def test_equality_compares_every_field():
+    assert _f() == _f() and _f(tags={}) == _f()
+    assert _f() != _f(status="new")
+    assert _f(tags={"k": "v"}) != _f()
+    assert _f() != _f().to_dict()
+    assert Finding.from_dict(_f(details={"a": 1}).to_dict()) == _f(details="a=1")
+
@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from auditor import main
+from auditor.findings import Finding
+from auditor.history import append_run, query
+
+NOW = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+
+def _findings(account_id, n_high, n_low, service="EC2"):
+    for i in range(n_high):
+        yield Finding(account_id, "us-east-1", service, f"h{i}", "HIGH", "t", tags={"a": "b"})
+    for i in range(n_low):
+        yield Finding(account_id, "us-east-1", service, f"l{i}", "LOW", "t")
+
+
+@pytest.fixture
+def history(tmp_path):
+    root = str(tmp_path / "history")
+    append_run([*_findings("011111111111", 2, 1), *_findings("222222222222", 1, 0, "S3")],
+               root, "2026-10-10T02:00:00+00:00")
+    append_run(_findings("011111111111", 3, 0), root, "2026-10-17T02:00:00+00:00")
+    append_run(_findings("011111111111", 9, 0), root, "2026-08-01T02:00:00+00:00")
+    return root
+
+
+def test_query_filters_partitions_and_groups(history):
+    df = query(history, days=30, severity="HIGH", now=NOW)
+    assert df.values.tolist() == [["2026-10-10", "011111111111", 2],
+                                  ["2026-10-10", "222222222222", 1],
+                                  ["2026-10-17", "011111111111", 3]]
+    df = query(history, days=None, service="EC2", by=("account_id",), now=NOW)
+    assert df.values.tolist() == [["011111111111", 15]]
+    assert query(history, account_id="333", now=NOW).empty
+
+
+def test_query_rejects_unknown_columns(history):
+    with pytest.raises(ValueError):
+        query(history, by=("nope",))
+
+
+def test_query_subcommand(history, capsys):
+    main.cli(["query", "--history", history, "--days", "0", "--by", "service", "--csv"])
+    assert capsys.readouterr().out == "service,findings\nEC2,15\nS3,1\n"
+
+
+def test_resolved_findings_are_not_stored(tmp_path):
+    root = str(tmp_path / "history")
+    append_run([Finding("011111111111", "us-east-1", "EC2", "a", "HIGH", "t", status="persisting"),
+                Finding("011111111111", "us-east-1", "EC2", "b", "HIGH", "t", status="resolved"),
+                Finding("011111111111", "us-east-1", "EC2", "c", "HIGH", "t")],
+               root, "2026-10-17T02:00:00+00:00")
+    df = query(root, by=("resource_id",), now=NOW)
+    assert df.resource_id.tolist() == ["a", "c"]
@@ -0,0 +1,47 @@
+import json
+import os
+
+from auditor.findings import Finding
+from auditor.reporters import html_reporter
+from auditor.reporters.html_reporter import write_html
+
+
+def _findings():
+    for acct, n in (("111", 3), ("222", 2)):
+        for i in range(n):
+            yield Finding(acct, "us-east-1", "EC2" if i else "S3", f"{acct}-r{i}",
+                          "HIGH" if i == 0 else "LOW", "t", status="new")
+
+
+def test_small_report_embeds_findings_with_summary(tmp_path):
+    html = open(write_html(_findings(), str(tmp_path), "now")).read()
+    assert "111-r2" in html and "5 findings" in html and "5 new" in html
+    assert not os.path.exists(tmp_path / "findings-data")
+
+
+def test_large_report_pages_findings_from_chunk_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(html_reporter, "CHUNK_SIZE", 2)
+    html = open(write_html(_findings(), str(tmp_path), "now")).read()
+
+    chunks = sorted(os.listdir(tmp_path / "findings-data"))
+    assert chunks == ["chunk-00000.js", "chunk-00001.js", "chunk-00002.js"]
+    second = open(tmp_path / "findings-data" / chunks[1]).read()
+    assert second.startswith("auditorChunk(1,")
+    assert [r[3] for r in json.loads(second[len("auditorChunk(1,"):-3])] == ["111-r2", "222-r0"]
+
+    # The page only carries aggregates and the chunk index, not the rows.
+    assert "111-r2" not in html
+    index = json.loads(html.split("const REPORT = ")[1].split(";\n")[0])["filter_chunks"]
+    assert index["111/"] == [0, 1] and index["222/"] == [1, 2]
+    # Severity filters page only over chunks holding a matching row.
+    assert index["/HIGH"] == [0, 1] and index["/LOW"] == [0, 1, 2]
+    assert index["111/HIGH"] == [0] and index["222/LOW"] == [2]
+    assert '<td class="n">2</td><td class="n">0</td><td class="n">3</td>' in html  # by severity
+
+
+def test_resolved_findings_are_listed_but_not_totalled(tmp_path):
+    findings = [*_findings(), Finding("111", "us-east-1", "EC2", "gone", "HIGH", "t",
+                                      status="resolved")]
+    html = open(write_html(findings, str(tmp_path), "now")).read()
+    assert "gone" in html and "5 findings" in html and "1 resolved" in html
+    assert '<td class="n">2</td><td class="n">0</td><td class="n">3</td>' in html  # by severity
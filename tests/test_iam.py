@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+
+from auditor.config import Config
+from auditor.scanners.iam import scan_iam
+
+REPORT = (
+    "user,arn,access_key_1_active,access_key_1_last_rotated,access_key_1_last_used_date,"
+    "access_key_2_active,access_key_2_last_rotated,access_key_2_last_used_date\n"
+    "<root_account>,arn:root,false,N/A,N/A,false,N/A,N/A\n"
+    "alice,arn:alice,true,2020-01-01T00:00:00+00:00,2020-01-02T00:00:00+00:00,"
+    "false,N/A,N/A\n"
+    "bob,arn:bob,true,{fresh},N/A,true,{fresh},{fresh}\n"
+)
+
+
+class FakeIAM:
+    def __init__(self, states, fail=False):
+        self.states = list(states)
+        self.fail = fail
+
+    def generate_credential_report(self):
+        if self.fail:
+            raise RuntimeError("AccessDenied")
+        return {"State": self.states.pop(0) if len(self.states) > 1 else self.states[0]}
+
+    def get_credential_report(self):
+        fresh = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+        return {"Content": REPORT.format(fresh=fresh).encode()}
+
+    def get_paginator(self, name):
+        class P:
+            def paginate(self, **kw):
+                return [{"Users": []}] if name == "list_users" else []
+        return P()
+
+
+class FakeSession:
+    def __init__(self, iam):
+        self.iam = iam
+
+    def client(self, name, **kw):
+        return self.iam
+
+
+def test_credential_report_findings(monkeypatch):
+    monkeypatch.setattr("auditor.scanners.iam.time.sleep", lambda s: None)
+    iam = FakeIAM(["STARTED", "INPROGRESS", "COMPLETE"])
+    findings = list(scan_iam(FakeSession(iam), "111", "global", Config()))
+    got = sorted((f.resource_id, f.title) for f in findings)
+    assert got == [
+        ("alice/access_key_1", "Access key exceeds max age"),
+        ("alice/access_key_1", "Stale or never-used access key"),
+        ("bob/access_key_1", "Stale or never-used access key"),
+    ]
+
+
+def test_falls_back_to_per_key_scan():
+    sess = FakeSession(FakeIAM(["COMPLETE"], fail=True))
+    assert list(scan_iam(sess, "111", "global", Config())) == []
+
+
+def test_per_key_scan_uses_report_slots_and_skips_inactive_keys():
+    old = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    new = datetime.now(timezone.utc)
+    keys = [{"AccessKeyId": "AKIA2", "Status": "Active", "CreateDate": new},
+            {"AccessKeyId": "AKIA1", "Status": "Inactive", "CreateDate": old}]
+
+    class PerKeyIAM(FakeIAM):
+        def get_paginator(self, name):
+            class P:
+                def paginate(self, **kw):
+                    if name == "list_users":
+                        return [{"Users": [{"UserName": "carol"}]}]
+                    return [{"AccessKeyMetadata": keys}]
+            return P()
+
+        def get_access_key_last_used(self, AccessKeyId):
+            assert AccessKeyId == "AKIA2"
+            return {"AccessKeyLastUsed": {}}
+
+    findings = list(scan_iam(FakeSession(PerKeyIAM(["COMPLETE"], fail=True)), "111", "global",
+                             Config()))
+    assert [(f.resource_id, f.title) for f in findings] == [
+        ("carol/access_key_2", "Stale or never-used access key")]
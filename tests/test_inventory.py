@@ -0,0 +1,159 @@
+import json
+
+import boto3
+from botocore.stub import Stubber
+
+from auditor.cache import AuditCache, use_cache
+from auditor.inventory import ConfigInventory, use_inventory
+from auditor.scanners.ec2 import scan_ec2
+from auditor.scanners.s3 import _props_from_config, scan_s3
+
+AGG = "org-aggregator"
+
+
+def _config():
+    return boto3.Session(aws_access_key_id="x", aws_secret_access_key="y",
+                         region_name="us-east-1").client("config")
+
+
+def _select(stub, expression, rows):
+    stub.add_response("select_aggregate_resource_config",
+                      {"Results": [json.dumps(r) for r in rows]},
+                      {"Expression": expression, "ConfigurationAggregatorName": AGG,
+                       "Limit": 100})
+
+
+COVERAGE = ("SELECT accountId, awsRegion, resourceType, COUNT(*) "
+            "GROUP BY accountId, awsRegion, resourceType")
+
+
+def _type_query(resource_type):
+    return ("SELECT accountId, awsRegion, resourceId, resourceName, configuration, "
+            "supplementaryConfiguration, tags, configurationItemCaptureTime "
+            f"WHERE resourceType = '{resource_type}'")
+
+
+class NoApiSession:
+    def client(self, *a, **k):
+        return object()  # any live call would fail
+
+
+def test_security_groups_come_from_the_aggregator_with_live_fallback():
+    client = _config()
+    sg = {"accountId": "111", "awsRegion": "us-east-1", "resourceId": "sg-1",
+          "configuration": {"groupId": "sg-1", "ipPermissions": [
+              {"ipProtocol": "tcp", "fromPort": 22, "toPort": 22,
+               "ipv4Ranges": [{"cidrIp": "0.0.0.0/0"}], "ipRanges": ["0.0.0.0/0"]}]}}
+    with Stubber(client) as stub:
+        _select(stub, COVERAGE, [{"accountId": "111", "awsRegion": "us-east-1",
+                                  "resourceType": "AWS::EC2::SecurityGroup", "COUNT(*)": 4}])
+        _select(stub, _type_query("AWS::EC2::SecurityGroup"), [sg])
+        inv = ConfigInventory(client, AGG, ["AWS::EC2::SecurityGroup", "AWS::EC2::EIP"])
+        use_inventory(inv)
+        try:
+            findings = list(scan_ec2(NoApiSession(), "111", "us-east-1", None))
+        finally:
+            use_inventory(None)
+        # Not recorded in this region / not a configured type: scanners go live.
+        assert inv.records("AWS::EC2::SecurityGroup", "111", "eu-west-1") is None
+        assert inv.records("AWS::RDS::DBInstance", "111", "us-east-1") is None
+        stub.assert_no_pending_responses()
+    assert [f.resource_id for f in findings] == ["sg-1"]
+
+
+def test_s3_evaluates_config_records_and_probes_only_policies():
+    public_acl = {"grantList": [{"grantee": "AllUsers", "permission": "Read"}]}
+    props = _props_from_config({
+        "AccessControlList": public_acl,
+        "BucketVersioningConfiguration": {"status": "Suspended"},
+        "BucketLifecycleConfiguration": {"rules": [{"id": "expire"}]},
+        "ServerSideEncryptionConfiguration": {"rules": [{}]},
+    })
+    assert props == {"policy_public": False, "acl_public": True, "encryption_missing": False,
+                     "versioning_missing": True, "lifecycle_missing": False}
+
+    class Inventory:
+        def records(self, resource_type, account_id, region=None):
+            return [{"Name": "b1", "Region": "eu-west-1", "Supplementary": {
+                "BucketPolicy": {"policyText": "{}"},
+                "BucketVersioningConfiguration": {"status": "Enabled"},
+                "ServerSideEncryptionConfiguration": {"rules": [{}]}}}]
+
+    probed = []
+
+    class S3:
+        def get_bucket_policy_status(self, Bucket):
+            probed.append(Bucket)
+            return {"PolicyStatus": {"IsPublic": True}}
+
+    class Session:
+        def client(self, name, region_name=None):
+            assert region_name == "eu-west-1"
+            return S3()
+
+    use_inventory(Inventory())
+    try:
+        findings = list(scan_s3(Session(), "111", "global", None))
+    finally:
+        use_inventory(None)
+    assert probed == ["b1"]
+    assert [(f.region, f.title) for f in findings] == [
+        ("eu-west-1", "S3 bucket is public"),
+        ("eu-west-1", "S3 bucket missing lifecycle policy")]
+
+
+def test_unchanged_config_item_replays_the_policy_probe(tmp_path):
+    captured = {"at": "2026-10-17T02:00:00Z"}
+
+    class Inventory:
+        def records(self, resource_type, account_id, region=None):
+            return [{"Name": "b1", "Region": "eu-west-1", "Tags": {},
+                     "CaptureTime": captured["at"], "Supplementary": {
+                         "BucketPolicy": {"policyText": "{}"},
+                         "BucketLifecycleConfiguration": {"rules": [{"id": "expire"}]},
+                         "BucketVersioningConfiguration": {"status": "Enabled"},
+                         "ServerSideEncryptionConfiguration": {"rules": [{}]}}}]
+
+    probed = []
+
+    class Session:
+        def client(self, name, region_name=None):
+            class S3:
+                def get_bucket_policy_status(self, Bucket):
+                    probed.append(Bucket)
+                    return {"PolicyStatus": {"IsPublic": True}}
+            return S3()
+
+    use_inventory(Inventory())
+    use_cache(AuditCache(str(tmp_path / "c.sqlite")))
+    try:
+        runs = [list(scan_s3(Session(), "111", "global", None)) for _ in range(2)]
+        captured["at"] = "2026-10-18T02:00:00Z"  # e.g. the policy was edited
+        runs.append(list(scan_s3(Session(), "111", "global", None)))
+    finally:
+        use_inventory(None)
+        use_cache(None)
+    assert probed == ["b1", "b1"]
+    assert runs[0] == runs[1] == runs[2] and runs[0][0].title == "S3 bucket is public"
+
+
+def test_types_excluded_from_recording_fall_back_to_live():
+    client = _config()
+    covered = [{"accountId": "111", "awsRegion": r, "resourceType": t, "COUNT(*)": 1}
+               for r, t in (("us-east-1", "AWS::EC2::SecurityGroup"),
+                            ("us-east-1", "AWS::S3::Bucket"),
+                            ("eu-west-1", "AWS::EC2::SecurityGroup"))]
+    covered.append({"accountId": "222", "awsRegion": "us-east-1",
+                    "resourceType": "AWS::S3::Bucket", "COUNT(*)": 1})
+    bucket = {"accountId": "222", "awsRegion": "us-east-1", "resourceName": "b",
+              "configuration": {"name": "b"}}
+    with Stubber(client) as stub:
+        _select(stub, COVERAGE, covered)
+        _select(stub, _type_query("AWS::EC2::EIP"), [])
+        _select(stub, _type_query("AWS::S3::Bucket"), [bucket])
+        inv = ConfigInventory(client, AGG, ["AWS::EC2::EIP", "AWS::S3::Bucket"])
+        # The region is recorded, but not its Elastic IPs.
+        assert inv.records("AWS::EC2::EIP", "111", "us-east-1") is None
+        # eu-west-1 has Config data but no buckets recorded: list them live.
+        assert inv.records("AWS::S3::Bucket", "111") is None
+        assert [b["Name"] for b in inv.records("AWS::S3::Bucket", "222")] == ["b"]
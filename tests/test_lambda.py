@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+
+from auditor.scanners.lambda_svc import invocation_totals
+
+
+class FakeCloudWatch:
+    def __init__(self, invoked):
+        self.invoked = invoked
+        self.requests = []
+
+    def get_paginator(self, name):
+        assert name == "get_metric_data"
+        return self
+
+    def paginate(self, MetricDataQueries, StartTime, EndTime):
+        self.requests.append(len(MetricDataQueries))
+        results = []
+        for q in MetricDataQueries:
+            fn = q["MetricStat"]["Metric"]["Dimensions"][0]["Value"]
+            results.append({"Id": q["Id"], "Values": [1.0, 2.0] if fn in self.invoked else []})
+        # Split across two pages like a NextToken continuation would.
+        half = len(results) // 2
+        return [{"MetricDataResults": results[:half]}, {"MetricDataResults": results[half:]}]
+
+
+def test_invocation_totals_batches_500_queries_per_request():
+    names = [f"fn-{i}" for i in range(1203)]
+    cw = FakeCloudWatch(invoked={"fn-0", "fn-700", "fn-1202"})
+    now = datetime.now(timezone.utc)
+    totals = invocation_totals(cw, names, now, now)
+
+    assert cw.requests == [500, 500, 203]
+    assert {n for n, v in totals.items() if v} == {"fn-0", "fn-700", "fn-1202"}
+    assert totals["fn-700"] == 3.0
+    assert totals["fn-1"] == 0
@@ -0,0 +1,67 @@
+import csv
+import json
+
+import pytest
+
+from auditor import main
+from auditor.assume import shard_accounts
+from auditor.config import Account
+from auditor.merge import missing_shards, parse_shard
+
+CONFIG = """
+accounts: [{id: "111"}, {id: "222"}, {id: "333"}, {id: "444"}, {id: "555"}]
+regions: ["us-east-1"]
+cache:
+  enabled: false
+"""
+
+
+def test_shards_partition_accounts_independently_of_order():
+    accounts = [Account(id=str(n)) for n in range(100, 140)]
+    shards = [shard_accounts(accounts, i, 3) for i in (1, 2, 3)]
+    assert sorted(a.id for s in shards for a in s) == [a.id for a in accounts]
+    assert all(shards)
+    assert shard_accounts(accounts[::-1], 2, 3) == shards[1][::-1]
+
+
+def test_parse_shard_and_missing_shards():
+    assert parse_shard("2/4") == (2, 4)
+    for bad in ("0/4", "5/4", "x", "1/"):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+    assert missing_shards(["a/findings.shard-1-of-3.jsonl",
+                           "b/findings.shard-3-of-3.jsonl"]) == ["2/3"]
+
+
+def test_sharded_runs_merge_into_full_report(tmp_path, fake_scanners):
+    cfg = tmp_path / "c.yaml"
+    cfg.write_text(CONFIG)
+
+    partials = []
+    for i in (1, 2):
+        out = tmp_path / f"worker{i}"
+        main.run(str(cfg), ["ec2"], str(out), shard=(i, 2))
+        assert not (out / "findings.csv").exists()
+        partials.append(str(out / f"findings.shard-{i}-of-2.jsonl"))
+
+    main.cli(["merge", "--out", str(tmp_path / "final"), *partials])
+    rows = list(csv.DictReader(open(tmp_path / "final" / "findings.csv")))
+    assert sorted(r["account_id"] for r in rows) == ["111", "222", "333", "444", "555"]
+    assert (tmp_path / "final" / "findings.html").exists()
+
+
+def test_shards_sharing_an_output_dir_keep_their_own_state(tmp_path, fake_scanners):
+    cfg = tmp_path / "c.yaml"
+    cfg.write_text(CONFIG.replace("enabled: false", "enabled: true"))
+    out = tmp_path / "out"
+    for i in (1, 2):
+        main.run(str(cfg), ["ec2"], str(out), shard=(i, 2))
+    for name in ("checkpoint.shard-{}-of-2.jsonl", "auditor-cache.shard-{}-of-2.sqlite"):
+        assert all((out / name.format(i)).exists() for i in (1, 2))
+    assert not (out / "checkpoint.jsonl").exists()
+
+    for i in (1, 2):
+        shard = {a.id for a in shard_accounts([Account(id=n * 3) for n in "12345"], i, 2)}
+        units = [json.loads(line).get("unit")
+                 for line in open(out / f"checkpoint.shard-{i}-of-2.jsonl")]
+        assert {u.split("|")[0] for u in units if u} == shard
@@ -0,0 +1,26 @@
+import json
+
+from auditor.metrics import ApiMetrics
+
+
+def test_metrics_count_calls_retries_and_throttles(tmp_path, monkeypatch, ec2_client):
+    monkeypatch.setattr("botocore.retries.standard.time.sleep", lambda s: None, raising=False)
+    metrics = ApiMetrics()
+    client = metrics.attach(ec2_client("throttle", "ok", "ok"), "111", "us-east-1")
+    client.describe_addresses()
+    client.describe_addresses()
+
+    [rec] = metrics.snapshot()
+    assert (rec["account_id"], rec["service"], rec["operation"]) == \
+        ("111", "ec2", "DescribeAddresses")
+    assert rec["calls"] == 2 and rec["retries"] == 1 and rec["throttles"] == 1
+    assert sum(rec["latency_buckets"].values()) == 2
+    assert metrics.slowest()[0].startswith("[API] ec2:DescribeAddresses: 2 calls")
+
+    json_path, prom_path = metrics.write(str(tmp_path))
+    assert json.load(open(json_path))["operations"][0]["calls"] == 2
+    prom = open(prom_path).read()
+    assert ('auditor_api_throttles_total{account_id="111",region="us-east-1",'
+            'service="ec2",operation="DescribeAddresses"} 1') in prom
+    assert 'le="+Inf"} 2' in prom
+    assert "auditor_api_latency_seconds_count" in prom
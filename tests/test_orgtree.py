@@ -0,0 +1,71 @@
+import pytest
+
+from auditor.assume import get_target_accounts
+from auditor.config import Config
+from auditor.orgtree import OrgTree, load_org_tree
+
+# Root ─ Prod ─ Web   (111 ACTIVE, 222 SUSPENDED)
+#      │      └ 333 ACTIVE
+#      ├ Sandbox (444 ACTIVE)
+#      └ 555 ACTIVE
+CHILD_OUS = {"r-1": [{"Id": "ou-prod", "Name": "Prod"}, {"Id": "ou-sb", "Name": "Sandbox"}],
+             "ou-prod": [{"Id": "ou-web", "Name": "Web"}]}
+CHILD_ACCOUNTS = {"ou-web": [{"Id": "111", "Name": "web", "Status": "ACTIVE"},
+                             {"Id": "222", "Name": "old", "Status": "SUSPENDED"}],
+                  "ou-prod": [{"Id": "333", "Status": "ACTIVE"}],
+                  "ou-sb": [{"Id": "444", "State": "ACTIVE"}],
+                  "r-1": [{"Id": "555", "Status": "ACTIVE"}]}
+
+
+class FakeOrgClient:
+    def __init__(self):
+        self.calls = []
+
+    def can_paginate(self, operation):
+        return False
+
+    def list_roots(self):
+        self.calls.append("list_roots")
+        return {"Roots": [{"Id": "r-1"}]}
+
+    def list_organizational_units_for_parent(self, ParentId):
+        self.calls.append("list_organizational_units_for_parent")
+        return {"OrganizationalUnits": CHILD_OUS.get(ParentId, [])}
+
+    def list_accounts_for_parent(self, ParentId):
+        self.calls.append("list_accounts_for_parent")
+        return {"Accounts": CHILD_ACCOUNTS.get(ParentId, [])}
+
+
+def _ids(accounts):
+    return sorted(a["id"] if isinstance(a, dict) else a.id for a in accounts)
+
+
+def test_tree_selects_by_ou_id_or_path():
+    tree = OrgTree.fetch(FakeOrgClient())
+    assert tree.path("ou-web") == "Prod/Web"
+    assert _ids(tree.select()) == ["111", "222", "333", "444", "555"]
+    assert _ids(tree.select(["Prod"])) == ["111", "222", "333"]
+    assert _ids(tree.select(["Root"], ["ou-web", "Sandbox"])) == ["333", "555"]
+    assert _ids(tree.select(["Root/Prod/Web"])) == ["111", "222"]
+    with pytest.raises(ValueError):
+        tree.select(["Nope"])
+
+
+def test_snapshot_is_cached_until_ttl(tmp_path):
+    path = str(tmp_path / "org.json")
+    client = FakeOrgClient()
+    load_org_tree(path, 24, client)
+    n = len(client.calls)
+    assert _ids(load_org_tree(path, 24, client).accounts) == ["111", "222", "333", "444", "555"]
+    assert len(client.calls) == n
+    load_org_tree(path, 0, client)
+    assert len(client.calls) == 2 * n
+
+
+def test_target_accounts_skip_suspended_and_excluded(tmp_path, capsys):
+    load_org_tree(str(tmp_path / "org-cache.json"), 24, FakeOrgClient())
+    conf = Config(output_dir=str(tmp_path), exclude_accounts=["333"])
+    conf.organization.exclude_ous = ["Sandbox"]
+    assert _ids(get_target_accounts(conf)) == ["111", "555"]
+    assert "[SKIP] 222: account is SUSPENDED" in capsys.readouterr().out
@@ -0,0 +1,72 @@
+from auditor.findings import Finding
+from auditor.pipeline import FindingsPipeline
+from auditor.reporters.csv_reporter import CsvWriter
+from auditor.reporters.html_reporter import write_html
+from auditor.reporters.jsonl_reporter import JsonlWriter, iter_jsonl
+
+
+class ListWriter:
+    def __init__(self):
+        self.rows = []
+        self.flushes = 0
+
+    def write(self, row):
+        self.rows.append(row.resource_id)
+
+    def flush(self):
+        self.flushes += 1
+
+    def close(self):
+        return "mem"
+
+
+def _f(rid):
+    return Finding("111", "us-east-1", "EC2", rid, "LOW", "t")
+
+
+def test_pipeline_writes_in_unit_order_and_streams_the_head():
+    w = ListWriter()
+    p = FindingsPipeline([w])
+    p.emit(0, _f("a1"))
+    p.emit(2, _f("c1"))
+    p.emit(1, _f("b1"))
+    assert w.rows == ["a1"]  # head unit goes straight through
+
+    p.unit_done(2)
+    assert w.rows == ["a1"]
+    p.emit(0, _f("a2"))
+    p.unit_done(0)
+    p.emit(1, _f("b2"))
+    assert w.rows == ["a1", "a2", "b1", "b2"]
+    p.unit_done(1)
+    assert w.rows == ["a1", "a2", "b1", "b2", "c1"]
+    assert p.count == 5 and w.flushes == 3
+    assert p.close() == ["mem"]
+
+
+def test_waiting_unit_is_read_back_from_its_spool():
+    w = ListWriter()
+    p = FindingsPipeline([w])
+    spool = []
+    emit = p.sink(1, spool)
+    for rid in ("b1", "b2"):
+        spool.append(_f(rid))
+        emit(_f(rid))
+    assert p._pending == {1: 2}  # counted, not held
+    p.unit_done(1)
+    spool.append(_f("b3"))  # written after the unit finished: not emitted, not replayed
+    p.unit_done(0)
+    assert w.rows == ["b1", "b2"]
+
+
+def test_writers_stream_to_disk(tmp_path):
+    jsonl = JsonlWriter(str(tmp_path))
+    p = FindingsPipeline([CsvWriter(str(tmp_path)), jsonl])
+    p.emit(0, Finding("111", "us-east-1", "EC2", "sg-1", "HIGH", "Open", details=["a", "b"]))
+    p.unit_done(0)
+    csv_path, jsonl_path = p.close()
+
+    assert "sg-1" in open(csv_path).read()
+    assert [f.details for f in iter_jsonl(jsonl_path)] == ["a; b"]
+    html = open(write_html(iter_jsonl(jsonl_path), str(tmp_path), "now")).read()
+    assert "sg-1" in html and "sev-HIGH" in html
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from auditor import main
+from auditor.config import Concurrency, RateLimits
+from auditor.plan import UnitEstimate, estimate_unit, load_latencies, recommend, wall_time
+from auditor.ratelimit import RateLimiter
+from auditor.registry import SCANNERS
+from benchmarks.synthetic_org import SyntheticOrg
+
+
+def test_estimate_unit_is_paced_by_the_slowest_rate_limit():
+    limiter = RateLimiter(RateLimits(default=10, overrides={"cloudwatch": 1}))
+    s3 = estimate_unit(SCANNERS["s3"], "111", "global", 100, limiter, default_latency=0.1)
+    # 601 calls at 16 in flight want 160/s; six operations at 10/s allow 60/s.
+    assert s3.calls == 601
+    assert s3.seconds == pytest.approx(601 / 60)
+    assert s3.wait_seconds == pytest.approx(601 / 60 - 601 / 160)
+    assert s3.paced_calls == pytest.approx(601 * (1 - 60 / 160))
+
+    lam = estimate_unit(SCANNERS["lambda"], "111", "us-east-1", 500, limiter,
+                        latencies={"lambda:ListFunctions": 0.5}, default_latency=0.5)
+    assert lam.calls == pytest.approx(13)
+    assert lam.seconds == pytest.approx(13 / 2) and lam.paced_calls == 0  # 2/s of 2/s allowed
+
+
+def test_wall_time_and_recommendation():
+    units = [UnitEstimate(a, "r", "lambda", None, 1, 10.0, 0, 0)
+             for a in ("111", "222") for _ in range(10)]
+    conc = Concurrency(max_workers=16, per_account=4)
+    assert wall_time(units, conc) == 25  # 100s of work per account, 4 at a time
+    assert wall_time(units, Concurrency(max_workers=16, per_account=4,
+                                        per_service={"lambda": 2})) == 100
+    best = recommend(units, conc)
+    assert (best.max_workers, best.per_account, best.max_pool_connections) == (32, 16, 10)
+
+
+def test_load_latencies(tmp_path):
+    assert load_latencies(str(tmp_path)) == {}
+    rec = {"account_id": "111", "region": "r", "service": "s3", "operation": "GetBucketAcl"}
+    (tmp_path / "api-metrics.json").write_text(json.dumps({"operations": [
+        dict(rec, calls=2, latency_sum=0.4), dict(rec, account_id="222", calls=2, latency_sum=0.0),
+        dict(rec, operation="ListBuckets", calls=0, latency_sum=0.0)]}))
+    assert load_latencies(str(tmp_path)) == {"s3:GetBucketAcl": pytest.approx(0.1)}
+
+
+def test_plan_probes_counts_and_recommends_settings(tmp_path, capsys):
+    org = SyntheticOrg(accounts=2, regions=["us-east-1", "us-west-2"], resources=100)
+    cfg = tmp_path / "c.yaml"
+    cfg.write_text(f"output_dir: {tmp_path / 'out'}\nregions: [us-east-1, us-west-2]\n"
+                   "rate_limits: {default: 10}\n")
+    with org.install():
+        main.cli(["plan", "--config", str(cfg), "--only", "s3,lambda", "--latency", "0.1"])
+    out = capsys.readouterr().out
+    assert "2 of 2 accounts, 4 account-regions, 6 units" in out
+    assert "200 buckets" in out and "400 functions" in out
+    assert "[RATE] plan:" in out and "most in s3" in out
+    assert "concurrency:\n  max_workers:" in out
+    assert not any(op.startswith(("ListFunctions", "GetBucket")) for _, op in org.calls)
@@ -0,0 +1,24 @@
+from auditor.config import RateLimits
+from auditor.ratelimit import RateLimiter, TokenBucket
+
+
+def test_token_bucket_paces_calls(monkeypatch):
+    slept = []
+    monkeypatch.setattr("auditor.ratelimit.time.sleep", slept.append)
+    bucket = TokenBucket(rate=2.0, burst=1)
+    waits = [bucket.acquire() for _ in range(3)]
+    assert waits[0] == 0
+    assert waits[1] > 0 and waits[2] > waits[1]
+
+
+def test_limiter_slows_down_on_throttling_and_reports(monkeypatch, ec2_client):
+    monkeypatch.setattr("auditor.ratelimit.time.sleep", lambda s: None)
+    monkeypatch.setattr("botocore.retries.standard.time.sleep", lambda s: None, raising=False)
+    limiter = RateLimiter(RateLimits(default=50, overrides={"ec2:DescribeAddresses": 8}))
+    client = limiter.attach(ec2_client("throttle", "throttle", "ok"), "111", "us-east-1")
+
+    assert client.describe_addresses()["Addresses"] == []
+    bucket = limiter.bucket("111", "us-east-1", "ec2", "DescribeAddresses")
+    assert bucket.max_rate == 8
+    assert bucket.rate < 8
+    assert limiter.summary() and "2 throttles, 2 retries" in limiter.summary()[0]
@@ -0,0 +1,46 @@
+from auditor.regions import RegionCache, region_is_active
+
+
+class FakeClient:
+    def __init__(self, region, calls, active):
+        self.region = region
+        self.calls = calls
+        self.active = active
+
+    def describe_regions(self, AllRegions):
+        self.calls.append("describe_regions")
+        return {"Regions": [{"RegionName": "us-west-2"}, {"RegionName": "us-east-1"}]}
+
+    def get_resources(self, ResourcesPerPage):
+        return {"ResourceTagMappingList": []}
+
+    def list_functions(self, MaxItems):
+        if self.active == "denied":
+            raise RuntimeError("AccessDenied")
+        return {"Functions": [{}] if self.active else []}
+
+
+class FakeSession:
+    def __init__(self, active=False):
+        self.calls = []
+        self.active = active
+
+    def client(self, name, region_name=None):
+        return FakeClient(region_name, self.calls, self.active)
+
+
+def test_region_cache_reuses_until_ttl(tmp_path):
+    path = str(tmp_path / "regions.json")
+    sess = FakeSession()
+    assert RegionCache(path).regions_for(sess, "111") == ["us-east-1", "us-west-2"]
+    assert RegionCache(path).regions_for(sess, "111") == ["us-east-1", "us-west-2"]
+    assert sess.calls == ["describe_regions"]
+    RegionCache(path, ttl_hours=0).regions_for(sess, "111")
+    assert sess.calls == ["describe_regions"] * 2
+
+
+def test_activity_probe():
+    probes = ["tagging", "lambda"]
+    assert not region_is_active(FakeSession(active=False), "eu-west-1", probes)
+    assert region_is_active(FakeSession(active=True), "eu-west-1", probes)
+    assert region_is_active(FakeSession(active="denied"), "eu-west-1", probes)
@@ -0,0 +1,40 @@
+import pytest
+
+from auditor import main
+from auditor.config import Account
+from auditor.registry import SCANNERS, select
+
+
+def test_select_matches_check_names_and_services():
+    assert [s.name for s in select(["ec2"])] == ["ec2", "ec2-eips"]
+    assert [s.name for s in select(["rds-snapshots", "iam"])] == ["iam", "rds-snapshots"]
+    assert len(select(None)) == len(SCANNERS)
+    with pytest.raises(ValueError, match="nope"):
+        select(["nope"])
+
+
+def test_build_units_orders_global_checks_first_and_wraps_list_checks():
+    checks = select(["s3", "rds"])
+    units = main.build_units(Account(id="111"), None, ["us-east-1", "eu-west-1"], checks)
+    assert [(u.region, u.service) for u in units] == [
+        ("global", "s3"),
+        ("us-east-1", "rds"), ("us-east-1", "rds-snapshots"),
+        ("eu-west-1", "rds"), ("eu-west-1", "rds-snapshots"),
+    ]
+
+    class Session:
+        def client(self, *a, **k):
+            class Rds:
+                class exceptions:
+                    ClientError = Exception
+
+                def can_paginate(self, op):
+                    return False
+
+                def describe_db_snapshots(self, **kw):
+                    return {"DBSnapshots": [{"DBSnapshotIdentifier": "s1",
+                                             "SnapshotType": "shared"}]}
+            return Rds()
+
+    [finding] = SCANNERS["rds-snapshots"].load()(Session(), "111", "us-east-1", None)
+    assert finding.resource_id == "s1"
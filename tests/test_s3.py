@@ -0,0 +1,93 @@
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+from auditor.config import Concurrency, Config
+from auditor.scanners.s3 import scan_s3
+
+LOCATIONS = {"logs": None, "eu-data": "EU", "tokyo": "ap-northeast-1"}
+
+
+def _missing(op):
+    return ClientError({"Error": {"Code": "NoSuchThing"}}, op)
+
+
+class FakeS3:
+    def __init__(self, region, calls):
+        self.region = region
+        self.calls = calls
+
+    def list_buckets(self):
+        self.calls.append("list_buckets")
+        return {"Buckets": [{"Name": n} for n in LOCATIONS]}
+
+    def get_bucket_location(self, Bucket):
+        return {"LocationConstraint": LOCATIONS[Bucket]}
+
+    def get_bucket_policy_status(self, Bucket):
+        self.calls.append((self.region, Bucket))
+        return {"PolicyStatus": {"IsPublic": Bucket == "logs"}}
+
+    def get_bucket_acl(self, Bucket):
+        uri = "http://acs.amazonaws.com/groups/global/AllUsers" if Bucket == "tokyo" else None
+        return {"Grants": [{"Grantee": {"URI": uri}}]}
+
+    def get_bucket_encryption(self, Bucket):
+        if Bucket == "eu-data":
+            raise _missing("GetBucketEncryption")
+        return {}
+
+    def get_bucket_versioning(self, Bucket):
+        return {"Status": "Enabled"}
+
+    def get_bucket_lifecycle_configuration(self, Bucket):
+        if Bucket == "tokyo":
+            raise _missing("GetBucketLifecycleConfiguration")
+        return {"Rules": [{}]}
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    def client(self, name, region_name=None):
+        return FakeS3(region_name, self.calls)
+
+
+def test_scan_s3_routes_buckets_to_home_region_once_per_account():
+    sess = FakeSession()
+    findings = list(scan_s3(sess, "111", "global", None))
+
+    assert sess.calls.count("list_buckets") == 1
+    assert {c for c in sess.calls if c != "list_buckets"} == {
+        ("us-east-1", "logs"), ("eu-west-1", "eu-data"), ("ap-northeast-1", "tokyo"),
+    }
+    assert [(f.resource_id, f.region, f.title) for f in findings] == [
+        ("logs", "us-east-1", "S3 bucket is public"),
+        ("eu-data", "eu-west-1", "S3 bucket misconfigurations"),
+        ("tokyo", "ap-northeast-1", "S3 bucket is public"),
+        ("tokyo", "ap-northeast-1", "S3 bucket missing lifecycle policy"),
+    ]
+
+
+def test_probes_never_outnumber_the_client_connection_pool():
+    lock, in_flight, peak = threading.Lock(), [0], [0]
+
+    class SlowS3(FakeS3):
+        def get_bucket_acl(self, Bucket):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+            return super().get_bucket_acl(Bucket)
+
+    class SlowSession(FakeSession):
+        def client(self, name, region_name=None):
+            return SlowS3(region_name, self.calls)
+
+    conf = Config(concurrency=Concurrency(max_pool_connections=2))
+    assert len(list(scan_s3(SlowSession(), "111", "global", conf))) == 4
+    assert peak[0] == 2
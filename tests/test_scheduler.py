@@ -0,0 +1,43 @@
+import random
+import threading
+import time
+from collections import defaultdict
+
+from auditor.config import Concurrency
+from auditor.scheduler import ScanScheduler, ScanUnit
+
+
+def _units():
+    units = []
+    for acct in ("111", "222", "333"):
+        for region in ("us-east-1", "eu-west-1"):
+            for svc in ("ec2", "s3", "lambda"):
+                units.append(ScanUnit(acct, region, svc, fn=None, session=object()))
+    return units
+
+
+def test_results_follow_unit_order_and_respect_limits():
+    limits = Concurrency(max_workers=6, per_account=2, per_service={"lambda": 1})
+    lock = threading.Lock()
+    busy = defaultdict(int)
+    peaks = defaultdict(int)
+
+    def execute(i, u):
+        keys = ("all", f"acct:{u.account_id}", f"svc:{u.service}")
+        with lock:
+            for k in keys:
+                busy[k] += 1
+                peaks[k] = max(peaks[k], busy[k])
+        time.sleep(random.uniform(0, 0.01))
+        with lock:
+            for k in keys:
+                busy[k] -= 1
+        return [u.label]
+
+    units = _units()
+    results = ScanScheduler(limits).run(units, execute)
+
+    assert [r[0] for r in results] == [u.label for u in units]
+    assert peaks["all"] <= 6
+    assert all(peaks[f"acct:{a}"] <= 2 for a in ("111", "222", "333"))
+    assert peaks["svc:lambda"] == 1
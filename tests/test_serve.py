@@ -0,0 +1,75 @@
+import csv
+import json
+
+from auditor import serve
+from auditor.findings import Finding
+from auditor.serve import EventFile, event_targets
+
+
+def test_event_targets():
+    bridge = {"account": "111", "region": "us-east-1",
+              "detail": {"eventSource": "ec2.amazonaws.com", "eventName": "RunInstances"}}
+    assert event_targets(bridge) == ("111", "us-east-1", "ec2")
+    trail = {"recipientAccountId": "222", "awsRegion": "eu-west-1",
+             "eventSource": "s3.amazonaws.com", "eventName": "PutBucketPolicy"}
+    assert event_targets(trail) == ("222", "eu-west-1", "s3")
+    assert event_targets(dict(trail, eventName="GetBucketPolicy")) is None
+    assert event_targets(dict(trail, eventName="PutObject", readOnly=True)) is None
+    assert event_targets({"account_id": 333, "service": "tagging"}) == ("333", "global", "tagging")
+
+
+def test_event_file_waits_for_complete_lines(tmp_path):
+    path = tmp_path / "events.jsonl"
+    events = EventFile(str(path))
+    assert events.poll() == []
+    path.write_text('{"a": 1}\nnot json\n{"b"')
+    assert events.poll() == [{"a": 1}]
+    with open(path, "a") as f:
+        f.write(': 2}\n')
+    assert events.poll() == [{"b": 2}]
+    assert events.poll() == []
+
+
+def test_events_rescan_only_affected_units(tmp_path, monkeypatch, fake_scanners):
+    cfg = tmp_path / "c.yaml"
+    cfg.write_text('accounts: [{id: "111"}, {id: "222"}]\nregions: ["us-east-1", "us-west-2"]\n'
+                   'cache: {enabled: false}\n')
+    generation = {"n": 0}
+
+    def scan(spec, account_id, region):
+        yield Finding(account_id, region, spec.finding_services[0],
+                      f"{spec.name}-{generation['n']}", "HIGH", "t")
+
+    fake_scanners.scan = scan
+    scans = fake_scanners.calls
+    events = tmp_path / "events.jsonl"
+    events.write_text("\n".join(json.dumps(e) for e in [
+        {"account": "111", "region": "us-west-2",
+         "detail": {"eventSource": "lambda.amazonaws.com", "eventName": "DeleteFunction20150331"}},
+        {"Records": [{"recipientAccountId": "222", "awsRegion": "us-east-1",
+                      "eventSource": "s3.amazonaws.com", "eventName": "DeleteBucketPolicy"},
+                     {"recipientAccountId": "222", "awsRegion": "us-east-1",
+                      "eventSource": "s3.amazonaws.com", "eventName": "GetBucketAcl"}]},
+        {"account_id": "999", "region": "us-east-1", "service": "lambda"},
+        {"account_id": "111", "region": "eu-west-1", "service": "lambda"},  # not audited
+    ]) + "\n")
+
+    generation["n"] = 1
+    real_rescan = serve.AuditDaemon.rescan
+
+    def rescan(self, units):
+        real_rescan(self, units)
+        generation["n"] += 1
+
+    monkeypatch.setattr(serve.AuditDaemon, "rescan", rescan)
+    out = tmp_path / "out"
+    serve.serve(str(cfg), str(events), str(out), ["lambda", "s3"], once=True)
+
+    initial = 2 * (1 + 2)  # s3 once per account, lambda per region
+    assert sorted(scans[initial:]) == [("111", "us-west-2", "lambda"), ("222", "global", "s3")]
+    rows = {(r["account_id"], r["region"], r["resource_id"])
+            for r in csv.DictReader(open(out / "findings.csv"))}
+    assert rows == {("111", "global", "s3-1"), ("111", "us-east-1", "lambda-1"),
+                    ("111", "us-west-2", "lambda-2"), ("222", "global", "s3-2"),
+                    ("222", "us-east-1", "lambda-1"), ("222", "us-west-2", "lambda-1")}
+    assert (out / "findings.html").exists()
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+from auditor.inventory import use_inventory
+from auditor.scanners.lambda_svc import scan_lambda
+from auditor.tags import TagIndex, arn, use_tag_index
+
+FN_ARN = "arn:aws:lambda:us-east-1:111:function:{}"
+
+
+class FakeTagging:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def can_paginate(self, operation):
+        return False
+
+    def get_resources(self, ResourceTypeFilters, ResourcesPerPage):
+        self.calls.append("get_resources")
+        return {"ResourceTagMappingList": [
+            {"ResourceARN": FN_ARN.format("tagged"),
+             "Tags": [{"Key": "owner", "Value": "team"}]},
+            {"ResourceARN": arn("s3", "us-east-1", "111", "logs"), "Tags": []},
+        ]}
+
+
+class FakeLambda:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self, **kwargs):
+        return [{"Functions": [{"FunctionName": n, "FunctionArn": FN_ARN.format(n)}
+                               for n in ("tagged", "bare")]}]
+
+    def list_tags(self, Resource):
+        self.calls.append("list_tags")
+        return {"Tags": {}}
+
+
+class FakeCloudWatch:
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self, MetricDataQueries, **kwargs):
+        return [{"MetricDataResults": [{"Id": q["Id"], "Values": [1.0]}
+                                       for q in MetricDataQueries]}]
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    def client(self, name, region_name=None):
+        return {"resourcegroupstaggingapi": FakeTagging, "lambda": FakeLambda}.get(
+            name, lambda calls: FakeCloudWatch())(self.calls)
+
+
+def test_index_is_built_once_per_account_and_region():
+    sess = FakeSession()
+    index = TagIndex()
+    assert index.lookup(sess, "111", "us-east-1", FN_ARN.format("tagged")) == {"owner": "team"}
+    assert index.lookup(sess, "111", "us-east-1", FN_ARN.format("other")) == {}
+    assert sess.calls == ["get_resources"]
+    index.lookup(sess, "111", "us-west-2", FN_ARN.format("tagged"))
+    index.invalidate("111", "us-east-1")
+    index.lookup(sess, "111", "us-east-1", FN_ARN.format("tagged"))
+    assert sess.calls == ["get_resources"] * 3
+
+
+def test_missing_required_tags():
+    index = TagIndex(required=["owner", "env"])
+    [f] = index.missing({"owner": "x"}, "111", "us-east-1", "RDS", "db-1", "t")
+    assert f.details == "Missing tags: env" and f.tags == {"owner": "x"}
+    assert index.missing({"owner": "x", "env": "p"}, "111", "r", "RDS", "db-1", "t") == []
+    assert index.missing(None, "111", "r", "RDS", "db-1", "t") == []  # index unavailable
+    assert TagIndex().missing({"a": "b"}, "111", "r", "S3", "b", "t") == []
+    assert len(TagIndex().missing({}, "111", "r", "S3", "b", "t")) == 1
+
+
+def test_lambda_uses_the_index_instead_of_list_tags():
+    sess = FakeSession()
+    use_inventory(None)
+    use_tag_index(TagIndex())
+    try:
+        conf = SimpleNamespace(stale_days=SimpleNamespace(lambda_no_invocations=30))
+        findings = list(scan_lambda(sess, "111", "us-east-1", conf))
+    finally:
+        use_tag_index(None)
+    assert [(f.resource_id, f.title) for f in findings] == [("bare", "Lambda missing tags")]
+    assert sess.calls == ["get_resources"]
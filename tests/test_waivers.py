@@ -0,0 +1,134 @@
+import csv
+from datetime import date
+
+import pytest
+
+from auditor import main
+from auditor.config import Waiver, load_config, load_waivers
+from auditor.findings import Finding
+from auditor.waivers import WaiverIndex
+
+WAIVERS = """
+waivers:
+  - id: www
+    reason: static site
+    account_id: "011111111111"
+    service: S3
+    resource_id: "www-*"
+  - id: sandbox
+    account_id: "222222222222"
+  - id: default-sgs
+    resource_id: "sg-default-*"
+  - id: old
+    account_id: "333333333333"
+    expires: 2020-01-01
+"""
+
+
+def _f(account_id, service, resource_id):
+    return Finding(account_id, "us-east-1", service, resource_id, "HIGH", "t")
+
+
+def test_load_waivers_validates(tmp_path):
+    path = tmp_path / "w.yaml"
+    path.write_text(WAIVERS)
+    waivers = load_waivers(str(path))
+    assert [w.id for w in waivers] == ["www", "sandbox", "default-sgs", "old"]
+    assert waivers[0].account_id == "011111111111"
+    assert waivers[3].expires == date(2020, 1, 1)
+    path.write_text("- reason: everything\n")
+    with pytest.raises(ValueError):
+        load_waivers(str(path))
+    path.write_text("- account_id: '1'\n  resource: x\n")
+    with pytest.raises(ValueError):
+        load_waivers(str(path))
+    path.write_text("- account_id: 011111111111\n")  # octal to YAML
+    with pytest.raises(ValueError):
+        load_waivers(str(path))
+    path.write_text("- account_id: 111111111111\n")
+    assert load_waivers(str(path))[0].account_id == "111111111111"
+
+
+def test_index_matches_exact_and_glob_fields(tmp_path):
+    path = tmp_path / "w.yaml"
+    path.write_text(WAIVERS)
+    index = WaiverIndex(load_waivers(str(path)), today=date(2026, 10, 18))
+    assert [w.id for w in index.expired] == ["old"]
+    assert index.process(_f("011111111111", "S3", "www-site")) is None
+    assert index.process(_f("011111111111", "S3", "data")) is not None
+    assert index.process(_f("011111111111", "EC2", "www-site")) is not None
+    assert index.process(_f("222222222222", "IAM", "anything")) is None
+    assert index.process(_f("999", "EC2", "sg-default-1")) is None
+    assert index.process(_f("333333333333", "EC2", "x")) is not None
+    assert index.summary() == [("default-sgs", "", 1), ("sandbox", "", 1),
+                               ("www", "static site", 1)]
+
+
+def test_same_exact_key_tries_each_glob():
+    index = WaiverIndex([Waiver("a", service="EC2", resource_id="sg-*"),
+                         Waiver("b", service="EC2", resource_id="eipalloc-*")])
+    assert index.match(_f("1", "EC2", "eipalloc-9")).id == "b"
+    assert index.match(_f("1", "EC2", "i-123")) is None
+
+
+def test_run_drops_waived_findings_and_reports_counts(tmp_path, fake_scanners):
+    (tmp_path / "w.yaml").write_text(WAIVERS)
+    cfg = tmp_path / "c.yaml"
+    cfg.write_text('accounts: [{id: "011111111111"}, {id: "222222222222"}]\n'
+                   'regions: ["us-east-1"]\ncache: {enabled: false}\n'
+                   'history: {enabled: false}\nwaivers_file: w.yaml\n')
+
+    def public_buckets(spec, account_id, region):
+        if spec.name == "s3":
+            yield Finding(account_id, "global", "S3", "www-site", "HIGH", "public")
+            yield Finding(account_id, "global", "S3", "data", "HIGH", "public")
+
+    fake_scanners.scan = public_buckets
+    assert len(load_config(str(cfg)).waivers) == 4
+    main.run(str(cfg), ["s3"], str(tmp_path / "out"))
+    rows = list(csv.DictReader(open(tmp_path / "out" / "findings.csv")))
+    assert [(r["account_id"], r["resource_id"]) for r in rows] == [("011111111111", "data")]
+    html = (tmp_path / "out" / "findings.html").read_text()
+    assert "3 suppressed by waivers" in html and "static site" in html
+
+
+def test_suppressed_findings_are_not_checkpointed_but_counted_on_resume(tmp_path,
+                                                                       fake_scanners):
+    (tmp_path / "w.yaml").write_text(WAIVERS)
+    cfg = tmp_path / "c.yaml"
+    cfg.write_text('accounts: [{id: "011111111111"}, {id: "222222222222"}]\n'
+                   'regions: ["us-east-1"]\ncache: {enabled: false}\n'
+                   'history: {enabled: false}\nwaivers_file: w.yaml\n'
+                   'concurrency: {max_workers: 1}\n')
+    crash = {"on": "222222222222"}
+
+    def public_buckets(spec, account_id, region):
+        if account_id == crash["on"]:
+            raise KeyboardInterrupt
+        yield Finding(account_id, "global", "S3", "www-site", "HIGH", "public")
+        yield Finding(account_id, "global", "S3", "data", "HIGH", "public")
+
+    fake_scanners.scan = public_buckets
+    out = tmp_path / "out"
+    with pytest.raises(KeyboardInterrupt):
+        main.run(str(cfg), ["s3"], str(out))
+    assert "www-site" not in (out / "checkpoint.jsonl").read_text()
+
+    crash["on"] = None
+    main.run(str(cfg), ["s3"], str(out), resume=True)
+    assert "3 suppressed by waivers" in (out / "findings.html").read_text()
+
+
+def test_merge_sums_shard_counts(tmp_path):
+    from auditor.merge import merge_partials
+    partials = []
+    for i, n in ((1, 2), (2, 3)):
+        index = WaiverIndex([Waiver("sandbox", reason="sb", account_id="2")])
+        for _ in range(n):
+            index.process(_f("2", "EC2", "x"))
+        index.write(str(tmp_path), f".shard-{i}-of-2")
+        partial = tmp_path / f"findings.shard-{i}-of-2.jsonl"
+        partial.write_text("")
+        partials.append(str(partial))
+    merge_partials(partials, str(tmp_path / "final"))
+    assert "5 suppressed by waivers" in (tmp_path / "final" / "findings.html").read_text()